@@ -1,14 +1,28 @@
 # app.py
+import time
+from startup_profile import StartupProfile
+
+# Engines (torch, whisper, vosk, mediapipe, cv2...) are imported lazily: in the
+# background once the window is up, or when their switch is turned on
+STARTUP = StartupProfile(time.perf_counter())
+
+import sys
 import threading
 import customtkinter
-from virtual_mouse import run_virtual_mouse
-from speech_commander import run_speech_commander
+from ui_events import UIEventBus
+STARTUP.mark("import customtkinter")
+from sampling_profiler import SamplingProfiler
+
+ENGINES = {
+    'mouse': ('virtual_mouse', 'run_virtual_mouse'),
+    'speech': ('speech_commander', 'run_speech_commander'),
+}
 
 class App(customtkinter.CTk):
-    def __init__(self):
+    def __init__(self, preload=True, profile=None, use_runtime=False, profile_seconds=10):
         super().__init__()
         self.title("Hands-Free Assistant")
-        self.geometry("600x450")
+        self.geometry("600x500")
 
         customtkinter.set_appearance_mode("System")
         customtkinter.set_default_color_theme("blue")
@@ -20,6 +34,30 @@ class App(customtkinter.CTk):
         self.mouse_stop_event = threading.Event()
         self.speech_stop_event = threading.Event()
 
+        # Lazy engine loading
+        self.profile = profile or STARTUP
+        self.preload = preload
+        self.engine_lock = threading.Lock()
+        self.first_frame_drawn = False
+        self.preload_done = threading.Event()
+        # use_runtime: both engines run as pipelines on the shared asyncio runtime
+        # (runtime.py) instead of each spinning its own polling loop
+        self.use_runtime = use_runtime
+
+        # Engines post status/metrics here from their own threads; the main loop
+        # drains it every ui_tick_ms and applies only the newest event per topic
+        self.events = UIEventBus()
+        self.ui_tick_ms = 50
+        self.event_handlers = {
+            'mouse.metrics': self._show_mouse_metrics,
+            'speech.status': self._show_speech_status,
+            'profile.done': self._show_profile_done,
+        }
+
+        # "Capture profile": sample every thread's stack for profile_seconds
+        self.profile_seconds = profile_seconds
+        self.profiler = None
+
         # --- UI Layout ---
         self.title_label = customtkinter.CTkLabel(
             self, text="Hands-Free Control Center",
@@ -34,6 +72,8 @@ class App(customtkinter.CTk):
         self.mouse_label.pack(side="left", padx=10, expand=True)
         self.mouse_switch = customtkinter.CTkSwitch(self.mouse_frame, text="", command=self.toggle_mouse)
         self.mouse_switch.pack(side="right", padx=10)
+        self.mouse_metrics_label = customtkinter.CTkLabel(self, text="", font=customtkinter.CTkFont(size=11))
+        self.mouse_metrics_label.pack(padx=20, anchor="w")
 
         # Speech Commander Section
         self.speech_frame = customtkinter.CTkFrame(self)
@@ -47,7 +87,57 @@ class App(customtkinter.CTk):
         self.status_label = customtkinter.CTkLabel(self, text="Status: Idle", font=customtkinter.CTkFont(size=12))
         self.status_label.pack(pady=20)
 
+        self.profile_button = customtkinter.CTkButton(self, text=f"Capture profile ({self.profile_seconds:g}s)",
+                                                      command=self.capture_profile)
+        self.profile_button.pack(pady=5)
+
         self.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.bind("<Map>", self._on_map, add="+")
+        self.after(self.ui_tick_ms, self._drain_events)
+        self.profile.mark("App.__init__")
+
+    def _drain_events(self):
+        for topic, payload in self.events.drain():
+            self.event_handlers[topic](payload)
+        self.after(self.ui_tick_ms, self._drain_events)
+
+    # --- Lazy engine loading ---
+
+    def _on_map(self, event):
+        if not self.first_frame_drawn:
+            self.first_frame_drawn = True
+            # Idle callbacks run once the pending redraws are done
+            self.after_idle(self._on_first_frame)
+
+    def _on_first_frame(self):
+        self.profile.mark("first frame")
+        if self.preload:
+            threading.Thread(target=self._preload_engines, name="EnginePreload", daemon=True).start()
+        else:
+            self.preload_done.set()
+
+    def _preload_engines(self):
+        """Import the engines in the background so switching them on is instant."""
+        for name in ENGINES:
+            try:
+                self.load_engine(name)
+            except Exception as e:
+                print(f"⚠️ Could not preload {name} engine: {e}")
+        self.profile.mark("engines preloaded")
+        self.preload_done.set()
+
+    def load_engine(self, name):
+        """Return an engine's run function, importing its module on first use."""
+        module_name, function_name = ENGINES[name]
+        with self.engine_lock:
+            module = self.profile.import_engine(module_name)
+            if self.use_runtime:
+                module = self.profile.import_module('runtime')
+        return getattr(module, function_name)
+
+    def _run_engine(self, name, *args):
+        # Runs on the engine thread, so a cold import never blocks the window
+        self.load_engine(name)(*args)
 
     def update_status(self):
         if self.is_mouse_running and self.is_speech_running:
@@ -64,12 +154,13 @@ class App(customtkinter.CTk):
             if not self.is_mouse_running:
                 self.is_mouse_running = True
                 self.mouse_stop_event.clear()
-                self.mouse_thread = threading.Thread(target=run_virtual_mouse, args=(self.mouse_stop_event,), daemon=True)
+                self.mouse_thread = threading.Thread(target=self._run_engine, args=('mouse', self.mouse_stop_event, self.events.poster('mouse.metrics')), name="GestureEngine", daemon=True)
                 self.mouse_thread.start()
         else:
             if self.is_mouse_running:
                 self.is_mouse_running = False
                 self.mouse_stop_event.set()
+                self.mouse_metrics_label.configure(text="")
         self.update_status()
 
     def toggle_speech(self):
@@ -78,7 +169,7 @@ class App(customtkinter.CTk):
                 self.is_speech_running = True
                 self.speech_stop_event.clear()
                 # Pass the status label update function as a callback
-                self.speech_thread = threading.Thread(target=run_speech_commander, args=(self.speech_stop_event, self.update_speech_status), daemon=True)
+                self.speech_thread = threading.Thread(target=self._run_engine, args=('speech', self.speech_stop_event, self.events.poster('speech.status')), name="SpeechEngine", daemon=True)
                 self.speech_thread.start()
         else:
             if self.is_speech_running:
@@ -86,14 +177,77 @@ class App(customtkinter.CTk):
                 self.speech_stop_event.set()
         self.update_status()
 
-    def update_speech_status(self, text):
-        self.status_label.configure(text=text)
+    def _show_mouse_metrics(self, metrics):
+        if not self.is_mouse_running:
+            return
+        text = f"{metrics['fps']:.0f} FPS | {metrics['mode']}"
+        end_to_end = metrics['latency'].get('end_to_end')
+        if end_to_end:
+            text += f" | motion-to-cursor p50 {end_to_end['p50_ms']:.0f} ms, p95 {end_to_end['p95_ms']:.0f} ms"
+        governor = metrics.get('governor')
+        if governor and governor['throttled']:
+            text += f" | capped at {governor['gesture_fps_limit']} FPS during transcription"
+        self.mouse_metrics_label.configure(text=text)
+
+    def _show_speech_status(self, text):
+        if self.is_speech_running:
+            self.status_label.configure(text=text)
+
+    # --- Profiling ---
+
+    def capture_profile(self):
+        """Sample the gesture, speech and GUI threads in the background and save a flamegraph file."""
+        if self.profiler and self.profiler.is_alive():
+            return
+        self.profiler = SamplingProfiler(self.profile_seconds, done_callback=self.events.poster('profile.done'))
+        self.profiler.start()
+        self.profile_button.configure(state="disabled", text="Capturing profile...")
+
+    def _show_profile_done(self, path):
+        self.profile_button.configure(state="normal", text=f"Capture profile ({self.profile_seconds:g}s)")
+        self.status_label.configure(text=f"Profile saved: {path}" if path else "Profile failed (see console)")
 
     def on_close(self):
+        print(f"🖼️ UI events: {self.events.posted} posted, {self.events.applied} applied")
         self.mouse_stop_event.set()
         self.speech_stop_event.set()
         self.destroy()
 
+def profile_startup(app, budget_ms=None):
+    """Wait for the first frame and engine preload, print the breakdown and close."""
+    def check():
+        if not app.preload_done.is_set():
+            app.after(50, check)
+            return
+        print(app.profile.format_report())
+        first_frame = app.profile.phase_ms("first frame")
+        if budget_ms is not None and first_frame is not None and first_frame > budget_ms:
+            print(f"❌ First frame took {first_frame:.0f} ms (budget {budget_ms:.0f} ms)")
+            app.exit_code = 1
+        app.on_close()
+    app.exit_code = 0
+    app.after(50, check)
+
+
 if __name__ == "__main__":
-    app = App()
-    app.mainloop()
\ No newline at end of file
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Hands-Free Control Center")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Print import-time and first-frame breakdowns, then exit")
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="With --profile-startup, exit with status 1 if the first frame is slower")
+    parser.add_argument("--no-preload", action="store_true",
+                        help="Don't import the engines in the background after startup")
+    parser.add_argument("--profile-seconds", type=float, default=10,
+                        help="Length of a 'Capture profile' sample")
+    parser.add_argument("--runtime", action="store_true",
+                        help="Run the engines as pipelines on the shared asyncio runtime")
+    args = parser.parse_args()
+
+    app = App(preload=not args.no_preload, use_runtime=args.runtime, profile_seconds=args.profile_seconds)
+    if args.profile_startup:
+        profile_startup(app, args.budget_ms)
+    app.mainloop()
+    if args.profile_startup:
+        sys.exit(app.exit_code)
\ No newline at end of file
@@ -0,0 +1,113 @@
+import math
+import queue
+import time
+import numpy as np
+import sounddevice as sd
+
+from speech_config import float_to_pcm16
+
+
+class PolyphaseResampler:
+    """Streaming rational-ratio resampler (in_rate -> out_rate) with a polyphase FIR.
+
+    The prototype is a Kaiser-windowed sinc low-pass at the upsampled rate,
+    cut just below the lower Nyquist frequency, with `half_taps` zero
+    crossings on each side. It is split into `up` phase filters, so each output
+    sample costs one short dot product and no zero-stuffed samples are ever
+    computed. process() handles a whole block at once (gather + einsum) and
+    carries the filter history and output phase between blocks, so a stream
+    cut into any block sizes gives the same output as one long call.
+    """
+
+    def __init__(self, in_rate, out_rate=16000, half_taps=16, beta=8.0, rolloff=0.94):
+        g = math.gcd(int(in_rate), int(out_rate))
+        self.in_rate, self.out_rate = int(in_rate), int(out_rate)
+        self.up, self.down = self.out_rate // g, self.in_rate // g
+
+        factor = max(self.up, self.down)
+        n = 2 * half_taps * factor + 1
+        t = np.arange(n) - (n - 1) / 2
+        cutoff = 0.5 * rolloff / factor  # Cycles per sample at the upsampled rate
+        h = 2 * cutoff * np.sinc(2 * cutoff * t) * np.kaiser(n, beta) * self.up
+
+        # phases[p, k] = h[k * up + p]
+        self.taps = -(-n // self.up)
+        padded = np.zeros(self.taps * self.up)
+        padded[:n] = h
+        self.phases = padded.reshape(self.taps, self.up).T.astype(np.float32)
+        self.delay_s = (n - 1) / 2 / (self.in_rate * self.up)  # Group delay the filter adds
+        self.offsets = np.arange(self.taps)
+        self.reset()
+
+    def reset(self):
+        self.history = np.zeros(self.taps - 1, dtype=np.float32)
+        self.consumed = 0     # Input samples seen so far
+        self.next_output = 0  # Index of the next output sample
+
+    def process(self, block):
+        """Resample one block of mono float32 samples; returns the output samples it completes."""
+        if self.up == self.down:
+            return np.asarray(block, dtype=np.float32)
+        start = self.consumed
+        ext = np.concatenate([self.history, np.asarray(block, dtype=np.float32)])
+        self.consumed += len(block)
+
+        # Output m needs input floor(m * down / up) and the taps - 1 samples before it
+        end = -(-self.consumed * self.up // self.down)
+        m = np.arange(self.next_output, end)
+        self.next_output = end
+        position = m * self.down
+        newest = position // self.up - start + self.taps - 1
+        windows = ext[newest[:, None] - self.offsets]
+        if self.taps > 1:
+            self.history = ext[len(ext) - (self.taps - 1):]
+        return np.einsum('mk,mk->m', windows, self.phases[position % self.up])
+
+
+class AudioCapture:
+    """Microphone input at the device's native rate and channel count, delivered as 16 kHz mono PCM16.
+
+    The PortAudio callback only copies the block into a queue; downmixing and
+    resampling happen in get(), on the consumer's thread, one whole block at a
+    time. native_rate / channels default to what the device reports.
+    """
+
+    def __init__(self, device=None, rate=16000, block_duration=0.256, native_rate=None, channels=None,
+                 blocks=None):
+        info = sd.query_devices(device, 'input')
+        self.device = device
+        self.rate = rate
+        self.native_rate = int(native_rate or info['default_samplerate'])
+        self.channels = int(channels or max(1, info['max_input_channels']))
+        self.blocksize = int(round(block_duration * self.native_rate))
+        self.resampler = PolyphaseResampler(self.native_rate, rate)
+        self.blocks = blocks if blocks is not None else queue.Queue()  # Native (frames, channels) blocks
+        self.stats = {'blocks': 0, 'convert_s': 0.0}
+
+    def describe(self):
+        return (f"{self.native_rate} Hz x {self.channels} ch -> {self.rate} Hz mono "
+                f"(resampler {self.resampler.up}/{self.resampler.down}, {self.resampler.delay_s * 1000:.1f} ms delay)")
+
+    def callback(self, indata, frames, time_info, status):
+        if status:
+            print(status, flush=True)
+        self.blocks.put((indata.copy(), time.time()))
+
+    def open_stream(self, callback=None):
+        """The native-format input stream (not yet started); blocks go to callback (default: self.blocks)."""
+        return sd.InputStream(samplerate=self.native_rate, device=self.device, channels=self.channels,
+                              dtype='float32', blocksize=self.blocksize, callback=callback or self.callback)
+
+    def convert(self, block):
+        """Downmix one native (frames, channels) float32 block and resample it to PCM16 bytes."""
+        start = time.perf_counter()
+        mono = block.mean(axis=1) if block.ndim > 1 and block.shape[1] > 1 else block.reshape(-1)
+        pcm = float_to_pcm16(self.resampler.process(mono))
+        self.stats['blocks'] += 1
+        self.stats['convert_s'] += time.perf_counter() - start
+        return pcm
+
+    def get(self, timeout=None):
+        """Next block as (16 kHz PCM16 bytes, capture time); raises queue.Empty after timeout."""
+        block, timestamp = self.blocks.get(timeout=timeout)
+        return self.convert(block), timestamp
@@ -0,0 +1,187 @@
+"""Offline batch transcription of dictation recordings (QA re-runs).
+
+Every WAV file in a directory is decoded with the speech commander's Whisper
+setup and cleaning, but short clips are batched: up to --batch-size
+utterances (each padded to Whisper's 30 s window) go through the encoder
+and decoder together instead of one model.transcribe call per clip. Clips
+longer than one window fall back to model.transcribe. Results are streamed
+as one JSON object per line, and throughput is reported in audio seconds
+per wall second.
+
+    python batch_transcribe.py recordings/ [--output results.jsonl] [--batch-size 8]
+
+With --cascade SMALL every clip instead goes through the live engine's
+cascade (SMALL first, --model only when SMALL's segment scores are poor),
+one clip at a time, and the escalation rate and latency distribution are
+reported.
+
+    python batch_transcribe.py recordings/ --cascade base.en
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+import wave
+import numpy as np
+import torch
+import whisper
+
+from audio_capture import PolyphaseResampler
+from speech_config import STOP_PHRASES, WHISPER_MODEL, clean_transcript, load_whisper_model, pcm16_to_float
+from whisper_cascade import WhisperCascade, segment_scores
+from whisper_manager import WhisperModelManager
+
+SAMPLE_RATE = whisper.audio.SAMPLE_RATE
+WINDOW_SECONDS = whisper.audio.CHUNK_LENGTH
+
+
+def read_wav(path):
+    """Read a 16-bit WAV file as mono float32 at 16 kHz."""
+    with wave.open(path, 'rb') as wav:
+        if wav.getsampwidth() != 2:
+            raise ValueError(f"{path}: only 16-bit PCM is supported")
+        channels, rate = wav.getnchannels(), wav.getframerate()
+        audio = pcm16_to_float(wav.readframes(wav.getnframes()))
+    if channels > 1:
+        audio = audio.reshape(-1, channels).mean(axis=1)
+    if rate != SAMPLE_RATE:
+        # Same anti-aliased resampler as live capture; pad to flush the filter, then drop its delay
+        resampler = PolyphaseResampler(rate, SAMPLE_RATE)
+        n = int(round(len(audio) * SAMPLE_RATE / rate))
+        delay = int(round(resampler.delay_s * SAMPLE_RATE))
+        padded = np.concatenate([audio, np.zeros(resampler.taps + int(resampler.delay_s * rate) + 1, np.float32)])
+        audio = resampler.process(padded)[delay:delay + n]
+    return audio
+
+
+def find_wavs(directory):
+    return sorted(os.path.join(directory, f) for f in os.listdir(directory) if f.lower().endswith('.wav'))
+
+
+def result_record(path, duration, text, result, stop_phrases):
+    return {
+        'file': os.path.basename(path),
+        'duration_s': round(duration, 3),
+        'text': clean_transcript(text, stop_phrases),
+        'raw_text': text,
+        'avg_logprob': result.get('avg_logprob'),
+        'no_speech_prob': result.get('no_speech_prob'),
+        'compression_ratio': result.get('compression_ratio'),
+    }
+
+
+def cascade_records(cascade, paths, stop_phrases=STOP_PHRASES):
+    """Yield one result record per file, decoded clip by clip through a WhisperCascade."""
+    for path in paths:
+        try:
+            audio = read_wav(path)
+        except (wave.Error, ValueError, EOFError) as e:
+            yield {'file': os.path.basename(path), 'error': str(e)}
+            continue
+        result, info = cascade.transcribe(audio, language='en', without_timestamps=True)
+        record = result_record(path, len(audio) / SAMPLE_RATE, result.get('text', '').strip(),
+                               segment_scores(result), stop_phrases)
+        record.update(escalated=info['escalated'], reason=info['reason'], decode_ms=round(info['total_s'] * 1000))
+        yield record
+
+
+class BatchTranscriber:
+    """Batches short clips through one Whisper model's encoder and decoder."""
+
+    def __init__(self, model, fp16, batch_size=8, stop_phrases=STOP_PHRASES):
+        self.model = model
+        self.fp16 = fp16
+        self.batch_size = batch_size
+        self.stop_phrases = stop_phrases
+        self.options = whisper.DecodingOptions(language='en', fp16=fp16, without_timestamps=True)
+
+    def decode_batch(self, clips):
+        """Decode a list of (path, audio) clips of at most 30 s with one batched call."""
+        mels = [whisper.log_mel_spectrogram(whisper.pad_or_trim(audio), n_mels=self.model.dims.n_mels)
+                for _, audio in clips]
+        mel = torch.stack(mels).to(self.model.device)
+        results = whisper.decode(self.model, mel, self.options)
+        records = []
+        for (path, audio), result in zip(clips, results):
+            scores = {'avg_logprob': result.avg_logprob, 'no_speech_prob': result.no_speech_prob,
+                      'compression_ratio': result.compression_ratio}
+            records.append(result_record(path, len(audio) / SAMPLE_RATE, result.text.strip(),
+                                         scores, self.stop_phrases))
+        return records
+
+    def decode_long(self, path, audio):
+        """Clips longer than one window go through the regular sliding-window transcribe."""
+        result = self.model.transcribe(audio, language='en', fp16=self.fp16, without_timestamps=True)
+        return result_record(path, len(audio) / SAMPLE_RATE, result.get('text', '').strip(),
+                             segment_scores(result), self.stop_phrases)
+
+    def transcribe_files(self, paths):
+        """Yield one result record per file, batching the short ones."""
+        batch = []
+        for path in paths:
+            try:
+                audio = read_wav(path)
+            except (wave.Error, ValueError, EOFError) as e:
+                yield {'file': os.path.basename(path), 'error': str(e)}
+                continue
+            if len(audio) > WINDOW_SECONDS * SAMPLE_RATE:
+                yield self.decode_long(path, audio)
+                continue
+            batch.append((path, audio))
+            if len(batch) == self.batch_size:
+                yield from self.decode_batch(batch)
+                batch = []
+        if batch:
+            yield from self.decode_batch(batch)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Batch-transcribe a directory of dictation WAV files.")
+    parser.add_argument("directory", help="Directory of .wav recordings")
+    parser.add_argument("--output", help="JSONL output file (default: stdout)")
+    parser.add_argument("--batch-size", type=int, default=8, help="Clips per batched encoder/decoder call")
+    parser.add_argument("--model", default=WHISPER_MODEL, help="Whisper model name")
+    parser.add_argument("--cascade", metavar="SMALL_MODEL",
+                        help="Decode with SMALL_MODEL first and escalate to --model on poor scores")
+    parser.add_argument("--memory-budget-mb", type=float, default=4000, help="Cascade residency budget")
+    args = parser.parse_args()
+
+    paths = find_wavs(args.directory)
+    if not paths:
+        sys.exit(f"❌ No .wav files in {args.directory}")
+
+    # JSONL goes to the real stdout (or --output); everything printed goes to stderr
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    with contextlib.redirect_stdout(sys.stderr):
+        cascade = None
+        if args.cascade:
+            cascade = WhisperCascade(WhisperModelManager(load_whisper_model, args.cascade),
+                                     WhisperModelManager(load_whisper_model, args.model),
+                                     memory_budget_mb=args.memory_budget_mb)
+            cascade.prefetch()
+            records = cascade_records(cascade, paths)
+            mode = f"cascade {args.cascade} -> {args.model}"
+        else:
+            print(f"Loading Whisper {args.model}...")
+            model, device, fp16 = load_whisper_model(args.model)
+            records = BatchTranscriber(model, fp16, batch_size=args.batch_size).transcribe_files(paths)
+            mode = f"batch size {args.batch_size}, {device}"
+
+        audio_seconds = 0.0
+        start = time.perf_counter()
+        try:
+            for record in records:
+                out.write(json.dumps(record) + "\n")
+                out.flush()
+                audio_seconds += record.get('duration_s', 0.0)
+        finally:
+            if out is not sys.__stdout__:
+                out.close()
+        wall = time.perf_counter() - start
+
+        print(f"✅ {len(paths)} files, {audio_seconds:.1f} s of audio in {wall:.1f} s "
+              f"({audio_seconds / wall:.1f} audio-s/wall-s, {mode})")
+        if cascade:
+            print(cascade.format_report())
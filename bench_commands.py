@@ -0,0 +1,105 @@
+"""Voice command latency on replayed audio: endpointed results vs early partial commits.
+
+Each WAV clip (16 kHz mono, one spoken command) is fed to Vosk block by block,
+followed by trailing silence, exactly like the live loop. For both paths we
+note the audio position at which the command would have fired - when
+AcceptWaveform endpoints with a command in the result, and when
+PartialCommandMatcher commits from the partial hypothesis - and report it
+relative to the end of speech (last block above the energy threshold).
+
+    python bench_commands.py clips/ [--blocksize 4096]
+"""
+import argparse
+import json
+import os
+import sys
+import wave
+import numpy as np
+from vosk import Model, KaldiRecognizer, SetLogLevel
+
+from partial_commands import PartialCommandMatcher
+from speech_config import BROWSER_COMMANDS, VOSK_MODEL_PATH
+
+SAMPLE_RATE = 16000
+
+
+def read_pcm16(path):
+    with wave.open(path, 'rb') as wav:
+        if wav.getsampwidth() != 2 or wav.getnchannels() != 1 or wav.getframerate() != SAMPLE_RATE:
+            raise ValueError(f"{path}: expected 16 kHz mono 16-bit PCM")
+        return np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+
+
+def speech_end(samples, blocksize, threshold=500):
+    """Audio time (s) at the end of the last block whose RMS is above threshold."""
+    end = 0.0
+    for start in range(0, len(samples), blocksize):
+        block = samples[start:start + blocksize].astype(np.float32)
+        if np.sqrt(np.mean(block ** 2)) > threshold:
+            end = min(start + blocksize, len(samples)) / SAMPLE_RATE
+    return end
+
+
+def replay_clip(model, samples, blocksize, trailing_silence=2.0):
+    """Return {'endpoint': (time, command), 'partial': (time, command)} for one clip."""
+    recognizer = KaldiRecognizer(model, SAMPLE_RATE)
+    matcher = PartialCommandMatcher(BROWSER_COMMANDS.keys())
+    audio = np.concatenate([samples, np.zeros(int(trailing_silence * SAMPLE_RATE), dtype=np.int16)])
+    fired = {'endpoint': None, 'partial': None}
+
+    for start in range(0, len(audio), blocksize):
+        position = min(start + blocksize, len(audio)) / SAMPLE_RATE
+        block = audio[start:start + blocksize].tobytes()
+        if recognizer.AcceptWaveform(block):
+            command = matcher.match(json.loads(recognizer.Result()).get("text", ""))
+            if command and fired['endpoint'] is None:
+                fired['endpoint'] = (position, command)
+        elif fired['partial'] is None:
+            command = matcher.update(json.loads(recognizer.PartialResult()).get("partial", ""))
+            if command:
+                fired['partial'] = (position, command)
+
+    if fired['endpoint'] is None:
+        command = matcher.match(json.loads(recognizer.FinalResult()).get("text", ""))
+        if command:
+            fired['endpoint'] = (len(audio) / SAMPLE_RATE, command)
+    return fired
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare endpointed vs early (partial) voice command latency.")
+    parser.add_argument("directory", help="Directory of single-command .wav clips")
+    parser.add_argument("--blocksize", type=int, default=4096, help="Samples per block, as in the live stream")
+    args = parser.parse_args()
+
+    paths = sorted(os.path.join(args.directory, f) for f in os.listdir(args.directory) if f.lower().endswith('.wav'))
+    if not paths:
+        sys.exit(f"❌ No .wav files in {args.directory}")
+
+    SetLogLevel(-1)
+    model = Model(VOSK_MODEL_PATH)
+    latencies = {'endpoint': [], 'partial': []}
+    improvements = []
+
+    print(f"{'clip':<28}{'command':<20}{'endpoint ms':>13}{'partial ms':>12}")
+    for path in paths:
+        samples = read_pcm16(path)
+        end = speech_end(samples, args.blocksize)
+        fired = replay_clip(model, samples, args.blocksize)
+        row = {}
+        for path_kind, hit in fired.items():
+            if hit is not None:
+                row[path_kind] = (hit[0] - end) * 1000
+                latencies[path_kind].append(row[path_kind])
+        if 'endpoint' in row and 'partial' in row:
+            improvements.append(row['endpoint'] - row['partial'])
+        command = (fired['partial'] or fired['endpoint'] or (None, '-'))[1]
+        cells = [f"{row[k]:>{w}.0f}" if k in row else f"{'miss':>{w}}" for k, w in (('endpoint', 13), ('partial', 12))]
+        print(f"{os.path.basename(path):<28}{command:<20}{cells[0]}{cells[1]}")
+
+    print("=" * 73)
+    for kind, values in latencies.items():
+        if values:
+            print(f"   {kind:<10} median {np.median(values):>6.0f} ms after end of speech ({len(values)}/{len(paths)} fired)")
+    if improvements:
+        print(f"⚡ Median improvement from early commit: {np.median(improvements):.0f} ms")
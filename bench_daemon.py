@@ -0,0 +1,83 @@
+"""Load test for the speech daemon: throughput and tail latency vs. concurrent clients.
+
+For each client count, that many clients connect to a running daemon and
+each sends --requests transcription requests back to back (clips from the
+directory, sent as PCM so the daemon's file reading isn't measured). Reported
+per level: requests/s, audio seconds per wall second, p50/p95/p99 request
+latency, and the daemon's mean batch size over the level.
+
+    python speech_daemon.py serve &
+    python bench_daemon.py clips/ [--clients 1 2 4 8] [--requests 10]
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+import numpy as np
+
+from batch_transcribe import SAMPLE_RATE, find_wavs, read_wav
+from speech_client import DEFAULT_SOCKET, SpeechClient
+from speech_config import float_to_pcm16
+
+
+def run_level(socket_path, clips, clients, requests):
+    """Run one concurrency level; returns (latencies_ms, errors, audio_s, wall_s)."""
+    latencies, errors = [], []
+    audio_s = [0.0]
+    lock = threading.Lock()
+    barrier = threading.Barrier(clients + 1)
+
+    def client_loop(index):
+        client = SpeechClient(socket_path)
+        barrier.wait()
+        for i in range(requests):
+            name, pcm = clips[(index + i) % len(clips)]
+            start = time.perf_counter()
+            reply = client.transcribe_audio(pcm, name=name)
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                if 'error' in reply:
+                    errors.append(reply['error'])
+                else:
+                    latencies.append(elapsed)
+                    audio_s[0] += len(pcm) / 2 / SAMPLE_RATE
+        client.close()
+
+    threads = [threading.Thread(target=client_loop, args=(i,), daemon=True) for i in range(clients)]
+    for t in threads:
+        t.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for t in threads:
+        t.join()
+    return latencies, errors, audio_s[0], time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test a running speech daemon.")
+    parser.add_argument("directory", help="Directory of 16 kHz mono .wav clips")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help="Daemon socket path")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 2, 4, 8], help="Concurrency levels")
+    parser.add_argument("--requests", type=int, default=10, help="Requests per client per level")
+    args = parser.parse_args()
+
+    paths = find_wavs(args.directory)
+    if not paths:
+        sys.exit(f"❌ No .wav files in {args.directory}")
+    clips = [(os.path.basename(p), float_to_pcm16(read_wav(p))) for p in paths]
+
+    stats = SpeechClient(args.socket)
+    print(f"{'clients':>8}{'req/s':>9}{'audio-s/s':>11}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'batch':>8}{'errors':>8}")
+    for clients in args.clients:
+        before = stats.request(op='stats')
+        latencies, errors, audio_s, wall = run_level(args.socket, clips, clients, args.requests)
+        after = stats.request(op='stats')
+        batches = after['batches'] - before['batches']
+        mean_batch = (after['requests'] - before['requests']) / batches if batches else float('nan')
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if latencies else [float('nan')] * 3
+        print(f"{clients:>8}{len(latencies) / wall:>9.2f}{audio_s / wall:>11.1f}"
+              f"{p50:>10.0f}{p95:>10.0f}{p99:>10.0f}{mean_batch:>8.1f}{len(errors):>8}")
+        for error in sorted(set(errors)):
+            print(f"   ❌ {error}")
+    stats.close()
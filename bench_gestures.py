@@ -0,0 +1,172 @@
+"""End-to-end gesture pipeline benchmark.
+
+Pushes recorded hand videos (or image sequences) through the same per-frame
+pipeline as GestureController.run - color conversion, hands.process and
+gesture decisions - without pacing, and reports sustained FPS plus per-stage
+timings. Pointer actions go to a RecordingPointer, so no desktop is touched.
+
+    python bench_gestures.py hands.mp4 [more.mp4 frames_dir/ ...] [--no-draw]
+    python bench_gestures.py hands.mp4 --backend legacy tasks   # compare hand trackers
+    python bench_gestures.py hands.mp4 --preprocess   # buffer reuse vs. per-frame copies
+"""
+import argparse
+import time
+import tracemalloc
+import cv2
+import numpy as np
+
+from frame_sources import open_frame_source
+from pointer_backend import RecordingPointer
+from virtual_mouse import GestureController
+
+STAGES = ['read', 'color', 'inference', 'decision', 'draw']
+
+
+def benchmark_source(source, max_frames=None, draw=True, warmup=5, backend='legacy'):
+    """Run one source through the pipeline and return per-frame stage timings (ms).
+    
+    With the async 'tasks' backend, 'inference' is only the submit cost; the
+    landmark results it delivered are counted separately because MediaPipe
+    drops frames while it is busy.
+    """
+    controller = GestureController(pointer=RecordingPointer())
+    controller.hand_backend = backend
+    controller.hands = controller.create_hand_tracker()
+    tracker = controller.hands
+    cap = open_frame_source(source, controller.frame_width, controller.frame_height)
+    if not cap.isOpened():
+        raise IOError(f"Could not open {source}")
+
+    per_frame = {stage: [] for stage in STAGES}
+    frames = 0
+    start = None
+    img = None
+    try:
+        while max_frames is None or frames < max_frames + warmup:
+            r0 = time.perf_counter()
+            success, img = cap.read(img)
+            read_time = time.perf_counter() - r0
+            if not success:
+                break
+
+            timings = {'read': read_time}
+            controller.process_frame(img, time.time(), timings=timings, draw=draw)
+            frames += 1
+
+            if frames == warmup:
+                start = time.perf_counter()
+            elif frames > warmup:
+                for stage in STAGES:
+                    per_frame[stage].append(timings.get(stage, 0.0) * 1000)
+    finally:
+        cap.release()
+        tracker.close()
+
+    measured = len(per_frame['read'])
+    elapsed = time.perf_counter() - start if start and measured else 0.0
+    return {
+        'name': cap.name,
+        'backend': tracker.name,
+        'frames': measured,
+        'results': getattr(tracker, 'delivered', frames),
+        'fps': measured / elapsed if elapsed > 0 else 0.0,
+        'stages': {stage: np.array(values) for stage, values in per_frame.items()},
+        'events': controller.pointer.events,
+    }
+
+
+def _preprocess_copying(img):
+    """The old preprocessing: a flipped copy plus an RGB copy every frame."""
+    flipped = cv2.flip(img, 1)
+    return flipped, cv2.cvtColor(flipped, cv2.COLOR_BGR2RGB)
+
+
+class _BufferedPreprocess:
+    """The current preprocessing: RGB into a reused buffer, preview flip into another."""
+
+    def __init__(self, shape):
+        self.rgb = np.empty(shape, dtype=np.uint8)
+        self.display = np.empty(shape, dtype=np.uint8)
+
+    def __call__(self, img):
+        return cv2.flip(img, 1, dst=self.display), cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=self.rgb)
+
+
+def benchmark_preprocess(frames, repeat=3):
+    """Compare per-frame copies with buffer reuse: ms/frame and bytes allocated per frame."""
+    results = {}
+    for name, preprocess in (('copying', _preprocess_copying),
+                             ('buffered', _BufferedPreprocess(frames[0].shape))):
+        # Throughput
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for img in frames:
+                preprocess(img)
+        ms_per_frame = (time.perf_counter() - start) * 1000 / (repeat * len(frames))
+
+        # Transient allocations: traced peak above the baseline, frame by frame
+        tracemalloc.start()
+        allocated = 0
+        for img in frames:
+            baseline = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            preprocess(img)
+            allocated += tracemalloc.get_traced_memory()[1] - baseline
+        tracemalloc.stop()
+        results[name] = {'ms_per_frame': ms_per_frame, 'bytes_per_frame': allocated / len(frames)}
+    return results
+
+
+def load_frames(source, max_frames=300):
+    cap = open_frame_source(source)
+    frames = []
+    while len(frames) < max_frames:
+        success, img = cap.read()
+        if not success:
+            break
+        frames.append(img)
+    cap.release()
+    return frames
+
+
+def print_report(result):
+    print(f"\n📹 {result['name']} [{result['backend']}]: {result['frames']} frames, sustained "
+          f"{result['fps']:.1f} FPS ({result['results']} landmark results, {len(result['events'])} pointer events)")
+    print(f"   {'stage':<12}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'share':>9}")
+    total = sum(values.sum() for values in result['stages'].values()) or 1.0
+    for stage, values in result['stages'].items():
+        if not len(values):
+            continue
+        print(f"   {stage:<12}{values.mean():>10.2f}{np.percentile(values, 50):>10.2f}"
+              f"{np.percentile(values, 95):>10.2f}{values.sum() / total:>8.0%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the gesture pipeline on recorded footage.")
+    parser.add_argument("sources", nargs="+", help="Video files, image directories or image globs")
+    parser.add_argument("--max-frames", type=int, default=None, help="Stop each source after N frames")
+    parser.add_argument("--no-draw", action="store_true", help="Skip landmark and debug drawing")
+    parser.add_argument("--backend", nargs="+", choices=['legacy', 'tasks'], default=['legacy'],
+                        help="Hand tracking backend(s) to run every source through")
+    parser.add_argument("--preprocess", action="store_true",
+                        help="Only benchmark frame preprocessing (allocation and throughput)")
+    args = parser.parse_args()
+
+    if args.preprocess:
+        for source in args.sources:
+            frames = load_frames(source, args.max_frames or 300)
+            if not frames:
+                print(f"❌ No frames in {source}")
+                continue
+            print(f"\n🧮 Preprocessing {len(frames)} frames of {source} ({frames[0].shape[1]}x{frames[0].shape[0]})")
+            for name, stats in benchmark_preprocess(frames).items():
+                print(f"   {name:<10}{stats['ms_per_frame']:>8.3f} ms/frame"
+                      f"{stats['bytes_per_frame'] / 1024:>12.0f} KiB allocated/frame")
+        raise SystemExit(0)
+
+    print("=" * 60)
+    print("🏁 Gesture pipeline benchmark (unpaced)")
+    print("=" * 60)
+    for source in args.sources:
+        for backend in args.backend:
+            print_report(benchmark_source(source, args.max_frames, draw=not args.no_draw, backend=backend))
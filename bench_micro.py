@@ -0,0 +1,217 @@
+"""Microbenchmarks for the per-frame and per-block hot functions, with regression checks.
+
+Runs headless: pyautogui, sounddevice, Whisper, Vosk and torch are replaced by
+inert stand-ins before the engines are imported, the gesture controller
+drives a RecordingPointer, and the speech commander is built without its
+models, microphone or Tk root. Inputs are synthetic and seeded.
+
+    python bench_micro.py                                  # run and print
+    python bench_micro.py --save-baseline bench_baseline.json
+    python bench_micro.py --baseline bench_baseline.json --threshold 0.25   # exit 1 on regressions
+"""
+import argparse
+import contextlib
+import io
+import json
+import sys
+import time
+import types
+from collections import deque
+import numpy as np
+
+HEADLESS_STUBS = ['pyautogui', 'sounddevice', 'whisper', 'vosk', 'torch']
+
+
+class _Inert(types.ModuleType):
+    """Module stand-in whose every attribute is a do-nothing callable."""
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return _Inert(name)
+
+    def __call__(self, *args, **kwargs):
+        return None
+
+
+def install_stubs():
+    for name in HEADLESS_STUBS:
+        sys.modules[name] = _Inert(name)
+
+
+# === SYNTHETIC INPUTS ===
+
+def synthetic_hands(n=256, seed=0):
+    """Cursor-pose hands drifting around the frame with landmark jitter, as (21, 3) arrays."""
+    rng = np.random.default_rng(seed)
+    base = np.zeros((21, 3))
+    base[:, 1] = 0.75
+    base[[5, 6, 7, 8], :2] = [[0.5, 0.6], [0.5, 0.5], [0.5, 0.42], [0.5, 0.35]]  # Straight index finger
+    base[4, :2] = [0.52, 0.36]                                                      # Thumb on the index tip
+    for tip, x in ((12, 0.35), (16, 0.3), (20, 0.25)):
+        base[tip, :2] = [x, 0.5]
+    hands = []
+    for i in range(n):
+        offset = 0.15 * np.array([np.sin(i / 20), np.cos(i / 31), 0.0])
+        hands.append(base + offset + rng.normal(0, 0.002, base.shape))
+    return hands
+
+
+def synthetic_commander():
+    """An EnhancedSpeechCommander with just the state the benchmarked methods use."""
+    from speech_commander import BROWSER_COMMANDS, EnhancedSpeechCommander
+    commander = EnhancedSpeechCommander.__new__(EnhancedSpeechCommander)
+    commander.browser_commands = {phrase: (lambda: None) for phrase in BROWSER_COMMANDS}
+    commander.samplerate = 16000
+    commander.blocksize = 4096
+    rng = np.random.default_rng(1)
+    start = 1000.0
+    commander.audio_segments = deque()
+    for i in range(int(30 * commander.samplerate / commander.blocksize)):
+        block = rng.integers(-3000, 3000, commander.blocksize, dtype=np.int16).tobytes()
+        commander.audio_segments.append((block, start + i * commander.blocksize / commander.samplerate))
+    commander.buffer_start_time = start
+    commander.last_stop_detection_time = start + 27.3
+    return commander
+
+
+# === BENCHMARKS ===
+
+def build_benchmarks():
+    """Return {name: zero-argument callable} for every hot function."""
+    from gesture_engine import GestureEngine, compute_features
+    from pointer_backend import RecordingPointer
+    from speech_commander import pcm16_to_float
+    from virtual_mouse import GestureController
+
+    controller = GestureController(pointer=RecordingPointer())
+    hands = synthetic_hands()
+    state = {'i': 0, 't': 0.0}
+
+    def process_gestures():
+        i = state['i'] = (state['i'] + 1) % len(hands)
+        state['t'] += 1 / 30
+        controller.process_gestures(hands[i].copy(), state['t'])
+        if len(controller.pointer.events) > 10000:
+            controller.pointer.events.clear()
+
+    def smooth_position():
+        state['t'] += 1 / 30
+        controller.smooth_position(960 + 200 * np.sin(state['t']), 540, state['t'])
+
+    def map_coordinates():
+        controller.map_coordinates(0.37, 0.61)
+
+    # Gesture geometry (pinch distances and finger angles, formerly calculate_finger_angle)
+    def features():
+        i = state['i'] = (state['i'] + 1) % len(hands)
+        compute_features(hands[i])
+
+    engine = GestureEngine(controller.gesture_engine.specs)
+
+    def engine_update():
+        i = state['i'] = (state['i'] + 1) % len(hands)
+        state['t'] += 1 / 30
+        engine.update(hands[i], state['t'])
+
+    commander = synthetic_commander()
+    texts = ["next tab", "please open the file explorer now", "this is ordinary dictated text", "zoom reset"]
+
+    def check_browser_command():
+        i = state['i'] = (state['i'] + 1) % len(texts)
+        commander._check_browser_command(texts[i])
+
+    def get_audio_up_to_stop_phrase():
+        commander._get_audio_up_to_stop_phrase()
+
+    pcm = np.random.default_rng(2).integers(-3000, 3000, 10 * 16000, dtype=np.int16).tobytes()
+
+    def audio_to_float():
+        pcm16_to_float(pcm)
+
+    return {
+        'GestureController.process_gestures': process_gestures,
+        'GestureController.smooth_position': smooth_position,
+        'GestureController.map_coordinates': map_coordinates,
+        'gesture_engine.compute_features': features,
+        'GestureEngine.update': engine_update,
+        'EnhancedSpeechCommander._check_browser_command': check_browser_command,
+        'EnhancedSpeechCommander._get_audio_up_to_stop_phrase (30 s)': get_audio_up_to_stop_phrase,
+        'pcm16_to_float (10 s)': audio_to_float,
+    }
+
+
+def measure(func, repeat=5, target_s=0.2):
+    """Best-of-`repeat` time per call in microseconds, with the loop count calibrated to target_s."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= target_s / 5 or number >= 1 << 20:
+            break
+        number *= 2
+    number = max(1, int(number * (target_s / 5) / max(elapsed, 1e-9)))
+
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - start) / number)
+    return {'us_per_call': best * 1e6, 'calls': number}
+
+
+def compare(results, baseline, threshold):
+    """Return [(name, baseline_us, current_us, change)] for functions slower than threshold."""
+    regressions = []
+    for name, result in results.items():
+        if name in baseline:
+            before = baseline[name]['us_per_call']
+            change = result['us_per_call'] / before - 1.0
+            if change > threshold:
+                regressions.append((name, before, result['us_per_call'], change))
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Microbenchmarks for the gesture and speech hot paths.")
+    parser.add_argument("--filter", default="", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing rounds per benchmark (best is kept)")
+    parser.add_argument("--save-baseline", metavar="JSON", help="Write the results as a new baseline")
+    parser.add_argument("--baseline", metavar="JSON", help="Compare against a saved baseline")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed slowdown vs. the baseline before failing (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    install_stubs()
+    with contextlib.redirect_stdout(io.StringIO()):  # Engines print on every action
+        benchmarks = build_benchmarks()
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+
+    results = {}
+    print(f"{'benchmark':<60}{'µs/call':>12}{'vs base':>10}")
+    for name, func in benchmarks.items():
+        if args.filter not in name:
+            continue
+        with contextlib.redirect_stdout(io.StringIO()):
+            results[name] = measure(func, repeat=args.repeat)
+        us = results[name]['us_per_call']
+        change = f"{us / baseline[name]['us_per_call'] - 1.0:>+9.0%}" if name in baseline else f"{'':>9}"
+        print(f"{name:<60}{us:>12.2f} {change}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump({'python': sys.version.split()[0], 'results': results}, f, indent=2)
+        print(f"💾 Baseline saved to {args.save_baseline}")
+
+    regressions = compare(results, baseline, args.threshold)
+    for name, before, after, change in regressions:
+        print(f"❌ {name}: {before:.2f} -> {after:.2f} µs/call ({change:+.0%}, limit {args.threshold:+.0%})")
+    if args.baseline and not regressions:
+        print(f"✅ No regressions beyond {args.threshold:.0%}")
+    sys.exit(1 if regressions else 0)
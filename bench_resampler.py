@@ -0,0 +1,114 @@
+"""Throughput, added latency and alias rejection of the capture resampler.
+
+For each native rate and channel count, synthetic audio is cut into capture
+blocks and converted exactly as AudioCapture.convert does (downmix, polyphase
+resample to 16 kHz, PCM16). Reported per configuration:
+
+    x realtime   audio seconds converted per CPU second
+    block ms     mean / p95 conversion time of one block
+    added ms     filter group delay + mean conversion time (latency on top of the block itself)
+    alias dB     level of a tone above 8 kHz after resampling, relative to a 1 kHz tone
+
+np.interp (linear interpolation, as batch_transcribe.read_wav used to do) is shown
+as a reference.
+
+    python bench_resampler.py [--seconds 30] [--block-ms 256]
+"""
+import argparse
+import time
+import numpy as np
+
+from audio_capture import PolyphaseResampler, float_to_pcm16
+
+OUT_RATE = 16000
+
+
+class InterpResampler:
+    """Per-block linear interpolation (no anti-aliasing filter), for comparison."""
+
+    delay_s = 0.0
+
+    def __init__(self, in_rate, out_rate=OUT_RATE):
+        self.ratio = in_rate / out_rate
+
+    def process(self, block):
+        n = int(len(block) / self.ratio)
+        return np.interp(np.arange(n) * self.ratio, np.arange(len(block)), block).astype(np.float32)
+
+
+def tone(rate, freq, seconds, channels):
+    t = np.arange(int(rate * seconds)) / rate
+    mono = 0.5 * np.sin(2 * np.pi * freq * t).astype(np.float32)
+    return np.repeat(mono[:, None], channels, axis=1)
+
+
+def convert_stream(resampler, audio, blocksize):
+    """Convert (frames, channels) audio block by block; returns (output samples, per-block seconds)."""
+    outputs, times = [], []
+    for start in range(0, len(audio), blocksize):
+        block = audio[start:start + blocksize]
+        t0 = time.perf_counter()
+        mono = block.mean(axis=1) if block.shape[1] > 1 else block.reshape(-1)
+        out = resampler.process(mono)
+        float_to_pcm16(out)
+        times.append(time.perf_counter() - t0)
+        outputs.append(out)
+    return np.concatenate(outputs), np.array(times)
+
+
+def level_db(samples):
+    return 20 * np.log10(np.sqrt(np.mean(samples.astype(np.float64) ** 2)) + 1e-12)
+
+
+def benchmark(make_resampler, rate, channels, seconds, block_ms):
+    blocksize = int(rate * block_ms / 1000)
+    rng = np.random.default_rng(0)
+    audio = (0.1 * rng.standard_normal((int(rate * seconds), channels))).astype(np.float32)
+    _, times = convert_stream(make_resampler(rate), audio, blocksize)
+
+    # Alias rejection: a tone between 8 kHz and the native Nyquist should vanish
+    skip = OUT_RATE // 10  # Ignore the filter's start-up transient
+    passband, _ = convert_stream(make_resampler(rate), tone(rate, 1000, 1.0, channels), blocksize)
+    alias_freq = 8000 + 0.3 * (rate / 2 - 8000)
+    aliased, _ = convert_stream(make_resampler(rate), tone(rate, alias_freq, 1.0, channels), blocksize)
+
+    resampler = make_resampler(rate)
+    return {
+        'realtime': seconds / times.sum(),
+        'block_ms': times.mean() * 1000,
+        'p95_ms': np.percentile(times, 95) * 1000,
+        'added_ms': resampler.delay_s * 1000 + times.mean() * 1000,
+        'alias_db': level_db(aliased[skip:]) - level_db(passband[skip:]),
+    }
+
+
+def check_streaming(rate, seconds=2.0):
+    """Max difference between block-wise and one-shot resampling (should be ~0)."""
+    rng = np.random.default_rng(1)
+    audio = rng.standard_normal(int(rate * seconds)).astype(np.float32)
+    whole = PolyphaseResampler(rate).process(audio)
+    streamed = PolyphaseResampler(rate)
+    cuts = np.sort(rng.integers(0, len(audio), 20))
+    parts = [streamed.process(part) for part in np.split(audio, cuts)]
+    return float(np.max(np.abs(np.concatenate(parts) - whole)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the native-rate capture resampler.")
+    parser.add_argument("--seconds", type=float, default=30.0, help="Audio per configuration")
+    parser.add_argument("--block-ms", type=float, default=256.0, help="Capture block length")
+    parser.add_argument("--rates", type=int, nargs="+", default=[22050, 32000, 44100, 48000])
+    parser.add_argument("--channels", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    print(f"{'resampler':<12}{'rate':>7}{'ch':>4}{'x realtime':>12}{'block ms':>10}{'p95 ms':>9}"
+          f"{'added ms':>10}{'alias dB':>10}")
+    for rate in args.rates:
+        for channels in args.channels:
+            for name, make in (('polyphase', PolyphaseResampler), ('np.interp', InterpResampler)):
+                r = benchmark(make, rate, channels, args.seconds, args.block_ms)
+                print(f"{name:<12}{rate:>7}{channels:>4}{r['realtime']:>12.0f}{r['block_ms']:>10.3f}"
+                      f"{r['p95_ms']:>9.3f}{r['added_ms']:>10.2f}{r['alias_db']:>10.1f}")
+    print("=" * 74)
+    for rate in args.rates:
+        print(f"   {rate} Hz: block-wise vs one-shot max difference {check_streaming(rate):.2e}")
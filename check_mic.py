@@ -9,13 +9,13 @@ try:
         # Check for input channels
         if device['max_input_channels'] > 0:
             # I've added the Max Channels information to the output
-            print(f"Input Device ID {i}: {device['name']} (Max Channels: {int(device['max_input_channels'])})")
+            print(f"Input Device ID {i}: {device['name']} (Max Channels: {int(device['max_input_channels'])}, native {device['default_samplerate']:.0f} Hz)")
     
     print("\n--------------------------")
     print("Your default input device is:")
     default_input_id = sd.default.device[0]
     default_device = devices[default_input_id]
-    print(f"--> Device ID {default_input_id}: {default_device['name']} (Max Channels: {int(default_device['max_input_channels'])})")
+    print(f"--> Device ID {default_input_id}: {default_device['name']} (Max Channels: {int(default_device['max_input_channels'])}, native {default_device['default_samplerate']:.0f} Hz)")
 
 except Exception as e:
     print(f"An error occurred: {e}")
\ No newline at end of file
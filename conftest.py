@@ -0,0 +1,2 @@
+# test_typing.py is a manual script that types into the focused window, not a test
+collect_ignore = ["test_typing.py"]
@@ -0,0 +1,101 @@
+import threading
+import time
+
+
+class CursorActuator(threading.Thread):
+    """Moves the cursor at display rate, interpolating between camera-rate targets.
+
+    The gesture loop only calls set_target(); this thread glides the cursor from
+    where it last put it towards the newest target over roughly one frame
+    interval, so the inference loop never sleeps on a tweened moveTo and the
+    cursor doesn't step at the camera frame rate.
+    """
+
+    def __init__(self, pointer, rate_hz=144, start_position=None, latency=None):
+        super().__init__(daemon=True, name="CursorActuator")
+        self.pointer = pointer
+        self.rate_hz = rate_hz
+        self.latency = latency  # Optional LatencyTracker for actuation/end-to-end times
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.target_event = threading.Event()
+
+        # Position we last set ourselves; the OS is only queried once at start
+        if start_position is None:
+            start_position = pointer.position()
+        self.position = (float(start_position[0]), float(start_position[1]))
+        self.last_moved = (int(start_position[0]), int(start_position[1]))
+
+        # Current segment being interpolated
+        self.segment_start = self.position
+        self.segment_end = self.position
+        self.segment_time = time.perf_counter()
+        self.last_target_time = None
+        self.frame_interval = 1.0 / 30  # EMA of the time between targets
+        self.pending = None  # (capture_time, target_time) of a target not yet acted on
+
+    def set_target(self, x, y, capture_time=None):
+        """Queue a new cursor target (called from the gesture loop, never blocks)."""
+        now = time.perf_counter()
+        with self.lock:
+            if self.pending is None:
+                self.pending = (capture_time if capture_time is not None else now, now)
+            if self.last_target_time is not None:
+                interval = now - self.last_target_time
+                if interval < 0.25:
+                    self.frame_interval = 0.8 * self.frame_interval + 0.2 * interval
+            self.last_target_time = now
+
+            self.segment_start = self.position
+            self.segment_end = (float(x), float(y))
+            self.segment_time = now
+        self.target_event.set()
+
+    def _step(self, now):
+        with self.lock:
+            progress = (now - self.segment_time) / self.frame_interval
+            progress = max(0.0, min(1.0, progress))
+            start, end = self.segment_start, self.segment_end
+            x = start[0] + (end[0] - start[0]) * progress
+            y = start[1] + (end[1] - start[1]) * progress
+            self.position = (x, y)
+            settled = progress >= 1.0
+            pending = self.pending
+
+        pixel = (int(round(x)), int(round(y)))
+        if pixel != self.last_moved:
+            self.pointer.move_to(pixel[0], pixel[1])
+            self.last_moved = pixel
+            if pending is not None:
+                with self.lock:
+                    if self.pending is pending:  # A newer target keeps its own sample
+                        self.pending = None
+                if self.latency:
+                    moved = time.perf_counter()
+                    self.latency.add('actuation', moved - pending[1])
+                    self.latency.add('end_to_end', moved - pending[0])
+        return settled
+
+    def run(self):
+        tick = 1.0 / self.rate_hz
+        next_tick = time.perf_counter()
+        while not self.stop_event.is_set():
+            self.target_event.clear()
+            settled = self._step(time.perf_counter())
+
+            if settled:
+                # Nothing to interpolate: sleep until a new target arrives
+                self.target_event.wait(0.1)
+                next_tick = time.perf_counter()
+                continue
+
+            next_tick += tick
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_tick = time.perf_counter()
+
+    def stop(self):
+        self.stop_event.set()
+        self.target_event.set()
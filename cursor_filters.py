@@ -0,0 +1,280 @@
+import math
+import sys
+import numpy as np
+from collections import deque
+
+
+class MovingAverageFilter:
+    """Linearly weighted moving average (the original cursor smoothing)."""
+
+    def __init__(self, window=3):
+        self.window = window
+        self.history = deque(maxlen=window)
+
+    def reset(self):
+        self.history.clear()
+
+    def __call__(self, x, y, timestamp):
+        self.history.append((x, y))
+
+        if len(self.history) < 2:
+            return x, y
+
+        total_weight = 0
+        smooth_x = 0
+        smooth_y = 0
+
+        for i, (px, py) in enumerate(self.history):
+            weight = (i + 1) / len(self.history)
+            smooth_x += px * weight
+            smooth_y += py * weight
+            total_weight += weight
+
+        return smooth_x / total_weight, smooth_y / total_weight
+
+
+class _LowPass:
+    """First-order exponential low-pass used by the One Euro filter."""
+
+    def __init__(self):
+        self.value = None
+
+    def __call__(self, value, alpha):
+        if self.value is None:
+            self.value = value
+        else:
+            self.value = alpha * value + (1 - alpha) * self.value
+        return self.value
+
+
+class OneEuroFilter:
+    """One Euro filter: low cutoff at rest, higher cutoff as the hand speeds up.
+
+    min_cutoff (Hz) controls jitter at rest, beta controls how quickly the
+    cutoff rises with speed (less lag on fast moves), d_cutoff (Hz) smooths
+    the speed estimate itself.
+    """
+
+    def __init__(self, min_cutoff=1.0, beta=0.03, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reset()
+
+    def reset(self):
+        self.x_filter = [_LowPass(), _LowPass()]
+        self.dx_filter = [_LowPass(), _LowPass()]
+        self.last_raw = None
+        self.last_time = None
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def __call__(self, x, y, timestamp):
+        if self.last_time is None or timestamp <= self.last_time:
+            self.last_time = timestamp
+            self.last_raw = (x, y)
+            return self.x_filter[0](x, 1.0), self.x_filter[1](y, 1.0)
+
+        dt = timestamp - self.last_time
+        self.last_time = timestamp
+
+        out = []
+        for axis, value in enumerate((x, y)):
+            dx = (value - self.last_raw[axis]) / dt
+            edx = self.dx_filter[axis](dx, self._alpha(self.d_cutoff, dt))
+            cutoff = self.min_cutoff + self.beta * abs(edx)
+            out.append(self.x_filter[axis](value, self._alpha(cutoff, dt)))
+
+        self.last_raw = (x, y)
+        return out[0], out[1]
+
+
+class KalmanPredictor:
+    """Constant-velocity Kalman filter that extrapolates ahead by `lookahead` seconds.
+
+    process_noise is the acceleration noise density (px/s^2), measurement_noise
+    the landmark noise (px). A positive lookahead compensates for capture and
+    inference latency.
+    """
+
+    def __init__(self, process_noise=3000.0, measurement_noise=4.0, lookahead=0.03):
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+        self.lookahead = lookahead
+        self.reset()
+
+    def reset(self):
+        self.state = None   # [x, y, vx, vy]
+        self.covariance = None
+        self.last_time = None
+
+    def __call__(self, x, y, timestamp):
+        measurement = np.array([x, y], dtype=np.float64)
+
+        if self.state is None:
+            self.state = np.array([x, y, 0.0, 0.0])
+            self.covariance = np.diag([self.measurement_noise ** 2] * 2 + [1e6] * 2)
+            self.last_time = timestamp
+            return x, y
+
+        dt = max(timestamp - self.last_time, 1e-3)
+        self.last_time = timestamp
+
+        # Predict
+        F = np.eye(4)
+        F[0, 2] = F[1, 3] = dt
+        q = self.process_noise ** 2
+        q_pp, q_pv, q_vv = dt ** 4 / 4, dt ** 3 / 2, dt ** 2
+        Q = q * np.array([[q_pp, 0, q_pv, 0],
+                          [0, q_pp, 0, q_pv],
+                          [q_pv, 0, q_vv, 0],
+                          [0, q_pv, 0, q_vv]])
+        self.state = F @ self.state
+        self.covariance = F @ self.covariance @ F.T + Q
+
+        # Update (H selects the position components)
+        S = self.covariance[:2, :2] + np.eye(2) * self.measurement_noise ** 2
+        K = self.covariance[:, :2] @ np.linalg.inv(S)
+        self.state = self.state + K @ (measurement - self.state[:2])
+        self.covariance = self.covariance - K @ self.covariance[:2, :]
+
+        predicted = self.state[:2] + self.state[2:] * self.lookahead
+        return float(predicted[0]), float(predicted[1])
+
+
+CURSOR_FILTERS = {
+    'moving_average': MovingAverageFilter,
+    'one_euro': OneEuroFilter,
+    'kalman': KalmanPredictor,
+}
+
+
+def create_cursor_filter(kind, **params):
+    """Build a cursor filter by name ('moving_average', 'one_euro', 'kalman')."""
+    if kind not in CURSOR_FILTERS:
+        raise ValueError(f"Unknown cursor filter '{kind}'. Choose from: {', '.join(CURSOR_FILTERS)}")
+    return CURSOR_FILTERS[kind](**params)
+
+
+# === TRACE EVALUATION ===
+
+def apply_filter(cursor_filter, timestamps, positions):
+    """Run a filter over a recorded trace and return the filtered (N, 2) positions."""
+    cursor_filter.reset()
+    return np.array([cursor_filter(x, y, t) for t, (x, y) in zip(timestamps, positions)])
+
+
+def evaluate_trace(cursor_filter, timestamps, positions, rest_speed=40.0, min_rest_samples=10,
+                   max_lag=0.3, speed_window=5):
+    """Measure jitter (px RMS at rest) and lag (ms) of a filter on a recorded trace.
+
+    Rest samples are runs where the raw speed stays below rest_speed px/s; jitter
+    is the RMS deviation of the filtered cursor from its mean over each run. Lag is
+    the time shift that best aligns the filtered output with the raw trace during
+    motion (negative when the filter predicts ahead).
+    """
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    positions = np.asarray(positions, dtype=np.float64)
+    filtered = apply_filter(cursor_filter, timestamps, positions)
+
+    # Speed over a +/- speed_window span so landmark noise alone does not count as motion
+    n = len(timestamps)
+    ahead = np.minimum(np.arange(n) + speed_window, n - 1)
+    behind = np.maximum(np.arange(n) - speed_window, 0)
+    span = np.maximum(timestamps[ahead] - timestamps[behind], 1e-6)
+    speed = np.linalg.norm(positions[ahead] - positions[behind], axis=1) / span
+    at_rest = speed < rest_speed
+
+    # Jitter: RMS around the mean of every sufficiently long rest run
+    deviations = []
+    start = None
+    for i, rest in enumerate(np.append(at_rest, False)):
+        if rest and start is None:
+            start = i
+        elif not rest and start is not None:
+            if i - start >= min_rest_samples:
+                run = filtered[start:i]
+                deviations.append(run - run.mean(axis=0))
+            start = None
+    jitter = float(np.sqrt(np.mean(np.sum(np.concatenate(deviations) ** 2, axis=1)))) if deviations else float('nan')
+
+    # Lag: shift of the raw trace that best matches the filtered output while moving
+    moving = ~at_rest
+    lag_ms = float('nan')
+    if moving.sum() >= min_rest_samples:
+        shifts = np.arange(-max_lag, max_lag + 1e-9, 0.001)
+        errors = []
+        for shift in shifts:
+            shifted_x = np.interp(timestamps - shift, timestamps, positions[:, 0])
+            shifted_y = np.interp(timestamps - shift, timestamps, positions[:, 1])
+            err = (filtered[moving, 0] - shifted_x[moving]) ** 2 + (filtered[moving, 1] - shifted_y[moving]) ** 2
+            errors.append(err.mean())
+        lag_ms = float(shifts[int(np.argmin(errors))] * 1000)
+
+    return {'jitter_px': jitter, 'lag_ms': lag_ms, 'rest_samples': int(at_rest.sum()),
+            'moving_samples': int(moving.sum())}
+
+
+def synthetic_trace(fps=30, noise_px=2.0, seed=0):
+    """Rest, sweep, rest: a hand-like trace with landmark noise for quick comparisons."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(0, 6, 1.0 / fps)
+    x = np.full_like(t, 800.0)
+    y = np.full_like(t, 500.0)
+    moving = (t >= 2) & (t < 4)
+    phase = (t[moving] - 2) / 2
+    x[moving] = 800 + 400 * np.sin(2 * np.pi * phase)
+    y[moving] = 500 + 200 * np.sin(4 * np.pi * phase)
+    positions = np.stack([x, y], axis=1) + rng.normal(0, noise_px, (len(t), 2))
+    return t, positions
+
+
+def load_position_trace(path, screen_size=(1920, 1080)):
+    """Load a cursor trace: 'timestamps' and 'positions' in screen px, or a
+    landmark trace from gesture_trace.py (index fingertip scaled to the screen)."""
+    with np.load(path) as data:
+        if 'positions' in data:
+            return data['timestamps'], data['positions']
+        present = data['hand_present']
+        tips = data['landmarks'][present, 8, :2].astype(np.float64)
+        return data['timestamps'][present], tips * np.array(screen_size, dtype=np.float64)
+
+
+def _parse_params(pairs):
+    params = {}
+    for pair in pairs:
+        key, value = pair.split('=', 1)
+        kind, name = key.split('.', 1)
+        params.setdefault(kind, {})[name] = int(value) if value.lstrip('-').isdigit() else float(value)
+    return params
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compare cursor filters on a recorded trace.")
+    parser.add_argument("trace", nargs="?", help="Cursor or landmark trace .npz. Synthetic if omitted.")
+    parser.add_argument("--set", action="append", default=[], metavar="FILTER.PARAM=VALUE",
+                        help="Override a filter parameter, e.g. one_euro.min_cutoff=0.5")
+    args = parser.parse_args()
+
+    if args.trace:
+        timestamps, positions = load_position_trace(args.trace)
+    else:
+        print("No trace given, using a synthetic rest/sweep/rest trace.")
+        timestamps, positions = synthetic_trace()
+
+    try:
+        overrides = _parse_params(args.set)
+    except ValueError:
+        print("❌ Parameters must look like filter.param=value")
+        sys.exit(1)
+
+    print(f"{'filter':<16}{'jitter (px RMS)':>18}{'lag (ms)':>12}")
+    print("-" * 46)
+    for kind in CURSOR_FILTERS:
+        stats = evaluate_trace(create_cursor_filter(kind, **overrides.get(kind, {})), timestamps, positions)
+        print(f"{kind:<16}{stats['jitter_px']:>18.2f}{stats['lag_ms']:>12.1f}")
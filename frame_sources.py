@@ -0,0 +1,128 @@
+import glob
+import os
+import time
+import cv2
+import numpy as np
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+
+class CameraSource:
+    """Live webcam frames from cv2.VideoCapture."""
+
+    is_live = True
+
+    def __init__(self, index=0, width=640, height=480, fps=30):
+        self.name = f"camera {index}"
+        self.cap = cv2.VideoCapture(index)
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        self.cap.set(cv2.CAP_PROP_FPS, fps)
+        # Keep only the newest frame so a throttled reader never sees stale images
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def read(self, buffer=None):
+        return self.cap.read(buffer)
+
+    def release(self):
+        self.cap.release()
+
+
+class VideoFileSource:
+    """Frames decoded from a recorded video file, as fast as they can be read."""
+
+    is_live = False
+
+    def __init__(self, path):
+        self.name = os.path.basename(path)
+        self.cap = cv2.VideoCapture(path)
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def read(self, buffer=None):
+        return self.cap.read(buffer)
+
+    def release(self):
+        self.cap.release()
+
+
+class ImageSequenceSource:
+    """Frames read from a directory of images or a glob pattern, in sorted order."""
+
+    is_live = False
+
+    def __init__(self, pattern):
+        if os.path.isdir(pattern):
+            self.name = os.path.basename(os.path.normpath(pattern))
+            paths = [os.path.join(pattern, f) for f in os.listdir(pattern)]
+        else:
+            self.name = pattern
+            paths = glob.glob(pattern)
+        self.paths = sorted(p for p in paths if p.lower().endswith(IMAGE_EXTENSIONS))
+        self.index = 0
+
+    def isOpened(self):
+        return bool(self.paths)
+
+    def read(self, buffer=None):
+        while self.index < len(self.paths):
+            img = cv2.imread(self.paths[self.index])
+            self.index += 1
+            if img is not None:
+                return True, img
+        return False, None
+
+    def release(self):
+        self.paths = []
+
+
+class SyntheticTargetSource:
+    """Live-paced frames of a white dot moving on a known path (latency self-test)."""
+
+    is_live = True
+
+    def __init__(self, width=640, height=480, fps=30, period=2.0, radius=8):
+        self.name = "synthetic target"
+        self.width, self.height = width, height
+        self.interval = 1.0 / fps
+        self.period = period
+        self.radius = radius
+        self.start = time.perf_counter()
+        self.next_frame = self.start
+
+    def position(self, t):
+        """Normalized dot position at perf_counter time t (works on arrays)."""
+        phase = 2 * np.pi * (np.asarray(t) - self.start) / self.period
+        return 0.5 + 0.25 * np.sin(phase), 0.5 + 0.15 * np.sin(2 * phase)
+
+    def isOpened(self):
+        return True
+
+    def read(self, buffer=None):
+        delay = self.next_frame - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        self.next_frame = max(self.next_frame + self.interval, time.perf_counter())
+
+        x, y = self.position(time.perf_counter())
+        img = np.zeros((self.height, self.width, 3), dtype=np.uint8)
+        cv2.circle(img, (int(x * self.width), int(y * self.height)), self.radius, (255, 255, 255), -1)
+        return True, img
+
+    def release(self):
+        pass
+
+
+def open_frame_source(source=0, width=640, height=480, fps=30):
+    """Open a camera index, video file, image directory or image glob as a frame source."""
+    if hasattr(source, 'read'):
+        return source  # Already a frame source
+    if isinstance(source, int) or (isinstance(source, str) and source.isdigit()):
+        return CameraSource(int(source), width, height, fps)
+    if os.path.isdir(source) or any(c in source for c in '*?['):
+        return ImageSequenceSource(source)
+    return VideoFileSource(source)
@@ -0,0 +1,245 @@
+import json
+import os
+import numpy as np
+
+# Feature vector layout: fingertip-to-thumb distances, then PIP joint angles
+FINGERS = ['index', 'middle', 'ring', 'little']
+FEATURES = [f"{finger}_pinch" for finger in FINGERS] + [f"{finger}_angle" for finger in FINGERS]
+FEATURE_INDEX = {name: i for i, name in enumerate(FEATURES)}
+
+TIP_IDS = [8, 12, 16, 20]
+PIP_IDS = [6, 10, 14, 18]
+MCP_IDS = [5, 9, 13, 17]
+THUMB_TIP = 4
+
+
+def landmarks_to_array(landmarks):
+    """Convert MediaPipe landmarks (or anything with .x/.y/.z) to a (21, 3) array."""
+    if isinstance(landmarks, np.ndarray):
+        return landmarks
+    return np.array([(lm.x, lm.y, lm.z) for lm in landmarks], dtype=np.float64)
+
+
+def compute_features(points):
+    """Compute the gesture feature vector for one hand in a single vectorized pass."""
+    xy = points[:, :2]
+    tips = xy[TIP_IDS]
+    pinch = np.linalg.norm(tips - xy[THUMB_TIP], axis=1)
+
+    v1 = xy[PIP_IDS] - xy[MCP_IDS]
+    v2 = tips - xy[PIP_IDS]
+    norms = np.linalg.norm(v1, axis=1) * np.linalg.norm(v2, axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cosine = np.sum(v1 * v2, axis=1) / norms
+    angle = np.degrees(np.arccos(np.clip(np.nan_to_num(cosine, nan=1.0), -1.0, 1.0)))
+
+    return np.concatenate([pinch, angle])
+
+
+class GestureSpec:
+    """A gesture declared as feature constraints.
+
+    constraints is a list of dicts: {"feature": "middle_pinch", "max": 0.04,
+    "release_max": 0.055}. min/max must hold to enter the gesture; while the
+    gesture is held release_min/release_max are checked instead, which gives
+    hysteresis. A bound without a release_* counterpart keeps applying while
+    the gesture is held.
+    """
+
+    def __init__(self, name, action, priority, constraints, mode=None):
+        self.name = name
+        self.action = action
+        self.priority = priority
+        self.constraints = constraints
+        self.mode = mode or name.upper()
+
+    @classmethod
+    def from_dict(cls, data):
+        constraints = data.get('constraints', [])
+        for c in constraints:
+            if c.get('feature') not in FEATURE_INDEX:
+                raise ValueError(f"Gesture {data['name']!r}: unknown feature {c.get('feature')!r} "
+                                 f"(expected one of {', '.join(FEATURES)})")
+        return cls(data['name'], data.get('action', data['name']), data.get('priority', 0),
+                   constraints, data.get('mode'))
+
+    def to_dict(self):
+        return {'name': self.name, 'action': self.action, 'priority': self.priority,
+                'mode': self.mode, 'constraints': self.constraints}
+
+
+def default_gesture_specs(thresholds, release_thresholds, bent_angle=160):
+    """The built-in gestures: left click, right click, scroll and cursor control."""
+    # Only checked on entry: release bounds span the whole range of the feature
+    index_apart = {'feature': 'index_pinch', 'min': thresholds['cursor_control'], 'release_min': 0.0}
+
+    def pinch(finger, gesture):
+        return [
+            {'feature': f'{finger}_pinch', 'max': thresholds[gesture],
+             'release_max': release_thresholds[gesture]},
+            {'feature': f'{finger}_angle', 'max': bent_angle, 'release_max': 180.0},  # Finger bent/touching
+            index_apart,  # Index should NOT be touching
+        ]
+
+    return [
+        GestureSpec('left_click', 'left_click', 40, pinch('middle', 'left_click')),
+        GestureSpec('right_click', 'right_click', 30, pinch('little', 'right_click')),
+        GestureSpec('scroll', 'scroll', 20, pinch('ring', 'scroll')),
+        GestureSpec('cursor', 'cursor', 10, [
+            {'feature': 'index_pinch', 'max': thresholds['cursor_control'],
+             'release_max': thresholds['cursor_control']},
+            # Other fingers should NOT be touching
+            {'feature': 'middle_pinch', 'min': thresholds['left_click'], 'release_min': thresholds['left_click']},
+            {'feature': 'little_pinch', 'min': thresholds['right_click'], 'release_min': thresholds['right_click']},
+            {'feature': 'ring_pinch', 'min': thresholds['scroll'], 'release_min': thresholds['scroll']},
+        ]),
+    ]
+
+
+def load_gesture_file(path):
+    """Load user gestures from a JSON file ({"gestures": [...]}); missing file means none."""
+    if not path or not os.path.exists(path):
+        return []
+    with open(path, 'r') as f:
+        data = json.load(f)
+    try:
+        return [GestureSpec.from_dict(g) for g in data.get('gestures', [])]
+    except ValueError as e:
+        raise ValueError(f"{path}: {e}") from None
+
+
+def save_gesture_file(path, specs):
+    with open(path, 'w') as f:
+        json.dump({'gestures': [spec.to_dict() for spec in specs]}, f, indent=2)
+
+
+class GestureEngine:
+    """Evaluates every declared gesture against the feature vector in one pass.
+
+    Gesture bounds live in (G, F) arrays, so adding gestures grows the arrays
+    rather than the per-frame Python work. The active gesture is sticky while
+    its release bounds hold; otherwise the highest-priority gesture whose enter
+    bounds all hold wins.
+    """
+
+    def __init__(self, specs, smoothing=0.6):
+        self.smoothing = smoothing  # Weight of the newest frame (1.0 = no smoothing)
+        self.set_gestures(specs)
+        self.reset()
+
+    def set_gestures(self, specs):
+        # Later specs with the same name replace earlier ones (user overrides)
+        by_name = {}
+        for spec in specs:
+            by_name[spec.name] = spec
+        self.specs = list(by_name.values())
+        self.index = {spec.name: i for i, spec in enumerate(self.specs)}
+
+        shape = (len(self.specs), len(FEATURES))
+        self.enter_lo = np.full(shape, -np.inf)
+        self.enter_hi = np.full(shape, np.inf)
+        self.hold_lo = np.full(shape, -np.inf)
+        self.hold_hi = np.full(shape, np.inf)
+        for g, spec in enumerate(self.specs):
+            for c in spec.constraints:
+                f = FEATURE_INDEX[c['feature']]
+                self.enter_lo[g, f] = max(self.enter_lo[g, f], c.get('min', -np.inf))
+                self.enter_hi[g, f] = min(self.enter_hi[g, f], c.get('max', np.inf))
+                self.hold_lo[g, f] = max(self.hold_lo[g, f], c.get('release_min', c.get('min', -np.inf)))
+                self.hold_hi[g, f] = min(self.hold_hi[g, f], c.get('release_max', c.get('max', np.inf)))
+        self.priorities = np.array([spec.priority for spec in self.specs], dtype=np.float64)
+
+    def reset(self):
+        self.points = None
+        self.features = None
+        self.active = None   # Index of the held gesture
+        self.press_time = None
+
+    def spec(self, name):
+        return self.specs[self.index[name]]
+
+    def held_for(self, timestamp):
+        return timestamp - self.press_time if self.active is not None else 0.0
+
+    def update(self, points, timestamp):
+        """Classify one frame of (21, 3) landmarks.
+
+        Returns (active_name, pressed, released_name): the gesture now held (or
+        None), whether it was pressed on this frame, and the gesture released on
+        this frame (or None).
+        """
+        if self.points is None:
+            self.points = np.array(points, dtype=np.float64)
+        else:
+            self.points += self.smoothing * (points - self.points)
+        self.features = compute_features(self.points)
+
+        features = self.features
+        if self.active is not None:
+            a = self.active
+            if np.all((features >= self.hold_lo[a]) & (features <= self.hold_hi[a])):
+                return self.specs[a].name, False, None
+
+        released = self.specs[self.active].name if self.active is not None else None
+        matched = np.all((features >= self.enter_lo) & (features <= self.enter_hi), axis=1)
+        if not matched.any():
+            self.active = None
+            return None, False, released
+
+        self.active = int(np.argmax(np.where(matched, self.priorities, -np.inf)))
+        self.press_time = timestamp
+        return self.specs[self.active].name, True, released
+
+    def release(self):
+        """Drop the held gesture (e.g. hand lost) and return its name, if any."""
+        released = self.specs[self.active].name if self.active is not None else None
+        self.reset()
+        return released
+
+    def feature(self, name):
+        return float(self.features[FEATURE_INDEX[name]]) if self.features is not None else float('inf')
+
+
+def calibrate_gesture(feature_rows, name, action, priority=25, margin=0.15, low=5, high=95):
+    """Derive a GestureSpec from sample feature vectors of a user performing it.
+
+    Every feature gets enter bounds at the low/high percentiles widened by
+    `margin` of their spread, and release bounds twice as wide.
+    """
+    rows = np.asarray(feature_rows, dtype=np.float64)
+    lo = np.percentile(rows, low, axis=0)
+    hi = np.percentile(rows, high, axis=0)
+    pad = (hi - lo) * margin + 1e-3
+    constraints = []
+    for f, feature in enumerate(FEATURES):
+        constraints.append({
+            'feature': feature,
+            'min': round(float(lo[f] - pad[f]), 4), 'max': round(float(hi[f] + pad[f]), 4),
+            'release_min': round(float(lo[f] - 2 * pad[f]), 4), 'release_max': round(float(hi[f] + 2 * pad[f]), 4),
+        })
+    return GestureSpec(name, action, priority, constraints)
+
+
+if __name__ == "__main__":
+    import argparse
+    from gesture_trace import load_trace
+
+    parser = argparse.ArgumentParser(description="Calibrate a custom gesture from a landmark trace.")
+    parser.add_argument("trace", help="Trace .npz of the user holding the new gesture")
+    parser.add_argument("--name", required=True, help="Gesture name")
+    parser.add_argument("--action", required=True, help="Action, e.g. hotkey:ctrl+c or left_click")
+    parser.add_argument("--priority", type=int, default=25, help="Higher wins when gestures overlap")
+    parser.add_argument("--output", default="gestures.json", help="Gesture file to add it to")
+    args = parser.parse_args()
+
+    trace = load_trace(args.trace)
+    rows = [compute_features(points.astype(np.float64))
+            for points, present in zip(trace['landmarks'], trace['hand_present']) if present]
+    if not rows:
+        print("❌ No hand frames in trace")
+        raise SystemExit(1)
+
+    spec = calibrate_gesture(rows, args.name, args.action, args.priority)
+    specs = [s for s in load_gesture_file(args.output) if s.name != spec.name] + [spec]
+    save_gesture_file(args.output, specs)
+    print(f"✓ Calibrated '{spec.name}' -> {spec.action} from {len(rows)} frames, saved to {args.output}")
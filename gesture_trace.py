@@ -0,0 +1,195 @@
+import time
+import numpy as np
+from collections import namedtuple
+
+from pointer_backend import RecordingPointer
+from gesture_engine import landmarks_to_array
+
+NUM_LANDMARKS = 21
+
+# Stands in for a MediaPipe NormalizedLandmark during replay
+TraceLandmark = namedtuple('TraceLandmark', ['x', 'y', 'z'])
+
+
+class TraceRecorder:
+    """Collects per-frame hand landmarks and saves them as a compressed .npz trace.
+
+    The trace holds 'timestamps' (N,), 'landmarks' (N, 21, 3) float32 and
+    'hand_present' (N,) bool; frames without a hand keep zeroed landmarks.
+    """
+
+    def __init__(self):
+        self.timestamps = []
+        self.landmarks = []
+        self.hand_present = []
+        self.label_times = []
+        self.label_gestures = []
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def add(self, timestamp, landmarks):
+        """Add a frame: a (21, 3) array or MediaPipe landmarks, or None for no hand."""
+        self.timestamps.append(timestamp)
+        if landmarks is not None and len(landmarks):
+            self.landmarks.append(np.asarray(landmarks_to_array(landmarks), dtype=np.float32))
+            self.hand_present.append(True)
+        else:
+            self.landmarks.append(np.zeros((NUM_LANDMARKS, 3), dtype=np.float32))
+            self.hand_present.append(False)
+
+    def add_label(self, timestamp, gesture):
+        """Mark the moment an intended gesture (e.g. 'left_click') begins."""
+        self.label_times.append(timestamp)
+        self.label_gestures.append(gesture)
+
+    def save(self, path):
+        np.savez_compressed(
+            path,
+            timestamps=np.asarray(self.timestamps, dtype=np.float64),
+            landmarks=np.stack(self.landmarks) if self.landmarks else np.zeros((0, NUM_LANDMARKS, 3), np.float32),
+            hand_present=np.asarray(self.hand_present, dtype=bool),
+            label_times=np.asarray(self.label_times, dtype=np.float64),
+            label_gestures=np.asarray(self.label_gestures, dtype=str),
+        )
+
+
+def load_trace(path):
+    """Load a landmark trace written by TraceRecorder (labels are optional)."""
+    with np.load(path) as data:
+        return {
+            'timestamps': data['timestamps'],
+            'landmarks': data['landmarks'],
+            'hand_present': data['hand_present'],
+            'label_times': data['label_times'] if 'label_times' in data else np.zeros(0),
+            'label_gestures': data['label_gestures'] if 'label_gestures' in data else np.zeros(0, dtype=str),
+        }
+
+
+def trace_frames(trace):
+    """Convert a loaded trace into (timestamp, landmarks-or-None) replay frames."""
+    frames = []
+    for timestamp, points, present in zip(trace['timestamps'], trace['landmarks'], trace['hand_present']):
+        if present:
+            frames.append((float(timestamp), [TraceLandmark(*map(float, p)) for p in points]))
+        else:
+            frames.append((float(timestamp), None))
+    return frames
+
+
+def replay_trace(trace, controller=None, screen_size=(1920, 1080)):
+    """Drive GestureController.process_gestures from a trace without camera or desktop.
+
+    Returns the recorded pointer events plus decision-loop throughput. Cursor
+    moves go straight to the RecordingPointer (no actuator thread), and all
+    gesture timing uses the trace timestamps.
+    """
+    from virtual_mouse import GestureController
+
+    if isinstance(trace, str):
+        trace = load_trace(trace)
+    frames = trace_frames(trace)
+
+    if controller is None:
+        controller = GestureController(pointer=RecordingPointer(screen_size))
+    pointer = controller.pointer
+    clock = {'t': 0.0}
+    if isinstance(pointer, RecordingPointer):
+        pointer.clock = lambda: clock['t']
+
+    start = time.perf_counter()
+    for timestamp, landmarks in frames:
+        clock['t'] = timestamp
+        if landmarks is None:
+            controller.handle_no_hand(timestamp)
+        else:
+            controller.process_gestures(landmarks, timestamp)
+    elapsed = time.perf_counter() - start
+
+    return {
+        'events': getattr(pointer, 'events', []),
+        'frames': len(frames),
+        'elapsed': elapsed,
+        'frames_per_second': len(frames) / elapsed if elapsed > 0 else float('inf'),
+    }
+
+
+def detected_gestures(events):
+    """Turn pointer events into (timestamp, gesture) detections for evaluation."""
+    detections = []
+    for event in events:
+        if event['type'] in ('down', 'click') and event['button'] == 'left':
+            detections.append((event['t'], 'left_click'))
+        elif event['type'] == 'click' and event['button'] == 'right':
+            detections.append((event['t'], 'right_click'))
+    return detections
+
+
+def evaluate_detections(trace, events, window=0.6):
+    """Compare detected clicks with the trace labels.
+
+    Each label is matched to the first detection of the same gesture within
+    `window` seconds after it; the gap is the detection latency. Detections
+    left unmatched are false triggers, labels left unmatched are misses.
+    """
+    detections = detected_gestures(events)
+    used = [False] * len(detections)
+    latencies = []
+    missed = 0
+    for label_time, gesture in sorted(zip(trace['label_times'].tolist(), trace['label_gestures'].tolist())):
+        for i, (t, detected) in enumerate(detections):
+            if not used[i] and detected == gesture and label_time <= t <= label_time + window:
+                used[i] = True
+                latencies.append(t - label_time)
+                break
+        else:
+            missed += 1
+
+    timestamps = trace['timestamps']
+    minutes = (timestamps[-1] - timestamps[0]) / 60 if len(timestamps) > 1 else 0.0
+    false_triggers = used.count(False)
+    return {
+        'labels': len(trace['label_times']),
+        'detections': len(detections),
+        'latencies_ms': np.array(latencies) * 1000,
+        'missed': missed,
+        'false_triggers': false_triggers,
+        'false_triggers_per_minute': false_triggers / minutes if minutes > 0 else float('nan'),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Replay a landmark trace through the gesture decision engine.")
+    parser.add_argument("trace", help="Trace .npz recorded with virtual_mouse.py --record")
+    parser.add_argument("--events", action="store_true", help="Print every pointer event")
+    parser.add_argument("--repeat", type=int, default=1, help="Replay N times for throughput measurement")
+    args = parser.parse_args()
+
+    trace = load_trace(args.trace)
+    for _ in range(args.repeat):
+        result = replay_trace(trace)
+
+    events = result['events']
+    if args.events:
+        for event in events:
+            print(event)
+
+    counts = {}
+    for event in events:
+        counts[event['type']] = counts.get(event['type'], 0) + 1
+    print("=" * 60)
+    print(f"Frames: {result['frames']}  Events: {counts}")
+    print(f"Decision loop: {result['frames_per_second']:.0f} frames/s "
+          f"({result['elapsed'] * 1000 / max(result['frames'], 1):.3f} ms/frame)")
+
+    if len(trace['label_times']):
+        stats = evaluate_detections(trace, events)
+        latencies = stats['latencies_ms']
+        print(f"Labelled clicks: {stats['labels']}  detected: {len(latencies)}  missed: {stats['missed']}")
+        if len(latencies):
+            print(f"Detection latency: median {np.median(latencies):.0f} ms, "
+                  f"p95 {np.percentile(latencies, 95):.0f} ms")
+        print(f"False triggers: {stats['false_triggers']} "
+              f"({stats['false_triggers_per_minute']:.2f}/min)")
@@ -0,0 +1,157 @@
+import os
+import threading
+import time
+import cv2
+
+# MediaPipe's 21-point hand topology (same as mp.solutions.hands.HAND_CONNECTIONS)
+HAND_CONNECTIONS = [
+    (0, 1), (1, 2), (2, 3), (3, 4),
+    (0, 5), (5, 6), (6, 7), (7, 8),
+    (5, 9), (9, 10), (10, 11), (11, 12),
+    (9, 13), (13, 14), (14, 15), (15, 16),
+    (13, 17), (0, 17), (17, 18), (18, 19), (19, 20),
+]
+
+TASK_MODEL_URL = ("https://storage.googleapis.com/mediapipe-models/hand_landmarker/"
+                  "hand_landmarker/float16/latest/hand_landmarker.task")
+
+
+class HandResults:
+    """Landmarks for the hands found in one frame.
+
+    `hands` is a list with one landmark list per hand (anything
+    landmarks_to_array accepts); `capture_time` is the perf_counter time of the
+    frame they were detected in, which is older than the current frame when
+    inference runs asynchronously.
+    """
+
+    def __init__(self, hands, capture_time=None):
+        self.hands = hands or []
+        self.capture_time = capture_time
+
+
+class LegacyHandTracker:
+    """Synchronous mp.solutions.hands backend: process() blocks until landmarks are ready."""
+
+    name = 'legacy'
+
+    def __init__(self, model_complexity=1, max_num_hands=1,
+                 min_detection_confidence=0.8, min_tracking_confidence=0.7):
+        import mediapipe as mp
+        self.hands = mp.solutions.hands.Hands(
+            static_image_mode=False,
+            max_num_hands=max_num_hands,
+            model_complexity=model_complexity,
+            min_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence
+        )
+
+    def process(self, img_rgb, capture_time=None):
+        results = self.hands.process(img_rgb)
+        hands = [hand.landmark for hand in results.multi_hand_landmarks or []]
+        return HandResults(hands, capture_time)
+
+    def close(self):
+        self.hands.close()
+
+
+class TasksHandTracker:
+    """MediaPipe Tasks HandLandmarker in LIVE_STREAM mode.
+
+    process() only submits the frame and returns immediately, so capture never
+    waits on inference. Results arrive on MediaPipe's own thread through a
+    callback; process() hands back the newest one that has not been returned
+    yet, or None if nothing new arrived since the last call. MediaPipe drops
+    frames submitted while the graph is still busy.
+    """
+
+    name = 'tasks'
+
+    def __init__(self, model_path='hand_landmarker.task', max_num_hands=1,
+                 min_detection_confidence=0.8, min_tracking_confidence=0.7):
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"{model_path} not found (download it from {TASK_MODEL_URL})")
+        import mediapipe as mp
+        from mediapipe.tasks import python as mp_tasks
+        from mediapipe.tasks.python import vision
+
+        self.mp = mp
+        self.lock = threading.Lock()
+        self.pending = {}  # Timestamp (ms) -> capture_time of frames still in flight
+        self.latest = None
+        self.last_timestamp_ms = -1
+        self.submitted = 0
+        self.delivered = 0
+
+        options = vision.HandLandmarkerOptions(
+            base_options=mp_tasks.BaseOptions(model_asset_path=model_path),
+            running_mode=vision.RunningMode.LIVE_STREAM,
+            num_hands=max_num_hands,
+            min_hand_detection_confidence=min_detection_confidence,
+            min_hand_presence_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+            result_callback=self._on_result
+        )
+        self.landmarker = vision.HandLandmarker.create_from_options(options)
+
+    def _on_result(self, result, output_image, timestamp_ms):
+        with self.lock:
+            capture_time = self.pending.pop(timestamp_ms, None)
+            # Frames MediaPipe dropped never call back; forget anything older
+            for stale in [ts for ts in self.pending if ts < timestamp_ms]:
+                del self.pending[stale]
+            self.latest = HandResults(result.hand_landmarks, capture_time)
+            self.delivered += 1
+
+    def process(self, img_rgb, capture_time=None):
+        if capture_time is None:
+            capture_time = time.perf_counter()
+        # detect_async needs strictly increasing timestamps
+        timestamp_ms = max(int(capture_time * 1000), self.last_timestamp_ms + 1)
+        self.last_timestamp_ms = timestamp_ms
+
+        # mp.Image copies the pixels, so the caller may reuse img_rgb right away
+        image = self.mp.Image(image_format=self.mp.ImageFormat.SRGB, data=img_rgb)
+        with self.lock:
+            self.pending[timestamp_ms] = capture_time
+        self.landmarker.detect_async(image, timestamp_ms)
+        self.submitted += 1
+
+        with self.lock:
+            results, self.latest = self.latest, None
+        return results
+
+    def close(self):
+        self.landmarker.close()
+
+
+def create_hand_tracker(backend='legacy', model_complexity=1, model_path='hand_landmarker.task',
+                        num_threads=None, **options):
+    """Create a hand tracker, falling back to the legacy backend if Tasks can't start.
+
+    model_complexity (0 = lite, 1 = full) applies to the legacy graph; the
+    Tasks backend's model is chosen by model_path. MediaPipe does not expose
+    its inference thread count in Python, so num_threads caps OpenCV's
+    worker pool, which the frame preprocessing runs on.
+    """
+    if num_threads is not None:
+        cv2.setNumThreads(num_threads)
+
+    if backend == 'tasks':
+        try:
+            return TasksHandTracker(model_path, **options)
+        except (ImportError, AttributeError, FileNotFoundError, RuntimeError) as e:
+            print(f"⚠️ HandLandmarker unavailable ({e}) - using legacy MediaPipe Hands")
+    elif backend != 'legacy':
+        raise ValueError(f"Unknown hand tracking backend '{backend}' (use 'legacy' or 'tasks')")
+    return LegacyHandTracker(model_complexity, **options)
+
+
+def draw_hand(img, points, landmark_color=(0, 255, 0), connection_color=(255, 0, 0), thickness=2):
+    """Draw hand landmarks (normalized (21, 3) array) and their connections on a BGR image."""
+    h, w = img.shape[:2]
+    pixels = [(int(x * w), int(y * h)) for x, y in points[:, :2]]
+    for a, b in HAND_CONNECTIONS:
+        cv2.line(img, pixels[a], pixels[b], connection_color, thickness)
+    for p in pixels:
+        cv2.circle(img, p, thickness + 2, landmark_color, -1)
@@ -0,0 +1,155 @@
+import bisect
+import threading
+import numpy as np
+
+# Histogram bin edges in ms: log-spaced from 0.1 ms to 1 s, plus an overflow bin
+LATENCY_BINS_MS = [0.0] + [round(float(edge), 3) for edge in np.logspace(-1, 3, 41)]
+
+
+class LatencyHistogram:
+    """Fixed-bin latency histogram; percentiles are read from the bin upper edges."""
+
+    def __init__(self, edges=LATENCY_BINS_MS):
+        self.edges = edges
+        self.counts = [0] * (len(edges) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms):
+        self.counts[bisect.bisect_right(self.edges, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, p):
+        if not self.count:
+            return float('nan')
+        target = self.count * p / 100.0
+        running = 0
+        for i, n in enumerate(self.counts):
+            running += n
+            if running >= target:
+                return self.edges[i] if i < len(self.edges) else self.max_ms
+        return self.max_ms
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'mean_ms': self.total_ms / self.count if self.count else float('nan'),
+            'p50_ms': self.percentile(50),
+            'p95_ms': self.percentile(95),
+            'p99_ms': self.percentile(99),
+            'max_ms': self.max_ms,
+        }
+
+
+class LatencyTracker:
+    """Per-stage latency histograms shared by the gesture loop and the actuator thread."""
+
+    STAGES = ['preprocess', 'inference', 'filter', 'decision', 'actuation', 'end_to_end']
+
+    def __init__(self, stages=None):
+        self.stages = stages or self.STAGES
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.histograms = {stage: LatencyHistogram() for stage in self.stages}
+
+    def add(self, stage, seconds):
+        with self.lock:
+            self.histograms[stage].add(seconds * 1000.0)
+
+    def summary(self):
+        with self.lock:
+            return {stage: h.summary() for stage, h in self.histograms.items() if h.count}
+
+    def format_summary(self):
+        lines = [f"   {'stage':<12}{'n':>7}{'mean':>9}{'p50':>9}{'p95':>9}{'p99':>9}  (ms)"]
+        for stage, s in self.summary().items():
+            lines.append(f"   {stage:<12}{s['count']:>7}{s['mean_ms']:>9.2f}{s['p50_ms']:>9.2f}"
+                         f"{s['p95_ms']:>9.2f}{s['p99_ms']:>9.2f}")
+        return "\n".join(lines)
+
+
+# === SYNTHETIC MOVING-TARGET SELF-TEST ===
+
+class _SyntheticLandmark:
+    def __init__(self, x, y, z=0.0):
+        self.x, self.y, self.z = x, y, z
+
+
+class DotHandTracker:
+    """Stand-in for MediaPipe that finds a bright dot and reports a cursor-pose hand there.
+
+    The index fingertip sits on the dot with the thumb next to it, and the other
+    fingertips are far from the thumb, so the gesture engine picks cursor control.
+    """
+
+    def __init__(self, min_brightness=200):
+        self.min_brightness = min_brightness
+
+    def process(self, img_rgb, capture_time=None):
+        import cv2
+        from hand_tracking import HandResults
+        gray = cv2.cvtColor(img_rgb, cv2.COLOR_RGB2GRAY)
+        _, max_val, _, max_loc = cv2.minMaxLoc(gray)
+        if max_val < self.min_brightness:
+            return HandResults(None, capture_time)
+
+        h, w = gray.shape
+        x, y = max_loc[0] / w, max_loc[1] / h
+        points = [_SyntheticLandmark(x, y + 0.25) for _ in range(21)]  # Wrist/knuckles below
+        points[4] = _SyntheticLandmark(x + 0.02, y)   # Thumb tip
+        points[8] = _SyntheticLandmark(x, y)          # Index tip
+        for tip, dx in ((12, -0.15), (16, -0.2), (20, -0.25)):
+            points[tip] = _SyntheticLandmark(x + dx, y + 0.1)
+        return HandResults([points], capture_time)
+
+    def close(self):
+        pass
+
+
+def run_latency_selftest(duration=10.0, fps=30, period=2.0):
+    """Drive the whole gesture loop with a synthetic moving dot and measure its latency.
+
+    Returns the tracker summary plus the whole-loop lag: the delay that best
+    aligns the cursor positions the pointer received with the known path of
+    the dot.
+    """
+    from frame_sources import SyntheticTargetSource
+    from pointer_backend import RecordingPointer
+    from virtual_mouse import GestureController
+
+    controller = GestureController(pointer=RecordingPointer())
+    controller.hands = DotHandTracker()
+    controller.idle_after = float('inf')
+    source = SyntheticTargetSource(controller.frame_width, controller.frame_height, fps=fps, period=period)
+
+    stop_event = threading.Event()
+    timer = threading.Timer(duration, stop_event.set)
+    timer.start()
+    try:
+        controller.run(stop_event, source=source, show=False)
+    finally:
+        timer.cancel()
+
+    # Compare the cursor path with where the dot really was (mirrored like the preview)
+    moves = [e for e in controller.pointer.events if e['type'] == 'move']
+    lag_ms = float('nan')
+    if len(moves) > 10:
+        t = np.array([e['t'] for e in moves])
+        x = np.array([e['x'] for e in moves], dtype=np.float64)
+        shifts = np.arange(0.0, 0.5, 0.001)
+        errors = []
+        active_x = [controller.margin, controller.frame_width - controller.margin]
+        for shift in shifts:
+            dot_x, _ = source.position(t - shift)
+            screen_x = np.interp((1.0 - dot_x) * controller.frame_width, active_x, [0, controller.screen_width])
+            errors.append(np.mean((x - screen_x) ** 2))
+        lag_ms = float(shifts[int(np.argmin(errors))] * 1000)
+
+    return {'stages': controller.latency.summary(), 'loop_lag_ms': lag_ms,
+            'report': controller.latency.format_summary()}
@@ -0,0 +1,39 @@
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """Cheap motion detector on tiny grayscale frames, used to wake from idle mode.
+
+    Each frame is shrunk to `size`, converted to gray and compared with the
+    previous one; motion means at least `min_changed` of the pixels moved by
+    more than `threshold` gray levels. Buffers are reused between calls.
+    """
+
+    def __init__(self, size=(64, 48), threshold=25, min_changed=0.02):
+        self.size = size
+        self.threshold = threshold
+        self.min_changed = min_changed
+        self.small = np.empty((size[1], size[0], 3), dtype=np.uint8)
+        self.gray = np.empty((size[1], size[0]), dtype=np.uint8)
+        self.reference = np.empty_like(self.gray)
+        self.diff = np.empty_like(self.gray)
+        self.has_reference = False
+
+    def reset(self):
+        self.has_reference = False
+
+    def __call__(self, frame):
+        """Return True if this frame differs enough from the previous one."""
+        cv2.resize(frame, self.size, dst=self.small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self.small, cv2.COLOR_BGR2GRAY, dst=self.gray)
+
+        if not self.has_reference:
+            self.reference[:] = self.gray
+            self.has_reference = True
+            return False
+
+        cv2.absdiff(self.gray, self.reference, dst=self.diff)
+        self.reference[:] = self.gray
+        changed = cv2.countNonZero(cv2.threshold(self.diff, self.threshold, 255, cv2.THRESH_BINARY)[1])
+        return changed >= self.min_changed * self.diff.size
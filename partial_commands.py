@@ -0,0 +1,67 @@
+class PartialCommandMatcher:
+    """Fires voice commands from Vosk partial hypotheses instead of waiting for endpointing.
+
+    A command fires once its phrase has been in the partial hypothesis (as whole
+    words) for `stable_blocks` consecutive audio blocks. Partials can revise
+    their last word, so a phrase that is a prefix of a longer command ("refresh"
+    vs "refresh page") must also stay at the end of the hypothesis for
+    `prefix_blocks`. Every phrase fires at most once per utterance, and
+    final() reports whether the endpointed result was already handled.
+    """
+
+    def __init__(self, phrases, stable_blocks=2, prefix_blocks=4):
+        # Longest phrases first, so "refresh page" wins over "refresh"
+        self.phrases = sorted(phrases, key=lambda p: -len(p))
+        self.stable_blocks = stable_blocks
+        self.prefix_blocks = prefix_blocks
+        self.prefixes = {p for p in self.phrases
+                         if any(other != p and other.startswith(p + " ") for other in self.phrases)}
+        self.reset()
+
+    def reset(self):
+        """Start a new utterance."""
+        self.seen = {}      # phrase -> consecutive blocks it has been in the partial
+        self.fired = set()
+
+    @staticmethod
+    def _words(text):
+        return " " + " ".join(text.lower().split()) + " "
+
+    @staticmethod
+    def _overlaps(a, b):
+        """True if one phrase contains the other as whole words."""
+        return f" {a} " in f" {b} " or f" {b} " in f" {a} "
+
+    def match(self, text):
+        """Return the registered phrase contained in text (whole words), longest first."""
+        words = self._words(text)
+        for phrase in self.phrases:
+            if f" {phrase} " in words:
+                return phrase
+        return None
+
+    def update(self, partial):
+        """Feed one partial hypothesis; return a phrase to fire now, or None."""
+        words = self._words(partial)
+        present = {p for p in self.phrases if f" {p} " in words}
+        self.seen = {p: self.seen.get(p, 0) + 1 for p in present}
+        for phrase in self.phrases:
+            count = self.seen.get(phrase, 0)
+            if phrase in self.fired or count < self.stable_blocks:
+                continue
+            if phrase in self.prefixes and words.endswith(f" {phrase} ") and count < self.prefix_blocks:
+                continue  # Could still grow into the longer command
+            if any(len(other) > len(phrase) and self._overlaps(phrase, other) for other in present):
+                continue  # Part of a longer command in the hypothesis
+            if any(self._overlaps(phrase, fired) for fired in self.fired):
+                continue  # Same words as a command that already fired
+            self.fired.add(phrase)
+            return phrase
+        return None
+
+    def final(self, text):
+        """Feed the endpointed result; True if its command already fired from partials."""
+        phrase = self.match(text)
+        handled = phrase is not None and any(self._overlaps(phrase, fired) for fired in self.fired)
+        self.reset()
+        return handled
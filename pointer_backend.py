@@ -0,0 +1,80 @@
+import time
+
+
+class PyAutoGUIPointer:
+    """Pointer backend that drives the real mouse through pyautogui."""
+
+    def __init__(self):
+        import pyautogui
+        self.pyautogui = pyautogui
+
+        # Performance optimization
+        pyautogui.FAILSAFE = False
+        pyautogui.PAUSE = 0
+
+    def size(self):
+        return self.pyautogui.size()
+
+    def position(self):
+        return self.pyautogui.position()
+
+    def move_to(self, x, y):
+        self.pyautogui.moveTo(x, y, _pause=False)
+
+    def click(self, button='left'):
+        self.pyautogui.click(button=button)
+
+    def scroll(self, amount):
+        self.pyautogui.scroll(amount)
+
+    def mouse_down(self, button='left'):
+        self.pyautogui.mouseDown(button=button)
+
+    def mouse_up(self, button='left'):
+        self.pyautogui.mouseUp(button=button)
+
+    def hotkey(self, *keys):
+        self.pyautogui.hotkey(*keys)
+
+
+class RecordingPointer:
+    """Fake pointer backend that records actions instead of touching the desktop.
+
+    Each event is a dict with a 't' timestamp from `clock` and a 'type'
+    ('move', 'click', 'scroll', 'down', 'up', 'hotkey'). Replay sets `clock`
+    to the trace time so events line up with the recorded frames.
+    """
+
+    def __init__(self, screen_size=(1920, 1080), clock=time.perf_counter):
+        self.screen_size = screen_size
+        self.clock = clock
+        self.cursor = (screen_size[0] // 2, screen_size[1] // 2)
+        self.events = []
+
+    def size(self):
+        return self.screen_size
+
+    def position(self):
+        return self.cursor
+
+    def move_to(self, x, y):
+        self.cursor = (int(x), int(y))
+        self.events.append({'t': self.clock(), 'type': 'move', 'x': int(x), 'y': int(y)})
+
+    def click(self, button='left'):
+        self.events.append({'t': self.clock(), 'type': 'click', 'button': button})
+
+    def scroll(self, amount):
+        self.events.append({'t': self.clock(), 'type': 'scroll', 'amount': amount})
+
+    def mouse_down(self, button='left'):
+        self.events.append({'t': self.clock(), 'type': 'down', 'button': button})
+
+    def mouse_up(self, button='left'):
+        self.events.append({'t': self.clock(), 'type': 'up', 'button': button})
+
+    def hotkey(self, *keys):
+        self.events.append({'t': self.clock(), 'type': 'hotkey', 'keys': list(keys)})
+
+    def count(self, event_type):
+        return sum(1 for event in self.events if event['type'] == event_type)
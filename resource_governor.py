@@ -0,0 +1,154 @@
+import contextlib
+import os
+import threading
+import psutil
+
+
+class ResourceGovernor(threading.Thread):
+    """Shares the CPU between the gesture loop and Whisper.
+
+    Engines call register_thread() from their own thread and
+    unregister_thread() when they stop. On Linux the speech thread is pinned
+    to most cores (threads it spawns afterwards, like torch's intra-op pool and
+    the Whisper loader, inherit that), and torch gets one intra-op thread per
+    speech core. The gesture thread keeps every core, except while a
+    transcription runs: then it is confined to the remaining few, and its full
+    mask comes back when the transcription ends. While transcribing on a
+    system busier than `busy_percent`, the gesture loop is also capped at
+    `throttled_fps`. Every decision is logged and kept in `metrics`.
+    """
+
+    def __init__(self, interval=1.0, busy_percent=75.0, throttled_fps=15, gesture_core_share=0.25):
+        super().__init__(daemon=True, name="ResourceGovernor")
+        self.interval = interval
+        self.busy_percent = busy_percent
+        self.throttled_fps = throttled_fps
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.process = psutil.Process()
+        self.transcriptions = 0  # Running transcriptions
+        self.throttled = False
+
+        # Core plan: only pin when there are enough cores to split
+        cores = sorted(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else \
+            list(range(psutil.cpu_count() or 1))
+        gesture_count = max(1, int(len(cores) * gesture_core_share))
+        self.can_pin = hasattr(os, 'sched_setaffinity') and len(cores) >= 4
+        self.all_cores = cores
+        self.cores = {
+            'gesture': cores[:gesture_count] if self.can_pin else cores,
+            'speech': cores[gesture_count:] if self.can_pin else cores,
+        }
+        self.metrics = {
+            'process_cpu': 0.0, 'system_cpu': 0.0, 'throttled': False, 'gesture_fps_limit': None,
+            'torch_threads': None, 'affinity': {}, 'decisions': 0,
+        }
+        self.threads = {}  # Engine -> native id of its registered thread
+
+    def register_thread(self, engine):
+        """Apply the engine's CPU plan to the calling thread."""
+        with self.lock:
+            self.threads[engine] = threading.get_native_id()
+            split = self.transcriptions > 0
+        if engine == 'gesture':
+            self._pin_gesture(split)
+        else:
+            cores = self.cores[engine]
+            if self.can_pin:
+                os.sched_setaffinity(threading.get_native_id(), cores)
+            with self.lock:
+                self.metrics['affinity'][engine] = cores if self.can_pin else 'all'
+        if engine == 'speech':
+            cores = self.cores[engine]
+            import torch
+            torch.set_num_threads(len(cores))
+            with self.lock:
+                self.metrics['torch_threads'] = len(cores)
+        print(f"⚖️ {engine} thread: cores {self.metrics['affinity'][engine]}"
+              + (f", torch {len(cores)} threads" if engine == 'speech' else ""))
+
+    def unregister_thread(self, engine):
+        """Forget an engine's thread (call from that thread before it exits)."""
+        with self.lock:
+            self.threads.pop(engine, None)
+            self.metrics['affinity'].pop(engine, None)
+
+    def _pin_gesture(self, split):
+        """Confine the gesture thread to its cores (split=True) or give it every core back."""
+        with self.lock:
+            thread = self.threads.get('gesture')
+        if thread is None:
+            return
+        cores = self.cores['gesture'] if split else self.all_cores
+        if self.can_pin:
+            try:
+                os.sched_setaffinity(thread, cores)
+            except OSError:
+                return  # Thread exited without unregistering
+        with self.lock:
+            self.metrics['affinity']['gesture'] = cores if self.can_pin and split else 'all'
+
+    @contextlib.contextmanager
+    def transcribing(self):
+        """Mark a transcription as running (the gesture loop may be throttled meanwhile)."""
+        with self.lock:
+            self.transcriptions += 1
+            first = self.transcriptions == 1
+        if first:
+            self._pin_gesture(True)
+        self._decide()
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.transcriptions -= 1
+                last = self.transcriptions == 0
+            if last:
+                self._pin_gesture(False)
+            self._decide()
+
+    def gesture_fps_limit(self):
+        """Frame rate cap for the gesture loop right now, or None for full rate."""
+        return self.throttled_fps if self.throttled else None
+
+    def _decide(self):
+        with self.lock:
+            throttle = self.transcriptions > 0 and self.metrics['system_cpu'] >= self.busy_percent
+            changed = throttle != self.throttled
+            self.throttled = throttle
+            self.metrics['throttled'] = throttle
+            self.metrics['gesture_fps_limit'] = self.throttled_fps if throttle else None
+            if changed:
+                self.metrics['decisions'] += 1
+            system_cpu = self.metrics['system_cpu']
+        if changed:
+            if throttle:
+                print(f"⚖️ Transcribing at {system_cpu:.0f}% CPU - gesture loop capped at {self.throttled_fps} FPS")
+            else:
+                print("⚖️ Gesture loop back to full rate")
+
+    def run(self):
+        self.process.cpu_percent(None)
+        psutil.cpu_percent(None)
+        while not self.stop_event.wait(self.interval):
+            with self.lock:
+                self.metrics['process_cpu'] = self.process.cpu_percent(None)
+                self.metrics['system_cpu'] = psutil.cpu_percent(None)
+            self._decide()
+
+    def stop(self):
+        self.stop_event.set()
+
+
+_governor = None
+_governor_lock = threading.Lock()
+
+
+def get_governor():
+    """The process-wide governor shared by both engines (started on first use)."""
+    global _governor
+    with _governor_lock:
+        if _governor is None:
+            _governor = ResourceGovernor()
+            _governor.start()
+        return _governor
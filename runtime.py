@@ -0,0 +1,330 @@
+"""Shared asyncio runtime for the gesture and speech engines.
+
+Instead of each engine spinning in its own polling loop, inputs become events
+on bounded, typed channels, and small coroutines connect them:
+
+    microphone --AudioBlock--> Vosk / Whisper --Phrase--> subscribers
+                                            \\--Action--> pyautogui
+    camera     --Frame-------> MediaPipe + gestures --Gesture--> subscribers
+
+Blocking work runs on named single-thread executors: 'speech' (Vosk, Whisper,
+the confirmation dialog), 'gesture' (MediaPipe, gestures, the preview window),
+'capture' (camera reads) and 'actions' (pyautogui). One thread per kind keeps
+each engine's thread affinity (governor pinning, Tk, OpenCV windows). A
+channel either makes its producer wait while it is full (backpressure, for
+replayed frames and actions) or drops its oldest event (live camera and
+microphone, where only fresh input matters). Setting an engine's stop event
+cancels its pipeline; new inputs are added as coroutines, not threads.
+
+    python runtime.py [--no-mouse] [--no-speech] [--source VIDEO]
+"""
+import asyncio
+import concurrent.futures
+import threading
+import time
+from collections import namedtuple
+
+# --- Events ---
+AudioBlock = namedtuple('AudioBlock', ['data', 'timestamp'])                 # Native-rate (frames, channels) float32
+Frame = namedtuple('Frame', ['image', 'frame_time', 'capture_time'])         # BGR frame, time.time(), perf_counter()
+Phrase = namedtuple('Phrase', ['text', 'source', 'mode', 'timestamp'])       # source: 'vosk' or 'whisper'
+Gesture = namedtuple('Gesture', ['mode', 'timestamp'])                       # Gesture mode changes
+Action = namedtuple('Action', ['name', 'handler', 'timestamp'])              # Voice command to execute
+
+END_OF_STREAM = Frame(None, None, None)  # Sent after the last frame of a recorded source
+
+
+class Channel:
+    """Bounded queue of one event type.
+
+    policy='block': put() waits while the channel is full.
+    policy='latest': the oldest event is dropped instead (and passed to on_drop).
+    """
+
+    def __init__(self, name, kind, maxsize=8, policy='block', on_drop=None):
+        self.name = name
+        self.kind = kind
+        self.policy = policy
+        self.on_drop = on_drop
+        self.queue = asyncio.Queue(maxsize)
+        self.stats = {'put': 0, 'dropped': 0, 'max_depth': 0}
+
+    def _check(self, event):
+        if not isinstance(event, self.kind):
+            raise TypeError(f"Channel {self.name} carries {self.kind.__name__}, not {type(event).__name__}")
+
+    def _count(self):
+        self.stats['put'] += 1
+        self.stats['max_depth'] = max(self.stats['max_depth'], self.queue.qsize())
+
+    async def put(self, event):
+        if self.policy == 'latest':
+            self.put_nowait(event)
+            return
+        self._check(event)
+        await self.queue.put(event)
+        self._count()
+
+    def put_nowait(self, event):
+        """Put without waiting (loop thread only); a full channel drops its oldest event."""
+        self._check(event)
+        if self.queue.full():
+            dropped = self.queue.get_nowait()
+            self.stats['dropped'] += 1
+            if self.on_drop:
+                self.on_drop(dropped)
+        self.queue.put_nowait(event)
+        self._count()
+
+    async def get(self):
+        return await self.queue.get()
+
+    def depth(self):
+        return self.queue.qsize()
+
+
+class Runtime:
+    """One event loop thread plus named executors, shared by every pipeline."""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.executors = {}
+        self.channels = {}
+        self.thread = threading.Thread(target=self._run_loop, name="Runtime", daemon=True)
+        self.thread.start()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def executor(self, name):
+        """The single-thread executor for one kind of blocking work (created on first use)."""
+        if name not in self.executors:
+            self.executors[name] = concurrent.futures.ThreadPoolExecutor(1, thread_name_prefix=f"runtime-{name}")
+        return self.executors[name]
+
+    def channel(self, name, kind, maxsize=8, policy='block', on_drop=None):
+        """Create (or replace) a named channel; pipelines and subscribers find it in self.channels."""
+        channel = Channel(name, kind, maxsize, policy, on_drop)
+        self.channels[name] = channel
+        return channel
+
+    async def offload(self, executor, func, *args):
+        """Run a blocking call on a named executor and wait for it without blocking the loop."""
+        return await self.loop.run_in_executor(self.executor(executor), func, *args)
+
+    def call_soon(self, func, *args):
+        """Schedule func on the loop from any thread (audio callbacks, engine hooks)."""
+        self.loop.call_soon_threadsafe(func, *args)
+
+    def post(self, channel, event):
+        """Put an event from a worker thread, waiting while the channel is full."""
+        asyncio.run_coroutine_threadsafe(channel.put(event), self.loop).result()
+
+    async def until_stopped(self, stop_event, *coroutines):
+        """Run coroutines until one returns or stop_event is set, then cancel the others.
+
+        stop_event is set on the way out as well, which releases the thread waiting on it.
+        """
+        tasks = [asyncio.ensure_future(coroutine) for coroutine in coroutines]
+        stopped = self.loop.run_in_executor(None, stop_event.wait)
+        await asyncio.wait(tasks + [stopped], return_when=asyncio.FIRST_COMPLETED)
+        stop_event.set()
+        for task in tasks:
+            task.cancel()
+        for task, result in zip(tasks, await asyncio.gather(*tasks, return_exceptions=True)):
+            if isinstance(result, Exception):
+                print(f"❌ Error in {task.get_coro().__name__}: {result}")
+
+    def run(self, coroutine):
+        """Run a coroutine on the runtime from another thread and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def report(self):
+        """One line per channel: events put, dropped and the deepest backlog."""
+        return "\n".join(f"   {name:<18}{c.stats['put']:>8} put{c.stats['dropped']:>8} dropped"
+                         f"{c.stats['max_depth']:>6} max depth" for name, c in self.channels.items())
+
+
+# === PIPELINES ===
+
+async def gesture_pipeline(runtime, controller, stop_event, source=0, show=True):
+    """Camera -> frames channel -> GestureController, with capture overlapping processing."""
+    controller.stop_event = stop_event
+    cap = await runtime.offload('gesture', controller.open_session, source)
+    if cap is None:
+        return
+
+    # Capture buffers go back to the pool once their frame was processed or dropped
+    buffers = []
+    frames = runtime.channel('gesture.frames', Frame, maxsize=1, policy='latest' if cap.is_live else 'block',
+                             on_drop=lambda frame: buffers.append(frame.image))
+    gestures = runtime.channel('gesture.modes', Gesture, maxsize=16, policy='latest')
+
+    async def capture():
+        while True:
+            success, img = await runtime.offload('capture', cap.read, buffers.pop() if buffers else None)
+            if not success:
+                if not cap.is_live:
+                    print(f"🏁 End of {cap.name}")
+                    await frames.put(END_OF_STREAM)
+                    await asyncio.Future()  # process() drains the channel and returns; until_stopped cancels this
+                print("⚠️ Warning: Failed to read from camera")
+                continue
+            capture_time = time.perf_counter()
+            await frames.put(Frame(img, time.time(), capture_time))
+            if cap.is_live:
+                delay = controller.pacing_delay(capture_time, skipped=controller.idle)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+    def handle(frame):
+        img = controller.step(frame.image, frame.frame_time, frame.capture_time, draw=show)
+        return not show or controller.show_frame(img, frame.frame_time)
+
+    async def process():
+        mode = None
+        while True:
+            frame = await frames.get()
+            if frame is END_OF_STREAM:
+                return
+            if not await runtime.offload('gesture', handle, frame):
+                return
+            buffers.append(frame.image)
+            if controller.current_mode != mode:
+                mode = controller.current_mode
+                gestures.put_nowait(Gesture(mode, frame.frame_time))
+
+    try:
+        await runtime.until_stopped(stop_event, capture(), process())
+    finally:
+        await runtime.offload('capture', lambda: None)  # Let a read in progress finish before releasing
+        await runtime.offload('gesture', controller.close_session, cap, show)
+
+
+async def speech_pipeline(runtime, stop_event, status_callback):
+    """Microphone -> audio channel -> recognizers; commands become Action events run off the speech thread."""
+    from speech_commander import EnhancedSpeechCommander
+
+    # Built on the speech executor: its Tk root and recognizers stay on that thread
+    commander = await runtime.offload('speech', EnhancedSpeechCommander, stop_event, status_callback)
+    audio = runtime.channel('speech.audio', AudioBlock, policy='latest',
+                            maxsize=int(30 * commander.samplerate / commander.blocksize))
+    phrases = runtime.channel('speech.phrases', Phrase, maxsize=32, policy='latest')
+    actions = runtime.channel('speech.actions', Action, maxsize=4)
+
+    def on_audio(indata, frames, time_info, status):
+        if status:
+            print(status, flush=True)
+        runtime.call_soon(audio.put_nowait, AudioBlock(indata.copy(), time.time()))
+
+    def command_poster(phrase, handler):
+        # Called on the speech thread; waits while earlier actions are still queued
+        return lambda: runtime.post(actions, Action(phrase, handler, time.time()))
+
+    def handle(block):
+        # Downmix and resample on the speech thread, then recognize
+        commander.handle_block(commander.capture.convert(block.data), block.timestamp)
+
+    commander.browser_commands = {phrase: command_poster(phrase, handler)
+                                  for phrase, handler in commander.browser_commands.items()}
+    commander.phrase_callback = lambda text, source: runtime.call_soon(
+        phrases.put_nowait, Phrase(text, source, commander.mode, time.time()))
+
+    async def recognize():
+        while True:
+            try:
+                block = await asyncio.wait_for(audio.get(), commander.silence_duration)
+            except asyncio.TimeoutError:
+                await runtime.offload('speech', commander.handle_silence)
+                continue
+            await runtime.offload('speech', handle, block)
+
+    async def act():
+        while True:
+            action = await actions.get()
+            try:
+                await runtime.offload('actions', action.handler)
+            except Exception as e:
+                print(f"❌ Command '{action.name}' failed: {e}")
+
+    await runtime.offload('speech', commander.start_session)
+    try:
+        stream = commander.open_audio_stream(on_audio)
+        await runtime.offload('speech', stream.start)
+        print(f">>> Audio stream opened successfully: {commander.capture.describe()} <<<")
+    except Exception as e:
+        print(f"Could not open audio stream: {e}")
+        stream = None
+    try:
+        if stream:
+            await runtime.until_stopped(stop_event, recognize(), act())
+    finally:
+        if stream:
+            await runtime.offload('speech', stream.close)
+        await runtime.offload('speech', commander.close_session)
+        await runtime.offload('speech', commander.cleanup)
+
+
+_runtime = None
+_runtime_lock = threading.Lock()
+
+
+def get_runtime():
+    """The process-wide runtime shared by both engines (started on first use)."""
+    global _runtime
+    with _runtime_lock:
+        if _runtime is None:
+            _runtime = Runtime()
+        return _runtime
+
+
+# --- Engine entry points (same signatures as the thread-per-engine ones, see app.py) ---
+
+def run_virtual_mouse(stop_event, metrics_callback=None):
+    from virtual_mouse import GestureController
+    controller = GestureController(metrics_callback=metrics_callback)
+    runtime = get_runtime()
+    runtime.run(gesture_pipeline(runtime, controller, stop_event))
+
+
+def run_speech_commander(stop_event, status_callback):
+    runtime = get_runtime()
+    runtime.run(speech_pipeline(runtime, stop_event, status_callback))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the engines as pipelines on the asyncio runtime.")
+    parser.add_argument("--no-mouse", action="store_true", help="Don't start the gesture pipeline")
+    parser.add_argument("--no-speech", action="store_true", help="Don't start the speech pipeline")
+    parser.add_argument("--source", default=0, help="Camera index, video file or image directory")
+    parser.add_argument("--no-preview", action="store_true", help="Run the gesture pipeline without a window")
+    args = parser.parse_args()
+
+    runtime = get_runtime()
+    stop_events = []
+    futures = []
+    if not args.no_mouse:
+        from virtual_mouse import GestureController
+        source = int(args.source) if str(args.source).isdigit() else args.source
+        stop_events.append(threading.Event())
+        futures.append(asyncio.run_coroutine_threadsafe(
+            gesture_pipeline(runtime, GestureController(), stop_events[-1], source, show=not args.no_preview),
+            runtime.loop))
+    if not args.no_speech:
+        stop_events.append(threading.Event())
+        futures.append(asyncio.run_coroutine_threadsafe(
+            speech_pipeline(runtime, stop_events[-1], lambda text: print(f"STATUS: {text}")), runtime.loop))
+    try:
+        for future in futures:
+            future.result()
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping pipelines...")
+        for event in stop_events:
+            event.set()
+        for future in futures:
+            future.result()
+    print("📊 Runtime channels:")
+    print(runtime.report())
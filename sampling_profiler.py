@@ -0,0 +1,144 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+# Thread name prefix -> role; threads matching none are profiled as 'other'
+THREAD_ROLES = [
+    ('MainThread', 'gui'),
+    ('GestureEngine', 'gesture'), ('runtime-gesture', 'gesture'), ('runtime-capture', 'gesture'),
+    ('CursorActuator', 'gesture'), ('ScrollActuator', 'gesture'),
+    ('SpeechEngine', 'speech'), ('runtime-speech', 'speech'), ('runtime-actions', 'speech'), ('Whisper', 'speech'),
+]
+
+
+def depth_bucket(n):
+    """Queue depth in a few buckets, so depths don't split every stack."""
+    if n == 0:
+        return "0"
+    if n < 4:
+        return "1-3"
+    if n < 16:
+        return "4-15"
+    return "16+"
+
+
+def speech_queue_depth(commander):
+    """Audio blocks waiting for the commander: the runtime's speech.audio channel, else its own queue."""
+    runtime = getattr(sys.modules.get('runtime'), '_runtime', None)
+    channel = runtime.channels.get('speech.audio') if runtime else None
+    return channel.depth() if channel else commander.q.qsize()
+
+
+# Class of a `self` found on the sampled stack -> engine state tag
+STATE_TAGS = {
+    'GestureController': lambda c: f"mode={c.current_mode}",
+    'EnhancedSpeechCommander': lambda s: f"mode={s.mode} queue={depth_bucket(speech_queue_depth(s))}",
+    'App': lambda app: f"ui_queue={depth_bucket(app.events.queue.qsize())}",
+}
+
+
+class SamplingProfiler(threading.Thread):
+    """Samples every thread's Python stack for `duration` seconds and writes folded stacks.
+
+    Every `interval` seconds the profiler reads sys._current_frames() - it
+    never traces or instruments the sampled threads. Each stack is prefixed
+    with the thread's role (gesture, speech, gui) and the engine state read
+    from the first GestureController / EnhancedSpeechCommander / App on the
+    stack (gesture mode, speech mode and queue depths), and identical stacks
+    are counted. The output is the "folded" format flamegraph.pl, speedscope
+    and inferno read:
+
+        gesture;[mode=CURSOR];run (virtual_mouse.py:669);step (virtual_mouse.py:601);... 42
+    """
+
+    def __init__(self, duration=10.0, interval=0.01, output_dir="profiles", done_callback=None):
+        super().__init__(daemon=True, name="SamplingProfiler")
+        self.duration = duration
+        self.interval = interval
+        self.output_dir = output_dir
+        self.done_callback = done_callback  # Called with the output path when finished (None if saving failed)
+        self.stacks = Counter()
+        self.samples = 0
+        self.overhead_s = 0.0  # CPU the profiler thread itself used
+        self.path = None
+
+    @staticmethod
+    def thread_role(name):
+        for prefix, role in THREAD_ROLES:
+            if name.startswith(prefix):
+                return role
+        return 'other'
+
+    @staticmethod
+    def frame_label(frame):
+        code = frame.f_code
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def sample(self, names):
+        """Add one sample of every thread except this one."""
+        for ident, frame in sys._current_frames().items():
+            if ident == self.ident:
+                continue
+            labels, state = [], None
+            while frame is not None:
+                labels.append(self.frame_label(frame))
+                if state is None and frame.f_code.co_varnames[:1] == ('self',):
+                    tag = STATE_TAGS.get(type(frame.f_locals.get('self')).__name__)
+                    if tag:
+                        try:
+                            state = tag(frame.f_locals['self'])
+                        except Exception:
+                            pass  # Object still being constructed
+                frame = frame.f_back
+            labels.reverse()
+            name = names.get(ident, f"thread-{ident}")
+            root = [self.thread_role(name)] + ([f"[{state}]"] if state else [])
+            self.stacks[";".join(root + labels)] += 1
+        self.samples += 1
+
+    def run(self):
+        cpu = time.thread_time()
+        end = time.perf_counter() + self.duration
+        next_sample = time.perf_counter()
+        while next_sample < end:
+            names = {t.ident: t.name for t in threading.enumerate()}
+            self.sample(names)
+            next_sample += self.interval
+            delay = next_sample - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        self.overhead_s = time.thread_time() - cpu
+        try:
+            self.path = self.save()
+            print(f"🔥 Profile: {self.samples} samples over {self.duration:g}s written to {self.path} "
+                  f"(profiler CPU {100 * self.overhead_s / self.duration:.1f}%)")
+            print(self.format_summary())
+        except Exception as e:
+            print(f"❌ Could not save profile: {e}")
+        finally:
+            if self.done_callback:
+                self.done_callback(self.path)
+
+    def save(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, time.strftime("profile-%Y%m%d-%H%M%S.folded"))
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in sorted(self.stacks.items()):
+                f.write(f"{stack} {count}\n")
+        return path
+
+    def format_summary(self, top=5):
+        """Busiest leaf functions per role (share of that role's samples)."""
+        leaves = {}
+        for stack, count in self.stacks.items():
+            parts = stack.split(";")
+            leaves.setdefault(parts[0], Counter())[parts[-1]] += count
+        lines = []
+        for role, counter in sorted(leaves.items()):
+            total = sum(counter.values())
+            lines.append(f"   {role}:")
+            for leaf, count in counter.most_common(top):
+                lines.append(f"      {100 * count / total:5.1f}%  {leaf}")
+        return "\n".join(lines)
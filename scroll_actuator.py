@@ -0,0 +1,117 @@
+import math
+import threading
+import time
+
+
+class ScrollActuator(threading.Thread):
+    """Turns hand velocity into a continuous scroll rate, with inertia after release.
+
+    While the scroll pinch is held the gesture loop feeds the hand's y position
+    to update(); its velocity (normalized frame heights per second) maps to a
+    scroll rate that grows faster than linearly, so slow movements scroll
+    precisely and flicks cover long documents. After release() the rate decays
+    exponentially. This thread emits single scroll units at `rate_hz`, so the
+    scroll speed doesn't depend on the camera frame rate.
+
+    Without start() (trace replay), call tick() once per frame instead.
+    """
+
+    def __init__(self, pointer, rate_hz=60, gain=40.0, acceleration=2.0, max_rate=400.0,
+                 min_velocity=0.05, velocity_smoothing=0.5, decay_time=0.35, stop_rate=2.0):
+        super().__init__(daemon=True, name="ScrollActuator")
+        self.pointer = pointer
+        self.rate_hz = rate_hz
+        self.gain = gain                      # Scroll units/s per frame-height/s
+        self.acceleration = acceleration      # Extra gain per unit of hand speed
+        self.max_rate = max_rate              # Scroll units/s
+        self.min_velocity = min_velocity      # Hand speeds below this are jitter
+        self.velocity_smoothing = velocity_smoothing
+        self.decay_time = decay_time          # Inertia time constant (s)
+        self.stop_rate = stop_rate            # Inertia ends below this rate
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.wake_event = threading.Event()
+        self.reset()
+
+    def reset(self):
+        """Stop scrolling immediately and forget the hand history."""
+        with self.lock:
+            self.held = False
+            self.last_sample = None  # (y, timestamp)
+            self.velocity = 0.0
+            self.rate = 0.0
+            self.remainder = 0.0  # Fractional scroll units not emitted yet
+            self.last_tick = None
+
+    def update(self, y, timestamp):
+        """Feed the hand's normalized y while the scroll gesture is held."""
+        with self.lock:
+            self.held = True
+            if self.last_sample is not None:
+                dt = timestamp - self.last_sample[1]
+                if dt > 0:
+                    velocity = (y - self.last_sample[0]) / dt
+                    a = self.velocity_smoothing
+                    self.velocity = a * self.velocity + (1 - a) * velocity
+            self.last_sample = (y, timestamp)
+            self.rate = self.rate_for(self.velocity)
+        self.wake_event.set()
+
+    def release(self):
+        """Let go of the scroll gesture; the current rate coasts down."""
+        with self.lock:
+            self.held = False
+            self.last_sample = None
+            self.velocity = 0.0
+
+    def rate_for(self, velocity):
+        """Scroll units per second for a hand velocity (moving up scrolls up)."""
+        speed = abs(velocity)
+        if speed < self.min_velocity:
+            return 0.0
+        speed -= self.min_velocity
+        rate = self.gain * speed * (1.0 + self.acceleration * speed)
+        return math.copysign(min(rate, self.max_rate), -velocity)
+
+    def tick(self, now):
+        """Advance the scroll by the time since the last tick; return True while scrolling."""
+        with self.lock:
+            dt = 0.0 if self.last_tick is None else min(now - self.last_tick, 0.25)
+            self.last_tick = now
+            if not self.held:
+                self.rate *= math.exp(-dt / self.decay_time)
+                if abs(self.rate) < self.stop_rate:
+                    self.rate = 0.0
+                    self.remainder = 0.0
+            self.remainder += self.rate * dt
+            units = int(self.remainder)
+            self.remainder -= units
+            active = self.held or self.rate != 0.0
+
+        if units:
+            self.pointer.scroll(units)
+        return active
+
+    def run(self):
+        tick = 1.0 / self.rate_hz
+        next_tick = time.perf_counter()
+        while not self.stop_event.is_set():
+            self.wake_event.clear()
+            if not self.tick(time.perf_counter()):
+                # Not scrolling: sleep until the gesture loop feeds a position
+                with self.lock:
+                    self.last_tick = None
+                self.wake_event.wait(0.1)
+                next_tick = time.perf_counter()
+                continue
+
+            next_tick += tick
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_tick = time.perf_counter()
+
+    def stop(self):
+        self.stop_event.set()
+        self.wake_event.set()
@@ -0,0 +1,70 @@
+"""Client for the speech daemon (speech_daemon.py), using only the standard library.
+
+Scripts and test harnesses can talk to a running daemon without installing
+the desktop stack (Vosk, Whisper, pyautogui...).
+"""
+import base64
+import json
+import os
+import socket
+import tempfile
+
+
+def socket_dir():
+    """Per-user directory for the daemon socket: $XDG_RUNTIME_DIR, else a private dir under /tmp."""
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir:
+        return runtime_dir
+    return os.path.join(tempfile.gettempdir(), f"handsfree-{os.getuid()}")
+
+
+DEFAULT_SOCKET = os.path.join(socket_dir(), 'handsfree-speech.sock')
+
+
+class SpeechClient:
+    """Blocking client for the speech daemon (one request at a time per client).
+
+    Events the daemon pushes on its own (a dictation flushed after silence)
+    are collected in `pushed` and included in stream()'s result.
+    """
+
+    def __init__(self, path=DEFAULT_SOCKET):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(path)
+        self.reader = self.sock.makefile('rb')
+        self.pushed = []
+
+    def _read(self):
+        line = self.reader.readline()
+        if not line:
+            raise ConnectionError("speech daemon closed the connection")
+        return json.loads(line)
+
+    def request(self, **message):
+        self.sock.sendall((json.dumps(message) + "\n").encode())
+        while True:
+            reply = self._read()
+            if not reply.get('push'):
+                return reply
+            self.pushed += reply['events']
+
+    def transcribe_file(self, path):
+        return self.request(op='transcribe', path=os.path.abspath(path))
+
+    def transcribe_audio(self, pcm_bytes, name='audio'):
+        return self.request(op='transcribe', audio=base64.b64encode(pcm_bytes).decode(), name=name)
+
+    def stream(self, pcm_blocks):
+        """Send a whole stream block by block and return every event it produced."""
+        self.request(op='stream_start')
+        events = []
+        for block in pcm_blocks:
+            events += self.pushed + self.request(op='audio', audio=base64.b64encode(block).decode())['events']
+            self.pushed = []
+        events += self.pushed + self.request(op='stream_end')['events']
+        self.pushed = []
+        return events
+
+    def close(self):
+        self.reader.close()
+        self.sock.close()
@@ -1,10 +1,6 @@
 import queue
-import sounddevice as sd
-import whisper
-import numpy as np
 import threading
 import pyautogui
-import torch
 import os
 import json
 import tkinter as tk
@@ -14,7 +10,14 @@ import time
 from collections import deque
 import subprocess
 import sys
-import psutil
+from whisper_manager import WhisperModelManager
+from whisper_cascade import WhisperCascade
+from resource_governor import get_governor
+from partial_commands import PartialCommandMatcher
+from audio_capture import AudioCapture
+from speech_config import (BROWSER_COMMANDS, STOP_PHRASES, VOSK_MODEL_PATH, WAKE_PHRASES, WHISPER_FAST_MODEL,
+                           WHISPER_MODEL, clean_transcript, load_whisper_model, pcm16_to_float)
+
 
 class EnhancedSpeechCommander:
     def __init__(self, stop_event, status_callback):
@@ -29,61 +32,20 @@ class EnhancedSpeechCommander:
         self.stop_word = "stop typing"
         
         # --- ENHANCED: Voice Commands for Browser & App Control ---
-        self.browser_commands = {
-            # Tab Management
-            "close tab": self._close_tab,
-            "new tab": self._new_tab,
-            "next tab": self._next_tab,
-            "previous tab": self._previous_tab,
-            "reopen tab": self._reopen_tab,
-            "duplicate tab": self._duplicate_tab,
-            
-            # Window Management
-            "new window": self._new_window,
-            "close window": self._close_window,
-            "minimize window": self._minimize_window,
-            "maximize window": self._maximize_window,
-            "switch window": self._switch_window,
-            
-            # Navigation
-            "go back": self._go_back,
-            "go forward": self._go_forward,
-            "refresh page": self._refresh_page,
-            "refresh": self._refresh_page,
-            "reload": self._refresh_page,
-            "home page": self._go_home,
-            "open bookmarks": self._open_bookmarks,
-            
-            # Browser Specific
-            "open incognito": self._open_incognito,
-            "open private": self._open_incognito,
-            "developer tools": self._open_dev_tools,
-            "view source": self._view_source,
-            "full screen": self._toggle_fullscreen,
-            "zoom in": self._zoom_in,
-            "zoom out": self._zoom_out,
-            "zoom reset": self._zoom_reset,
-            
-            # Application Control
-            "open chrome": lambda: self._open_application("chrome"),
-            "open firefox": lambda: self._open_application("firefox"),
-            "open edge": lambda: self._open_application("msedge"),
-            "open notepad": lambda: self._open_application("notepad"),
-            "open calculator": lambda: self._open_application("calc"),
-            "open file explorer": lambda: self._open_application("explorer"),
-            "open task manager": lambda: self._open_task_manager(),
-            
-            # System Control
-            "alt tab": self._alt_tab,
-            "show desktop": self._show_desktop,
-            "lock screen": self._lock_screen,
-            "take screenshot": self._take_screenshot,
-            "open start menu": self._open_start_menu,
-        }
+        self.browser_commands = {phrase: self._command_handler(target)
+                                 for phrase, target in BROWSER_COMMANDS.items()}
+        
+        # Commands fire as soon as they are stable in Vosk's partial result,
+        # instead of after endpointing adds trailing silence (see partial_commands.py)
+        self.early_commands = True
+        self.partial_commands = PartialCommandMatcher(self.browser_commands.keys())
+        
+        # Called with (text, source) for every Vosk result and Whisper transcript
+        self.phrase_callback = None
         
         # Alternative wake phrases for better recognition
-        self.wake_phrases = ["start typing", "begin typing", "start dictation"]
-        self.stop_phrases = ["stop typing", "end typing", "stop", "stop dictation"]
+        self.wake_phrases = list(WAKE_PHRASES)
+        self.stop_phrases = list(STOP_PHRASES)
         
         # --- Store transcribed text for confirmation ---
         self.pending_text = ""
@@ -102,14 +64,18 @@ class EnhancedSpeechCommander:
         self.last_stop_detection_time = None
         
         # --- Vosk Model Setup (for fast wake-word detection) ---
-        vosk_model_path = os.path.join("model", "vosk-model-small-en-us-0.15")
+        vosk_model_path = VOSK_MODEL_PATH
         if not os.path.exists(vosk_model_path):
             raise FileNotFoundError(f"Vosk model not found at {vosk_model_path}. Please follow setup instructions.")
         self.vosk_model = Model(vosk_model_path)
         self.recognizer = KaldiRecognizer(self.vosk_model, self.samplerate)
         
-        # --- NEW: Separate recognizer for real-time stop detection ---
-        self.stop_recognizer = KaldiRecognizer(self.vosk_model, self.samplerate)
+        # --- Stop-phrase-only recognizer: the only decoder that runs while dictating ---
+        # ("[unk]" absorbs the dictated speech; Whisper transcribes it afterwards)
+        self.stop_recognizer = KaldiRecognizer(self.vosk_model, self.samplerate,
+                                               json.dumps(self.stop_phrases + ["[unk]"]))
+        self.routed_mode = self.mode
+        self.decode_stats = {}  # mode -> [decode CPU seconds, audio seconds]
         
         # Enhanced grammar - include all commands
         all_phrases = (self.wake_phrases + self.stop_phrases + 
@@ -119,18 +85,27 @@ class EnhancedSpeechCommander:
         self.stop_recognizer.SetWords(True)
         
         # --- Whisper Model Setup (for high-accuracy dictation) ---
-        self.status_callback("Status: Loading speech models...")
-        print("Loading Whisper model...")
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
-        self.fp16 = self.device == "cuda"
-        print(f"Using device: {self.device} (FP16: {self.fp16})")
-        self.model = whisper.load_model("medium")
-        print("Whisper model loaded.")
+        # Models load in the background, unload after model_idle_timeout seconds without
+        # dictation and reload as soon as a wake phrase is heard (see whisper_manager.py).
+        # Dictation is decoded by the fast model first and only re-decoded by the
+        # accurate one when the fast result's scores are poor (see whisper_cascade.py)
+        self.model_idle_timeout = 600.0
+        self.whisper_memory_budget_mb = 4000
+        self.whisper = WhisperCascade(
+            WhisperModelManager(load_whisper_model, WHISPER_FAST_MODEL, idle_timeout=self.model_idle_timeout),
+            WhisperModelManager(load_whisper_model, WHISPER_MODEL, idle_timeout=self.model_idle_timeout),
+            memory_budget_mb=self.whisper_memory_budget_mb
+        )
+        self.governor = None  # Set by start_session; Whisper prefetch waits for it
         self.status_callback("Status: Waiting for wake word or voice command...")
 
         # --- Audio Streaming Setup ---
         self.blocksize = 4096 
-        self.q = queue.Queue()
+        # Devices open at their native rate and channel count (None = what the device
+        # reports); blocks are downmixed and resampled to 16 kHz off the callback
+        self.mic_config = {'device': 1, 'channels': None, 'samplerate': None}
+        self.capture = None
+        self.q = queue.Queue()  # Native-rate blocks from the callback
         self.audio_buffer = []
         
         # --- Initialize tkinter for dialog boxes ---
@@ -144,6 +119,13 @@ class EnhancedSpeechCommander:
         # Print available commands on startup
         self._print_available_commands()
         
+    def _command_handler(self, target):
+        """Bind a BROWSER_COMMANDS entry to this commander."""
+        if isinstance(target, tuple):
+            method, argument = target
+            return lambda: getattr(self, method)(argument)
+        return getattr(self, target)
+        
     def _print_available_commands(self):
         """Print all available voice commands."""
         print("\n" + "="*80)
@@ -455,31 +437,34 @@ class EnhancedSpeechCommander:
                 return True
         return False
         
-    def _check_browser_command(self, text):
-        """Check if text contains a browser command and execute it."""
+    def _match_browser_command(self, text):
+        """Return the browser command contained in text, or None."""
         text_lower = text.lower().strip()
         
         # Check for exact matches first
         if text_lower in self.browser_commands:
-            print(f"🎯 Executing command: '{text_lower}'")
-            self.browser_commands[text_lower]()
-            return True
+            return text_lower
             
         # Check for partial matches
-        for command, function in self.browser_commands.items():
+        for command in self.browser_commands:
             if command in text_lower:
-                print(f"🎯 Executing command: '{command}' (matched from '{text_lower}')")
-                function()
-                return True
+                return command
                 
-        return False
+        return None
+        
+    def _check_browser_command(self, text):
+        """Check if text contains a browser command and execute it."""
+        command = self._match_browser_command(text)
+        if command is None:
+            return False
+        text_lower = text.lower().strip()
+        if command == text_lower:
+            print(f"🎯 Executing command: '{command}'")
+        else:
+            print(f"🎯 Executing command: '{command}' (matched from '{text_lower}')")
+        self.browser_commands[command]()
+        return True
         
-    def _audio_callback(self, indata, frames, time, status):
-        """This is called for each audio block from the microphone."""
-        if status:
-            print(status, flush=True)
-        self.q.put(bytes(indata))
-
     def _show_confirmation_dialog(self, text):
         """Shows a confirmation dialog and returns True if user wants to type the text."""
         # Bring the dialog to front and make it stay on top
@@ -514,8 +499,6 @@ class EnhancedSpeechCommander:
         valid_audio = []
         current_time = self.buffer_start_time
         bytes_per_second = self.samplerate * 2  # 16-bit = 2 bytes per sample
-        bytes_per_block = self.blocksize * 2
-        time_per_block = bytes_per_block / bytes_per_second
         
         for audio_data, timestamp in self.audio_segments:
             if current_time <= self.last_stop_detection_time:
@@ -532,7 +515,8 @@ class EnhancedSpeechCommander:
                     if bytes_to_include > 0:
                         valid_audio.append(audio_data[:bytes_to_include])
                 break
-            current_time += time_per_block
+            # Resampled blocks vary in length by a sample or so
+            current_time += len(audio_data) / bytes_per_second
         
         return b"".join(valid_audio)
 
@@ -556,28 +540,31 @@ class EnhancedSpeechCommander:
             return
         
         try:
-            audio_np = np.frombuffer(full_audio_bytes, dtype=np.int16).astype(np.float32) / 32768.0
+            audio_np = pcm16_to_float(full_audio_bytes)
             
             if audio_np.size == 0:
                 return
 
+            if not self.whisper.ready:
+                # Dictation waits here (audio keeps queueing) until the reload finishes
+                print("⏳ Waiting for the Whisper model to finish loading...")
+                self.status_callback("Status: Loading speech model...")
             print(f"Transcribing {len(audio_np)/self.samplerate:.2f} seconds of audio (up to stop phrase)...")
-            result = self.model.transcribe(audio_np, language='en', fp16=self.fp16, without_timestamps=True)
+            with self.governor.transcribing():
+                result, info = self.whisper.transcribe(audio_np, language='en', without_timestamps=True)
+            if info['escalated']:
+                print(f"🔁 Re-decoded with {self.whisper.large.name} ({info['reason']}) in {info['total_s']:.1f}s")
+            else:
+                print(f"⚡ Decoded with {self.whisper.small.name} in {info['total_s']:.1f}s")
             text = result.get('text', '').strip()
 
             # Clean up the transcribed text by removing stop phrases
-            cleaned_text = text
-            for stop_phrase in self.stop_phrases:
-                cleaned_text = cleaned_text.lower().replace(stop_phrase.lower(), "").strip()
-            
-            # Remove any remaining common stop words that might have been picked up
-            stop_words_to_remove = ["stop", "typing", "end"]
-            words = cleaned_text.split()
-            cleaned_words = [word for word in words if word.lower() not in stop_words_to_remove]
-            cleaned_text = " ".join(cleaned_words).strip()
+            cleaned_text = clean_transcript(text, self.stop_phrases)
 
             if cleaned_text:
                 print(f"Transcribed (cleaned): '{cleaned_text}'")
+                if self.phrase_callback:
+                    self.phrase_callback(cleaned_text, 'whisper')
                 self.status_callback(f"Transcribed: {cleaned_text}")
                 
                 if self._show_confirmation_dialog(cleaned_text):
@@ -613,73 +600,166 @@ class EnhancedSpeechCommander:
             self.mode = 'WAITING'
             self.status_callback("Status: Waiting for wake word or voice command...")
 
-    def run(self):
-        """Main loop for the enhanced speech commander."""
+    # === RECOGNIZER ROUTING ===
+    
+    def _sync_recognizers(self):
+        """Reset the recognizer that is about to resume when the mode changed since the last block."""
+        if self.mode == self.routed_mode:
+            return
+        if self.mode == 'DICTATING':
+            self.stop_recognizer.Reset()
+        elif self.routed_mode == 'DICTATING':
+            # Drop whatever the command recognizer had buffered before dictation
+            self.recognizer.Reset()
+            self.partial_commands.reset()
+        self.routed_mode = self.mode
+    
+    def _decode(self, recognizer, audio_data):
+        """AcceptWaveform, charging its CPU time and audio length to the current mode."""
+        cpu = time.thread_time()
+        accepted = recognizer.AcceptWaveform(audio_data)
+        stats = self.decode_stats.setdefault(self.mode, [0.0, 0.0])
+        stats[0] += time.thread_time() - cpu
+        stats[1] += len(audio_data) / (2 * self.samplerate)
+        return accepted
+    
+    def decode_cpu_report(self):
+        """Vosk decode CPU per mode, in ms of CPU per second of audio."""
+        return {mode: (cpu * 1000 / audio if audio else 0.0, audio)
+                for mode, (cpu, audio) in self.decode_stats.items()}
+    
+    def _handle_dictation_block(self, audio_data, current_time):
+        """While dictating only the stop-phrase grammar runs; Whisper decodes the speech later."""
+        if self._decode(self.stop_recognizer, audio_data):
+            text = json.loads(self.stop_recognizer.Result()).get("text", "")
+            if self._contains_stop_phrase(text):
+                print(f"🛑 STOP PHRASE DETECTED ('{text}')! Processing recorded speech...")
+                self.last_stop_detection_time = current_time
+                self._process_whisper_buffer()
+                if self.mode != 'DICTATING':
+                    return
+        
+        # Store audio data with timestamp
+        self.audio_segments.append((audio_data, current_time))
+        
+        # Limit buffer size to prevent memory issues (keep last 30 seconds)
+        max_segments = int(30 * self.samplerate / self.blocksize)
+        if len(self.audio_segments) > max_segments:
+            self.audio_segments.popleft()
+            # Adjust buffer start time
+            if self.audio_segments:
+                self.buffer_start_time = self.audio_segments[0][1]
+    
+    def _handle_command_block(self, audio_data, current_time):
+        """Wake phrases and browser/system commands on the full recognizer."""
+        accepted = self._decode(self.recognizer, audio_data)
+        if not accepted:
+            partial = json.loads(self.recognizer.PartialResult()).get("partial", "")
+            if partial:
+                if self.mode == 'WAITING' and not self.whisper.ready and self._contains_wake_phrase(partial):
+                    # Start reloading Whisper while the wake phrase is still being said
+                    self.whisper.prefetch()
+                command = self.partial_commands.update(partial) if self.early_commands else None
+                if command:
+                    print(f"⚡ Executing command: '{command}' (early, from partial '{partial}')")
+                    self.browser_commands[command]()
+            return
+        
+        text = json.loads(self.recognizer.Result()).get("text", "")
+        if self.partial_commands.final(text):
+            return  # Already fired from the partial result
+        
+        if text.strip() and len(text.strip()) > 2:
+            print(f"Vosk heard: '{text}' (Mode: {self.mode})")
+            if self.phrase_callback:
+                self.phrase_callback(text, 'vosk')
+            
+            # Check for browser/system commands first
+            if self._check_browser_command(text):
+                return
+                
+            # Then check for dictation commands
+            elif self._contains_wake_phrase(text) and self.mode == 'WAITING':
+                print("🎤 WAKE PHRASE DETECTED! Starting to record...")
+                self.whisper.prefetch()
+                self.mode = 'DICTATING'
+                self.status_callback("Status: 🔴 RECORDING... (say 'stop typing' when done)")
+                self.audio_segments.clear()
+                self.buffer_start_time = current_time
+                self.last_stop_detection_time = None
+
+    def start_session(self):
+        """Register the calling thread with the governor and print the instructions."""
         print("Enhanced Speech Commander thread started.")
+        # Pin this thread (and the torch threads it starts) and size torch's pool
+        self.governor = get_governor()
+        self.governor.register_thread('speech')
+        # Load Whisper only now, so the loader and its torch threads inherit the pinning
+        self.whisper.prefetch()
         print("🎯 Say 'START TYPING' clearly to begin dictation!")
         print("🎯 Or use any of the voice commands listed above!")
         print("🛑 Say 'STOP TYPING' to end recording")
         print("=" * 80)
-        
-        mic_config = {'device': 1, 'channels': 1, 'dtype': 'int16'}
-        
+    
+    def open_audio_stream(self, callback=None):
+        """The native-format microphone stream (not yet entered); blocks go to callback (default: self.q)."""
+        self.capture = AudioCapture(self.mic_config['device'], self.samplerate,
+                                    block_duration=self.blocksize / self.samplerate,
+                                    native_rate=self.mic_config['samplerate'],
+                                    channels=self.mic_config['channels'], blocks=self.q)
+        return self.capture.open_stream(callback)
+    
+    def handle_block(self, audio_data, current_time):
+        """Route one audio block to the recognizer for the current mode."""
+        self._sync_recognizers()
+        if self.mode == 'DICTATING':
+            self._handle_dictation_block(audio_data, current_time)
+        else:
+            self._handle_command_block(audio_data, current_time)
+    
+    def handle_silence(self):
+        """No audio for silence_duration: transcribe what was dictated so far."""
+        if self.mode == 'DICTATING':
+            print("--- Silence detected! Processing recorded speech. ---")
+            self._process_whisper_buffer()
+    
+    def close_session(self):
+        """Stop the model managers and print the CPU, model and cascade reports."""
+        if self.governor:
+            self.governor.unregister_thread('speech')
+        self.whisper.small.close()
+        self.whisper.large.close()
+        if self.capture and self.capture.stats['blocks']:
+            stats = self.capture.stats
+            print(f"📊 Capture: {self.capture.describe()}, "
+                  f"{stats['convert_s'] * 1000 / stats['blocks']:.2f} ms per block to convert")
+        for mode, (ms_per_s, audio_s) in self.decode_cpu_report().items():
+            print(f"📊 Vosk CPU while {mode}: {ms_per_s:.0f} ms per audio second ({audio_s:.0f}s of audio)")
+        for manager in (self.whisper.small, self.whisper.large):
+            stats = manager.stats
+            if stats['last_load_s'] is not None:
+                print(f"📊 Whisper {manager.name}: {stats['loads']} loads (last ready in {stats['last_load_s']:.1f}s), "
+                      f"{stats['evictions']} evictions, RSS {manager.rss_mb():.0f} MB")
+        if self.whisper.decodes:
+            print("📊 Whisper cascade:")
+            print(self.whisper.format_report())
+        print("Enhanced Speech Commander thread finished.")
+
+    def run(self):
+        """Main loop for the enhanced speech commander (runtime.speech_pipeline is the asyncio version)."""
+        self.start_session()
         try:
-            with sd.RawInputStream(samplerate=self.samplerate,
-                                   device=mic_config['device'],
-                                   channels=mic_config['channels'],
-                                   dtype=mic_config['dtype'],
-                                   blocksize=self.blocksize,
-                                   callback=self._audio_callback):
+            with self.open_audio_stream():
                 
-                print(f">>> Audio stream opened successfully with config: {mic_config} <<<")
+                print(f">>> Audio stream opened successfully: {self.capture.describe()} <<<")
                 
                 while not self.stop_event.is_set():
                     try:
-                        audio_data = self.q.get(timeout=self.silence_duration)
-                        current_time = time.time()
-                        
-                        # Process with main recognizer for wake/stop/command detection
-                        if self.recognizer.AcceptWaveform(audio_data):
-                            result_text = self.recognizer.Result()
-                            text = json.loads(result_text).get("text", "")
-                            
-                            if text.strip() and len(text.strip()) > 2:
-                                print(f"Vosk heard: '{text}' (Mode: {self.mode})")
-                                
-                                # Check for browser/system commands first (works in any mode)
-                                if self._check_browser_command(text):
-                                    continue
-                                    
-                                # Then check for dictation commands
-                                elif self._contains_wake_phrase(text) and self.mode == 'WAITING':
-                                    print("🎤 WAKE PHRASE DETECTED! Starting to record...")
-                                    self.mode = 'DICTATING'
-                                    self.status_callback("Status: 🔴 RECORDING... (say 'stop typing' when done)")
-                                    self.audio_segments.clear()
-                                    self.buffer_start_time = current_time
-                                    self.last_stop_detection_time = None
-                                
-                                elif self._contains_stop_phrase(text) and self.mode == 'DICTATING':
-                                    print("🛑 STOP PHRASE DETECTED! Processing recorded speech...")
-                                    self.last_stop_detection_time = current_time
-                                    self._process_whisper_buffer()
-                        
-                        # Store audio data with timestamp if we're dictating
-                        if self.mode == 'DICTATING':
-                            self.audio_segments.append((audio_data, current_time))
-                            
-                            # Limit buffer size to prevent memory issues (keep last 30 seconds)
-                            max_segments = int(30 * self.samplerate / self.blocksize)
-                            if len(self.audio_segments) > max_segments:
-                                self.audio_segments.popleft()
-                                # Adjust buffer start time
-                                if self.audio_segments:
-                                    self.buffer_start_time = self.audio_segments[0][1]
+                        audio_data, timestamp = self.capture.get(timeout=self.silence_duration)
+                        self.handle_block(audio_data, timestamp)
 
                     except queue.Empty:
-                        if self.mode == 'DICTATING':
-                            print("--- Silence detected! Processing recorded speech. ---")
-                            self._process_whisper_buffer()
+                        self.handle_silence()
                         continue
                     except Exception as e:
                         print(f"An error occurred in speech loop: {e}")
@@ -688,7 +768,7 @@ class EnhancedSpeechCommander:
         except Exception as e:
             print(f"Could not open audio stream: {e}")
 
-        print("Enhanced Speech Commander thread finished.")
+        self.close_session()
 
     def cleanup(self):
         """Clean up tkinter resources."""
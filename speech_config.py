@@ -0,0 +1,105 @@
+"""Speech settings and helpers shared by the commander, the daemon and the offline tools.
+
+Only os and numpy are imported at module level (torch and Whisper load on the
+first load_whisper_model call), so headless scripts can use the phrase tables
+without the desktop stack the commander needs.
+"""
+import os
+import numpy as np
+
+WHISPER_MODEL = "medium"
+WHISPER_FAST_MODEL = "base.en"  # First pass of the cascade (see whisper_cascade.py)
+VOSK_MODEL_PATH = os.path.join("model", "vosk-model-small-en-us-0.15")
+
+WAKE_PHRASES = ["start typing", "begin typing", "start dictation"]
+STOP_PHRASES = ["stop typing", "end typing", "stop", "stop dictation"]
+
+# Words that can survive in a transcript after the stop phrase itself is removed
+STOP_WORDS_TO_REMOVE = ["stop", "typing", "end"]
+
+
+def load_whisper_model(name=WHISPER_MODEL):
+    """Load a Whisper model on the best device; returns (model, device, fp16)."""
+    import torch
+    import whisper
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    fp16 = device == "cuda"
+    print(f"Using device: {device} (FP16: {fp16})")
+    return whisper.load_model(name, device=device), device, fp16
+
+
+def pcm16_to_float(audio_bytes):
+    """Convert raw 16-bit PCM bytes to the float32 [-1, 1) samples Whisper expects."""
+    return np.frombuffer(audio_bytes, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+def float_to_pcm16(audio):
+    """Float samples in [-1, 1) to raw 16-bit PCM bytes (what Vosk and the dictation buffer take)."""
+    return np.clip(audio * 32768.0, -32768, 32767).astype(np.int16).tobytes()
+
+
+def clean_transcript(text, stop_phrases):
+    """Strip stop phrases (and stray stop words) from a Whisper transcript."""
+    cleaned_text = text
+    for stop_phrase in stop_phrases:
+        cleaned_text = cleaned_text.lower().replace(stop_phrase.lower(), "").strip()
+    
+    # Remove any remaining common stop words that might have been picked up
+    words = cleaned_text.split()
+    cleaned_words = [word for word in words if word.lower() not in STOP_WORDS_TO_REMOVE]
+    return " ".join(cleaned_words).strip()
+
+
+# Voice commands for browser & app control: phrase -> handler method name,
+# or (method name, argument)
+BROWSER_COMMANDS = {
+    # Tab Management
+    "close tab": "_close_tab",
+    "new tab": "_new_tab",
+    "next tab": "_next_tab",
+    "previous tab": "_previous_tab",
+    "reopen tab": "_reopen_tab",
+    "duplicate tab": "_duplicate_tab",
+
+    # Window Management
+    "new window": "_new_window",
+    "close window": "_close_window",
+    "minimize window": "_minimize_window",
+    "maximize window": "_maximize_window",
+    "switch window": "_switch_window",
+
+    # Navigation
+    "go back": "_go_back",
+    "go forward": "_go_forward",
+    "refresh page": "_refresh_page",
+    "refresh": "_refresh_page",
+    "reload": "_refresh_page",
+    "home page": "_go_home",
+    "open bookmarks": "_open_bookmarks",
+
+    # Browser Specific
+    "open incognito": "_open_incognito",
+    "open private": "_open_incognito",
+    "developer tools": "_open_dev_tools",
+    "view source": "_view_source",
+    "full screen": "_toggle_fullscreen",
+    "zoom in": "_zoom_in",
+    "zoom out": "_zoom_out",
+    "zoom reset": "_zoom_reset",
+
+    # Application Control
+    "open chrome": ("_open_application", "chrome"),
+    "open firefox": ("_open_application", "firefox"),
+    "open edge": ("_open_application", "msedge"),
+    "open notepad": ("_open_application", "notepad"),
+    "open calculator": ("_open_application", "calc"),
+    "open file explorer": ("_open_application", "explorer"),
+    "open task manager": "_open_task_manager",
+
+    # System Control
+    "alt tab": "_alt_tab",
+    "show desktop": "_show_desktop",
+    "lock screen": "_lock_screen",
+    "take screenshot": "_take_screenshot",
+    "open start menu": "_open_start_menu",
+}
@@ -0,0 +1,359 @@
+"""Local speech service: one resident Vosk + Whisper model set shared by many clients.
+
+Clients connect to a Unix socket and exchange newline-delimited JSON:
+
+    {"op": "transcribe", "path": "clip.wav"}            -> {"text": ..., "queue_ms": ..., ...}
+    {"op": "transcribe", "audio": "<base64 PCM16>"}     (16 kHz mono)
+    {"op": "stream_start"}                              -> {"ok": true}
+    {"op": "audio", "audio": "<base64 PCM16>"}          -> {"events": [...]}
+    {"op": "stream_end"}                                -> {"events": [...]}
+    {"op": "stats"}                                     -> queue depth, batches, loads
+
+A dictation ends at a stop phrase, at stream_end, or - like the commander's
+silence timeout - when no audio arrives for silence_duration; in that last
+case the daemon pushes {"push": true, "events": [...]} on its own.
+
+Streams get their own Vosk recognizers (cheap, sharing one Vosk model) and
+emit the same wake/command/stop decisions as the speech commander, without
+acting on them; dictated audio comes back as a transcript event. All Whisper
+work - file requests and dictations from every client - goes through one
+queue, and the worker decodes whatever is waiting (up to --batch-size) in a
+single batched call.
+
+The socket is created mode 0600 in $XDG_RUNTIME_DIR (else a private per-user
+directory), and serve refuses to start while another daemon answers on it.
+
+    python speech_daemon.py serve [--socket PATH]
+    python speech_daemon.py transcribe clip.wav [--socket PATH]
+"""
+import argparse
+import base64
+import json
+import os
+import queue
+import socket
+import socketserver
+import stat
+import threading
+import time
+from vosk import Model, KaldiRecognizer
+
+from batch_transcribe import BatchTranscriber, SAMPLE_RATE, WINDOW_SECONDS, read_wav
+from partial_commands import PartialCommandMatcher
+from speech_client import DEFAULT_SOCKET, SpeechClient
+from speech_config import (BROWSER_COMMANDS, STOP_PHRASES, VOSK_MODEL_PATH, WAKE_PHRASES, WHISPER_MODEL,
+                           clean_transcript, load_whisper_model, pcm16_to_float)
+from whisper_manager import WhisperModelManager
+
+
+class TranscriptionRequest:
+    def __init__(self, name, audio):
+        self.name = name
+        self.audio = audio
+        self.queued = time.perf_counter()
+        self.done = threading.Event()
+        self.record = None
+
+
+class WhisperWorker(threading.Thread):
+    """Decodes queued requests from all clients in batches on one resident model."""
+
+    def __init__(self, manager, batch_size=8, batch_window=0.02):
+        super().__init__(daemon=True, name="WhisperWorker")
+        self.manager = manager
+        self.batch_size = batch_size
+        self.batch_window = batch_window  # Wait this long for more requests to join a batch
+        self.queue = queue.Queue()
+        self.stats = {'requests': 0, 'batches': 0, 'audio_s': 0.0, 'busy_s': 0.0}
+
+    def submit(self, name, audio):
+        """Queue audio and block until its transcript record is ready."""
+        request = TranscriptionRequest(name, audio)
+        self.queue.put(request)
+        request.done.wait()
+        return request.record
+
+    def _collect(self):
+        batch = [self.queue.get()]
+        deadline = time.perf_counter() + self.batch_window
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get(timeout=max(0.0, deadline - time.perf_counter())))
+            except queue.Empty:
+                break
+        return batch
+
+    def run(self):
+        while True:
+            batch = self._collect()
+            start = time.perf_counter()
+            try:
+                with self.manager.use() as model:
+                    transcriber = BatchTranscriber(model, self.manager.fp16, self.batch_size)
+                    short = [r for r in batch if len(r.audio) <= WINDOW_SECONDS * SAMPLE_RATE]
+                    records = dict(zip(map(id, short), transcriber.decode_batch([(r.name, r.audio) for r in short])
+                                       if short else []))
+                    for r in batch:
+                        if id(r) not in records:
+                            records[id(r)] = transcriber.decode_long(r.name, r.audio)
+            except Exception as e:
+                records = {id(r): {'file': r.name, 'error': str(e)} for r in batch}
+            finished = time.perf_counter()
+
+            self.stats['requests'] += len(batch)
+            self.stats['batches'] += 1
+            self.stats['busy_s'] += finished - start
+            for r in batch:
+                self.stats['audio_s'] += len(r.audio) / SAMPLE_RATE
+                r.record = dict(records[id(r)], queue_ms=round((start - r.queued) * 1000, 1),
+                                decode_ms=round((finished - start) * 1000, 1), batch=len(batch))
+                r.done.set()
+
+
+class SpeechStream:
+    """One client's live audio: wake phrases, commands and dictation, like the commander's loop."""
+
+    def __init__(self, vosk_model, worker):
+        self.worker = worker
+        self.recognizer = KaldiRecognizer(vosk_model, SAMPLE_RATE)
+        self.stop_recognizer = KaldiRecognizer(vosk_model, SAMPLE_RATE, json.dumps(STOP_PHRASES + ["[unk]"]))
+        self.commands = PartialCommandMatcher(BROWSER_COMMANDS.keys())
+        self.mode = 'WAITING'
+        self.dictation = []
+        self.finished = None  # Audio of a dictation _feed() just ended, transcribed once the lock is released
+        self.last_audio = time.monotonic()
+        # feed() on the handler thread vs flush_silence() on the watcher; never held during a Whisper decode
+        self.lock = threading.Lock()
+
+    def _contains(self, phrases, text):
+        return any(phrase in text.lower() for phrase in phrases)
+
+    def _take_dictation(self):
+        """End the dictation (lock held) and return its audio."""
+        audio = pcm16_to_float(b"".join(self.dictation))
+        self.dictation = []
+        self.mode = 'WAITING'
+        self.recognizer.Reset()
+        self.commands.reset()
+        return audio
+
+    def _transcribe(self, audio):
+        """Transcript event for dictated audio (lock not held: the decode may load a model)."""
+        if audio is None or not audio.size:
+            return []
+        record = self.worker.submit("dictation", audio)
+        if 'raw_text' in record:
+            record['text'] = clean_transcript(record['raw_text'], STOP_PHRASES)
+        return [dict(record, type='transcript')]
+
+    def flush_silence(self, silence_duration):
+        """No audio for silence_duration while dictating: transcribe what was dictated so far."""
+        with self.lock:
+            if self.mode != 'DICTATING' or time.monotonic() - self.last_audio < silence_duration:
+                return []
+            audio = self._take_dictation()
+        return [{'type': 'silence'}] + self._transcribe(audio)
+
+    def feed(self, pcm):
+        """Process one block of 16 kHz PCM16 and return the events it produced."""
+        with self.lock:
+            self.last_audio = time.monotonic()
+            events = self._feed(pcm)
+            audio, self.finished = self.finished, None
+        return events + self._transcribe(audio)
+
+    def _feed(self, pcm):
+        if self.mode == 'DICTATING':
+            if self.stop_recognizer.AcceptWaveform(pcm):
+                text = json.loads(self.stop_recognizer.Result()).get("text", "")
+                if self._contains(STOP_PHRASES, text):
+                    self.finished = self._take_dictation()
+                    return [{'type': 'stop', 'text': text}]
+            self.dictation.append(pcm)
+            return []
+
+        if not self.recognizer.AcceptWaveform(pcm):
+            partial = json.loads(self.recognizer.PartialResult()).get("partial", "")
+            command = self.commands.update(partial) if partial else None
+            return [{'type': 'command', 'command': command, 'early': True}] if command else []
+
+        text = json.loads(self.recognizer.Result()).get("text", "")
+        if self.commands.final(text) or len(text.strip()) <= 2:
+            return []
+        command = self.commands.match(text)
+        if command:
+            return [{'type': 'command', 'command': command, 'early': False}]
+        if self._contains(WAKE_PHRASES, text):
+            self.mode = 'DICTATING'
+            self.stop_recognizer.Reset()
+            self.worker.manager.prefetch()
+            return [{'type': 'wake', 'text': text}]
+        return []
+
+    def close(self):
+        """End of stream: transcribe any dictation still in progress."""
+        with self.lock:
+            audio = self._take_dictation() if self.mode == 'DICTATING' and self.dictation else None
+        return self._transcribe(audio)
+
+
+class SpeechRequestHandler(socketserver.StreamRequestHandler):
+    def setup(self):
+        super().setup()
+        self.write_lock = threading.Lock()  # Replies vs pushed silence flushes
+        self.stream_ended = threading.Event()
+
+    def send(self, message):
+        with self.write_lock:
+            self.wfile.write((json.dumps(message) + "\n").encode())
+
+    def watch_silence(self, stream, ended):
+        """Flush the stream's dictation after silence_duration without audio."""
+        silence = self.server.silence_duration
+        while not ended.wait(silence / 4):
+            try:
+                events = stream.flush_silence(silence)
+                if events:
+                    self.send({'push': True, 'events': events})
+            except OSError:
+                return  # Client went away
+
+    def handle(self):
+        server = self.server
+        stream = None
+        server.client_connected(1)
+        try:
+            for line in self.rfile:
+                request = {}
+                try:
+                    request = json.loads(line)
+                    op = request.get('op')
+                    if op == 'transcribe':
+                        if 'path' in request:
+                            audio, name = read_wav(request['path']), os.path.basename(request['path'])
+                        else:
+                            audio, name = pcm16_to_float(base64.b64decode(request['audio'])), request.get('name', 'audio')
+                        reply = server.worker.submit(name, audio)
+                    elif op == 'stream_start':
+                        self.stream_ended.set()
+                        stream = SpeechStream(server.vosk_model, server.worker)
+                        self.stream_ended = threading.Event()
+                        threading.Thread(target=self.watch_silence, args=(stream, self.stream_ended),
+                                         daemon=True, name="SpeechSilence").start()
+                        reply = {'ok': True}
+                    elif op == 'audio' and stream is None:
+                        reply = {'error': 'no stream; send stream_start first'}
+                    elif op == 'audio':
+                        reply = {'events': stream.feed(base64.b64decode(request['audio']))}
+                    elif op == 'stream_end':
+                        self.stream_ended.set()
+                        reply = {'events': stream.close() if stream else []}
+                        stream = None
+                    elif op == 'stats':
+                        reply = server.stats()
+                    else:
+                        reply = {'error': f"unknown op {op!r}"}
+                except Exception as e:
+                    reply = {'error': str(e)}
+                if 'id' in request:
+                    reply['id'] = request['id']
+                self.send(reply)
+        finally:
+            self.stream_ended.set()
+            server.client_connected(-1)
+
+
+class SpeechDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix-socket speech server; one handler thread per client, one shared model set."""
+
+    daemon_threads = True
+
+    def __init__(self, path=DEFAULT_SOCKET, whisper_model=WHISPER_MODEL, batch_size=8, idle_timeout=600.0,
+                 silence_duration=1.0):
+        self.claim_socket(path)
+        self.silence_duration = silence_duration  # Seconds without audio that end a dictation
+        print("Loading Vosk model...")
+        self.vosk_model = Model(VOSK_MODEL_PATH)
+        self.whisper = WhisperModelManager(load_whisper_model, whisper_model, idle_timeout=idle_timeout)
+        self.whisper.prefetch()
+        self.worker = WhisperWorker(self.whisper, batch_size=batch_size)
+        self.worker.start()
+        self.clients = 0
+        self.clients_lock = threading.Lock()
+        super().__init__(path, SpeechRequestHandler)
+        print(f"🎧 Speech daemon listening on {path}")
+
+    @staticmethod
+    def claim_socket(path):
+        """Refuse to start if a daemon answers on path; otherwise remove a stale socket left behind."""
+        directory = os.path.dirname(path)
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        if os.stat(directory).st_uid != os.getuid():
+            raise RuntimeError(f"{directory} belongs to another user; pass --socket in a directory you own")
+        if not os.path.lexists(path):
+            return
+        if not stat.S_ISSOCK(os.lstat(path).st_mode):
+            raise RuntimeError(f"{path} exists and is not a socket")
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            os.unlink(path)  # Left behind by a daemon that didn't shut down cleanly
+            return
+        finally:
+            probe.close()
+        raise RuntimeError(f"a speech daemon is already running on {path}")
+
+    def server_bind(self):
+        """Bind with a 0600 socket, so only this user can connect."""
+        umask = os.umask(0o177)
+        try:
+            super().server_bind()
+        finally:
+            os.umask(umask)
+        os.chmod(self.server_address, 0o600)
+
+    def client_connected(self, delta):
+        with self.clients_lock:
+            self.clients += delta
+
+    def stats(self):
+        stats = dict(self.worker.stats, queue_depth=self.worker.queue.qsize(), clients=self.clients,
+                     model_state=self.whisper.state)
+        stats.update({f"whisper_{k}": v for k, v in self.whisper.stats.items()})
+        return stats
+
+    def server_close(self):
+        super().server_close()
+        self.whisper.close()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Shared local speech recognition service.")
+    parser.add_argument("command", choices=['serve', 'transcribe', 'stats'])
+    parser.add_argument("files", nargs="*", help="WAV files for 'transcribe'")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help="Unix socket path")
+    parser.add_argument("--model", default=WHISPER_MODEL, help="Whisper model to keep resident")
+    parser.add_argument("--batch-size", type=int, default=8, help="Max requests per batched Whisper call")
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        try:
+            daemon = SpeechDaemon(args.socket, args.model, args.batch_size)
+        except RuntimeError as e:
+            raise SystemExit(f"❌ {e}")
+        try:
+            daemon.serve_forever()
+        except KeyboardInterrupt:
+            print("\n🛑 Speech daemon stopped")
+        finally:
+            daemon.server_close()
+    else:
+        client = SpeechClient(args.socket)
+        if args.command == 'stats':
+            print(json.dumps(client.request(op='stats'), indent=2))
+        for path in args.files:
+            print(json.dumps(client.transcribe_file(path)))
+        client.close()
@@ -0,0 +1,64 @@
+import importlib
+import sys
+import threading
+import time
+
+# Heavy third-party modules each engine pulls in, in the order they get imported
+ENGINE_DEPENDENCIES = {
+    'virtual_mouse': ['numpy', 'cv2', 'mediapipe', 'pyautogui'],
+    'speech_commander': ['numpy', 'torch', 'whisper', 'vosk', 'sounddevice', 'pyautogui', 'psutil'],
+}
+
+
+class StartupProfile:
+    """Wall-clock breakdown of app startup: phases, per-module import times, first frame.
+
+    Imports are timed one module at a time in dependency order, so each entry
+    is roughly that module's own cost (like the 'self' column of
+    python -X importtime); modules that were already loaded cost nothing.
+    """
+
+    def __init__(self, origin=None):
+        self.origin = origin if origin is not None else time.perf_counter()
+        self.lock = threading.Lock()
+        self.phases = []   # (name, ms since origin)
+        self.imports = {}  # module -> ms spent importing it
+
+    def mark(self, phase):
+        with self.lock:
+            self.phases.append((phase, (time.perf_counter() - self.origin) * 1000))
+
+    def import_module(self, name):
+        """Import a module (timing it if it wasn't loaded yet) and return it."""
+        if name in sys.modules:
+            return sys.modules[name]
+        start = time.perf_counter()
+        module = importlib.import_module(name)
+        with self.lock:
+            self.imports[name] = (time.perf_counter() - start) * 1000
+        return module
+
+    def import_engine(self, name):
+        """Import an engine module after its dependencies, timing each one."""
+        for dependency in ENGINE_DEPENDENCIES.get(name, []):
+            try:
+                self.import_module(dependency)
+            except ImportError as e:
+                print(f"⚠️ {name}: could not import {dependency} ({e})")
+        return self.import_module(name)
+
+    def phase_ms(self, phase):
+        for name, ms in self.phases:
+            if name == phase:
+                return ms
+        return None
+
+    def format_report(self):
+        lines = ["⏱️ Startup profile (ms since launch)"]
+        for name, ms in self.phases:
+            lines.append(f"   {name:<32}{ms:>9.0f}")
+        if self.imports:
+            lines.append(f"   {'import':<32}{'self ms':>9}")
+            for module, ms in sorted(self.imports.items(), key=lambda item: -item[1]):
+                lines.append(f"   {module:<32}{ms:>9.0f}")
+        return "\n".join(lines)
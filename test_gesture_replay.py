@@ -0,0 +1,102 @@
+"""Regression tests for gesture decisions: replay synthetic traces and check the pointer events."""
+import numpy as np
+import pytest
+
+from gesture_engine import GestureSpec
+from gesture_trace import replay_trace
+from pointer_backend import RecordingPointer
+from virtual_mouse import GestureController
+
+FPS = 30
+
+# Fingertips spread out so the thumb never passes another tip on its way to a pinch
+TIPS = {'index': (0.5, 0.35), 'middle': (0.35, 0.5), 'ring': (0.2, 0.5), 'little': (0.35, 0.7)}
+TIP_IDS = {'index': 8, 'middle': 12, 'ring': 16, 'little': 20}
+
+
+def hand(thumb_on='index', offset=(0.0, 0.0)):
+    """(21, 3) landmarks with the thumb tip on one fingertip, shifted by offset."""
+    points = np.zeros((21, 3))
+    points[:, 1] = 0.75
+    points[[5, 6, 7], :2] = [[0.5, 0.6], [0.5, 0.5], [0.5, 0.42]]  # Straight index finger
+    for finger, tip in TIPS.items():
+        points[TIP_IDS[finger], :2] = tip
+    points[4, :2] = np.add(TIPS[thumb_on], (0.01, 0.01))
+    points[:, :2] += offset
+    return points
+
+
+def make_trace(segments):
+    """segments: (thumb_on, frames, velocity) runs; the hand moves by velocity (per second) throughout."""
+    timestamps, landmarks = [], []
+    position = np.zeros(2)
+    for thumb_on, frames, velocity in segments:
+        for _ in range(frames):
+            timestamps.append(len(timestamps) / FPS)
+            landmarks.append(hand(thumb_on, position))
+            position = position + np.asarray(velocity) / FPS
+    return {
+        'timestamps': np.array(timestamps),
+        'landmarks': np.array(landmarks, dtype=np.float32),
+        'hand_present': np.ones(len(timestamps), dtype=bool),
+    }
+
+
+@pytest.fixture
+def controller():
+    return GestureController(pointer=RecordingPointer())
+
+
+def of_type(events, *types):
+    return [e for e in events if e['type'] in types]
+
+
+def test_left_pinch_clicks_then_drags(controller):
+    trace = make_trace([('index', 10, (0.1, 0.0)), ('middle', 20, (0.1, 0.0)), ('index', 10, (0.1, 0.0))])
+    events = replay_trace(trace, controller)['events']
+
+    buttons = of_type(events, 'down', 'up', 'click')
+    assert [(e['type'], e['button']) for e in buttons] == [('down', 'left'), ('up', 'left')]
+    down, up = buttons
+
+    moves = of_type(events, 'move')
+    assert any(e['t'] < down['t'] for e in moves)  # Cursor control before the pinch
+    drag = [e for e in moves if down['t'] < e['t'] < up['t']]
+    assert drag, "the cursor should follow the held pinch"
+    assert min(e['t'] for e in drag) >= down['t'] + controller.drag_hold_time - 1e-9
+
+
+def test_little_pinch_right_clicks(controller):
+    trace = make_trace([('index', 10, (0.0, 0.0)), ('little', 10, (0.0, 0.0)), ('index', 10, (0.0, 0.0))])
+    events = replay_trace(trace, controller)['events']
+
+    buttons = of_type(events, 'down', 'up', 'click')
+    assert [(e['type'], e['button']) for e in buttons] == [('click', 'right')]
+
+
+def test_scroll_coasts_after_release(controller):
+    # Ring pinch while the hand moves up, then back to the cursor pose and still
+    trace = make_trace([('index', 10, (0.0, 0.0)), ('ring', 15, (0.0, -0.4)), ('index', 45, (0.0, 0.0))])
+    events = replay_trace(trace, controller)['events']
+    released = trace['timestamps'][25]
+
+    scrolls = of_type(events, 'scroll')
+    assert scrolls and all(e['amount'] > 0 for e in scrolls)  # Moving the hand up scrolls up
+    cursor_back = min(e['t'] for e in of_type(events, 'move') if e['t'] > released)
+    coast = [e for e in scrolls if e['t'] > cursor_back]
+    assert coast, "scrolling should coast on under the cursor pose"
+    assert coast[-1]['t'] < trace['timestamps'][-1] - 0.2  # ...and come to rest
+    assert not of_type(events, 'down', 'up', 'click')
+
+
+def test_user_gesture_without_release_bounds_releases(controller):
+    # A hand-written gestures.json entry: enter bounds only
+    copy = GestureSpec.from_dict({'name': 'copy', 'action': 'hotkey:ctrl+c', 'priority': 50,
+                                  'constraints': [{'feature': 'middle_pinch', 'max': 0.04}]})
+    controller.gesture_engine.set_gestures(controller.gesture_engine.specs + [copy])
+    trace = make_trace([('index', 10, (0.0, 0.0)), ('middle', 10, (0.0, 0.0)), ('index', 10, (0.0, 0.0)),
+                        ('little', 10, (0.0, 0.0)), ('index', 10, (0.0, 0.0))])
+    events = replay_trace(trace, controller)['events']
+
+    actions = of_type(events, 'hotkey', 'down', 'up', 'click')
+    assert [e.get('keys') or e['button'] for e in actions] == [['ctrl', 'c'], 'right']
@@ -0,0 +1,37 @@
+import queue
+
+
+class UIEventBus:
+    """Thread-safe hand-off of engine status and metrics to the Tk main loop.
+
+    Engine threads post (topic, payload) events from any thread; they never
+    touch widgets. The GUI drains the queue on a fixed tick, and a burst of
+    events on one topic collapses into the newest one, so the number of
+    widget updates per tick is bounded by the number of topics, however fast
+    the engines emit.
+    """
+
+    def __init__(self):
+        self.queue = queue.SimpleQueue()
+        self.posted = 0
+        self.applied = 0
+
+    def post(self, topic, payload=None):
+        self.queue.put((topic, payload))
+
+    def poster(self, topic):
+        """Return a one-argument callback that posts to `topic` (for engine callbacks)."""
+        return lambda payload=None: self.post(topic, payload)
+
+    def drain(self):
+        """Return the newest payload per topic since the last drain, in first-posted order."""
+        latest = {}
+        while True:
+            try:
+                topic, payload = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            latest[topic] = payload
+            self.posted += 1
+        self.applied += len(latest)
+        return list(latest.items())
@@ -1,43 +1,63 @@
 import cv2
-import mediapipe as mp
-import pyautogui
-import math
 import time
 import numpy as np
-from collections import deque
 import threading
+from cursor_filters import create_cursor_filter
+from cursor_actuator import CursorActuator
+from scroll_actuator import ScrollActuator
+from pointer_backend import PyAutoGUIPointer
+from gesture_trace import TraceRecorder
+from frame_sources import open_frame_source
+from motion_gate import MotionGate
+from latency import LatencyTracker
+from hand_tracking import create_hand_tracker, draw_hand
+from resource_governor import get_governor
+from gesture_engine import GestureEngine, default_gesture_specs, landmarks_to_array, load_gesture_file
 
 class GestureController:
-    def __init__(self):
-        # Initialize MediaPipe Hands with improved settings
-        self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
-            static_image_mode=False,
-            max_num_hands=1,
-            min_detection_confidence=0.8,
-            min_tracking_confidence=0.7
-        )
-        self.mp_draw = mp.solutions.drawing_utils
+    def __init__(self, pointer=None, record_path=None, metrics_callback=None):
+        # Hand tracker is created in open_session() so replay doesn't need a camera model.
+        # 'legacy' = synchronous mp.solutions.hands, 'tasks' = HandLandmarker in
+        # LIVE_STREAM mode (async, falls back to legacy; see hand_tracking.py)
+        self.hands = None
+        self.owns_tracker = False  # Created by open_session (closed again by close_session)
+        self.hand_backend = 'legacy'
+        self.model_complexity = 1
+        self.hand_model_path = 'hand_landmarker.task'
+        self.tracker_threads = None
+        self.last_hand_points = None  # Newest landmarks, kept for drawing between async results
+        
+        # Pointer backend (pyautogui, or a RecordingPointer for replay/tests)
+        self.pointer = pointer if pointer is not None else PyAutoGUIPointer()
+        
+        # Optional landmark trace recording (see gesture_trace.py)
+        self.record_path = record_path
+        self.recorder = None
+        self.label_keys = {'l': 'left_click', 'r': 'right_click'}
         
         # Screen and frame dimensions
-        self.screen_width, self.screen_height = pyautogui.size()
+        self.screen_width, self.screen_height = self.pointer.size()
         self.frame_width, self.frame_height = 640, 480
         
-        # Improved smoothing with moving average
-        self.position_history = deque(maxlen=3)  # Reduced for more responsive cursor
-        
-        # Enhanced gesture detection with better thresholds
-        self.gesture_cooldown = 0.4  # Longer cooldown for better accuracy
-        self.last_gesture_time = 0
-        self.gesture_threshold_frames = 4  # More frames required for stability
-        self.gesture_counters = {
-            'cursor': 0,
-            'left_click': 0,
-            'right_click': 0,
-            'scroll': 0
+        # Cursor filter stage: 'one_euro' (speed-adaptive), 'kalman' (predictive)
+        # or 'moving_average' (the old 3-sample weighted average). On the synthetic
+        # trace (python cursor_filters.py) one_euro beats the moving average on both
+        # jitter and lag; kalman leads the hand by ~25 ms at roughly twice the jitter
+        self.filter_type = 'one_euro'
+        self.filter_params = {
+            'one_euro': {'min_cutoff': 1.0, 'beta': 0.03, 'd_cutoff': 1.0},
+            'kalman': {'process_noise': 3000.0, 'measurement_noise': 4.0, 'lookahead': 0.03},
+            'moving_average': {'window': 3},
         }
+        self.cursor_filter = create_cursor_filter(self.filter_type, **self.filter_params[self.filter_type])
+        self.cursor_dead_zone_px = 0  # The filter handles jitter; only skip no-op moves
+        
+        # Cursor output runs on its own thread at display rate (see run())
+        self.actuator_rate_hz = 144
+        self.actuator = None
+        self.last_cursor_target = None  # Last position we sent, instead of asking the OS
         
-        # More precise distance thresholds with better separation
+        # More precise distance thresholds with better separation (pinch enter)
         self.thresholds = {
             'cursor_control': 0.06,    # Index-thumb for cursor (back to original)
             'left_click': 0.04,        # Middle-thumb for left click (tighter)
@@ -45,24 +65,81 @@ class GestureController:
             'scroll': 0.05             # Ring-thumb for scroll
         }
         
+        # Hysteresis: a pinch is only released above these looser distances
+        self.release_thresholds = {
+            'left_click': 0.055,
+            'right_click': 0.055,
+            'scroll': 0.065
+        }
+        
+        # Table-driven gesture engine: built-in gestures from the thresholds above,
+        # plus user-calibrated gestures from gestures.json (see gesture_engine.py)
+        self.gesture_file = 'gestures.json'
+        self.landmark_smoothing = 0.6
+        self.gesture_engine = GestureEngine(self.build_gesture_specs(), smoothing=self.landmark_smoothing)
+        
+        # Pinch-and-drag: left pinch sends mouseDown on press and mouseUp on release,
+        # and the cursor follows the hand once the pinch is held this long
+        self.drag_enabled = True
+        self.drag_hold_time = 0.25
+        self.drag_offset = (0, 0)
+        
         # Coordinate mapping
         self.margin = 80
         self.dead_zone = 0.02
         
-        # Scroll state management
+        # Scroll: hand velocity drives a continuous scroll rate with inertia after
+        # release, emitted by its own thread at a steady rate (see scroll_actuator.py).
+        # run() starts a threaded one; replay ticks this one once per frame
         self.scroll_active = False
-        self.scroll_reference_y = 0
-        self.scroll_sensitivity = 0.02
-        self.scroll_step = 3
-        
-        # Performance optimization
-        pyautogui.FAILSAFE = False
-        pyautogui.PAUSE = 0
+        self.scroll_params = {
+            'rate_hz': 60,
+            'gain': 40.0,           # Scroll units/s per frame-height/s of hand speed
+            'acceleration': 2.0,    # Faster hand -> disproportionately faster scroll
+            'max_rate': 400.0,
+            'min_velocity': 0.05,   # Ignore hand drift slower than this
+            'decay_time': 0.35,     # Inertia time constant after release (s)
+        }
+        self.scroll_actuator = ScrollActuator(self.pointer, **self.scroll_params)
+        self.scroll_coasting = False  # Replay: keep ticking after release until the coast stops
         
         # Status tracking
         self.current_mode = "IDLE"
+        self.frame_time = time.time()  # Timestamp of the frame being processed
         self.fps_counter = 0
         self.fps_time = time.time()
+        self.fps = 0.0
+        
+        # Idle mode: after idle_after seconds without a hand, stop running MediaPipe,
+        # drop to idle_fps and wait for motion in tiny frame differences
+        self.idle_after = 5.0
+        self.idle_fps = 5
+        self.motion_gate = MotionGate()
+        self.idle = False
+        self.last_hand_time = time.time()
+        self.cpu_stats = {'ACTIVE': [0.0, 0.0], 'IDLE': [0.0, 0.0]}  # [cpu seconds, wall seconds]
+        self.cpu_mark = None
+        
+        # Latency histograms from capture to actuation, reported every metrics_interval
+        # seconds through metrics_callback (e.g. the App window) and logged to the console
+        self.latency = LatencyTracker()
+        self.metrics_callback = metrics_callback
+        self.metrics_interval = 1.0
+        
+        # Shared CPU governor: pins this thread and caps the frame rate while
+        # Whisper is transcribing on a busy machine (see resource_governor.py)
+        self.use_governor = True
+        self.governor = None
+        self.latency_log_interval = 30.0
+        self.last_metrics_time = time.time()
+        self.last_latency_log = time.time()
+        self.capture_time = None  # perf_counter timestamp of the frame being processed
+        
+        # Reused frame buffers (capture, RGB for inference, mirrored preview)
+        self.capture_buffer = None
+        self.rgb_buffer = None
+        self.display_buffer = None
+        self.filter_time = 0.0
         
         # Stop event for threading
         self.stop_event = None
@@ -75,54 +152,38 @@ class GestureController:
             'scroll': float('inf')
         }
         
-    def calculate_distance(self, p1, p2):
-        """Calculate Euclidean distance between two landmarks."""
-        return math.sqrt((p1.x - p2.x)**2 + (p1.y - p2.y)**2)
+    def set_cursor_filter(self, filter_type, **params):
+        """Switch the cursor filter stage, optionally overriding its parameters."""
+        self.filter_params.setdefault(filter_type, {}).update(params)
+        self.cursor_filter = create_cursor_filter(filter_type, **self.filter_params[filter_type])
+        self.filter_type = filter_type
     
-    def calculate_finger_angle(self, landmarks, finger_indices):
-        """Calculate the angle of finger extension for better gesture detection."""
-        # Get the three points of the finger (MCP, PIP, TIP)
-        mcp = landmarks[finger_indices[0]]
-        pip = landmarks[finger_indices[1]] 
-        tip = landmarks[finger_indices[2]]
-        
-        # Calculate vectors
-        v1 = np.array([pip.x - mcp.x, pip.y - mcp.y])
-        v2 = np.array([tip.x - pip.x, tip.y - pip.y])
-        
-        # Calculate angle between vectors
-        cosine_angle = np.dot(v1, v2) / (np.linalg.norm(v1) * np.linalg.norm(v2))
-        cosine_angle = np.clip(cosine_angle, -1.0, 1.0)
-        angle = np.arccos(cosine_angle)
-        
-        return np.degrees(angle)
+    def smooth_position(self, x, y, timestamp=None):
+        """Apply the configured cursor filter to a screen position."""
+        if timestamp is None:
+            timestamp = self.frame_time
+        start = time.perf_counter()
+        smooth_x, smooth_y = self.cursor_filter(x, y, timestamp)
+        self.filter_time += time.perf_counter() - start
+        smooth_x = max(0, min(self.screen_width - 1, smooth_x))
+        smooth_y = max(0, min(self.screen_height - 1, smooth_y))
+        return int(round(smooth_x)), int(round(smooth_y))
     
-    def is_finger_extended(self, landmarks, finger_indices, threshold_angle=160):
-        """Check if a finger is extended based on joint angles."""
-        try:
-            angle = self.calculate_finger_angle(landmarks, finger_indices)
-            return angle > threshold_angle
-        except:
-            return False
-    
-    def smooth_position(self, x, y):
-        """Apply smoothing to cursor position using moving average."""
-        self.position_history.append((x, y))
-        
-        if len(self.position_history) < 2:
-            return x, y
-        
-        total_weight = 0
-        smooth_x = 0
-        smooth_y = 0
-        
-        for i, (px, py) in enumerate(self.position_history):
-            weight = (i + 1) / len(self.position_history)
-            smooth_x += px * weight
-            smooth_y += py * weight
-            total_weight += weight
-        
-        return int(smooth_x / total_weight), int(smooth_y / total_weight)
+    def move_cursor(self, x, y):
+        """Hand a cursor target to the actuator thread (or move directly without one)."""
+        if self.last_cursor_target is not None:
+            last_x, last_y = self.last_cursor_target
+            if (abs(x - last_x) <= self.cursor_dead_zone_px and
+                    abs(y - last_y) <= self.cursor_dead_zone_px):
+                return
+        self.last_cursor_target = (x, y)
+        
+        if self.actuator:
+            self.actuator.set_target(x, y, self.capture_time)
+        else:
+            self.pointer.move_to(x, y)
+            if self.capture_time is not None:
+                self.latency.add('end_to_end', time.perf_counter() - self.capture_time)
     
     def map_coordinates(self, hand_x, hand_y):
         """Map hand coordinates to screen coordinates with improved accuracy."""
@@ -142,45 +203,27 @@ class GestureController:
         
         return screen_x, screen_y
     
-    def is_gesture_stable(self, gesture_name):
-        """Check if gesture is stable across multiple frames."""
-        self.gesture_counters[gesture_name] += 1
-        return self.gesture_counters[gesture_name] >= self.gesture_threshold_frames
+    def build_gesture_specs(self):
+        """Built-in gesture table plus any user gestures (which may override built-ins)."""
+        return (default_gesture_specs(self.thresholds, self.release_thresholds) +
+                load_gesture_file(self.gesture_file))
     
-    def reset_gesture_counters(self, exclude=None):
-        """Reset gesture counters, optionally excluding one."""
-        for key in self.gesture_counters:
-            if exclude and key == exclude:
-                continue
-            self.gesture_counters[key] = 0
+    def reload_gestures(self):
+        """Rebuild the gesture table after changing thresholds or the gesture file."""
+        self.release_gesture()
+        self.gesture_engine.set_gestures(self.build_gesture_specs())
     
-    def can_perform_gesture(self):
-        """Check if enough time has passed since last gesture."""
-        return time.time() - self.last_gesture_time > self.gesture_cooldown
-    
-    def perform_gesture(self, gesture_name):
-        """Execute a gesture with proper timing."""
-        if self.can_perform_gesture():
-            self.last_gesture_time = time.time()
-            return True
-        return False
+    def release_gesture(self):
+        """Release the held gesture (never leave the mouse button down) and reset detection."""
+        released = self.gesture_engine.release()
+        if released:
+            self.end_gesture(self.gesture_engine.spec(released))
     
     def draw_debug_info(self, img, landmarks):
         """Draw debug information on the image."""
-        if landmarks:
-            thumb_tip = landmarks[4]
-            index_tip = landmarks[8]
-            middle_tip = landmarks[12]
-            ring_tip = landmarks[16]
-            little_tip = landmarks[20]
-            
-            # Calculate distances
-            distances = {
-                'cursor': self.calculate_distance(index_tip, thumb_tip),
-                'left_click': self.calculate_distance(middle_tip, thumb_tip),
-                'right_click': self.calculate_distance(little_tip, thumb_tip),
-                'scroll': self.calculate_distance(ring_tip, thumb_tip)
-            }
+        if landmarks is not None:
+            # Smoothed distances from the last process_gestures call
+            distances = self.last_distances
             
             # Draw active area rectangle
             cv2.rectangle(img, 
@@ -191,7 +234,7 @@ class GestureController:
             # Draw distance indicators with better color coding
             y_offset = 30
             for gesture, distance in distances.items():
-                threshold = self.thresholds.get(gesture.replace('_click', '').replace('_', ''), 0.05)
+                threshold = self.thresholds['cursor_control' if gesture == 'cursor' else gesture]
                 
                 # Color coding: Green = Active, Yellow = Close, White = Inactive
                 if distance < threshold:
@@ -209,144 +252,297 @@ class GestureController:
             cv2.putText(img, f"Mode: {self.current_mode}", 
                        (10, self.frame_height - 60), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 255), 2)
             
-            # Show gesture counters for debugging
-            cv2.putText(img, f"Counters: L:{self.gesture_counters['left_click']} R:{self.gesture_counters['right_click']}", 
+            # Show the held gesture for debugging
+            engine = self.gesture_engine
+            held = engine.specs[engine.active].name if engine.active is not None else "none"
+            cv2.putText(img, f"Held: {held} ({len(engine.specs)} gestures)", 
                        (10, self.frame_height - 30), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 0), 1)
     
-    def process_gestures(self, landmarks):
-        """Process all hand gestures with improved accuracy and priority system."""
-        if not landmarks:
-            self.reset_gesture_counters()
+    def process_gestures(self, landmarks, timestamp=None):
+        """Classify the hand pose with the gesture engine and run the matching action."""
+        self.frame_time = timestamp if timestamp is not None else time.time()
+        self.coast_scroll()
+        if landmarks is None or not len(landmarks):
+            self.release_gesture()
             self.current_mode = "IDLE"
             return
         
-        # Get landmark positions
-        thumb_tip = landmarks[4]
-        index_tip = landmarks[8]
-        middle_tip = landmarks[12]
-        ring_tip = landmarks[16]
-        little_tip = landmarks[20]
-        
-        # Calculate distances
-        cursor_distance = self.calculate_distance(index_tip, thumb_tip)
-        left_click_distance = self.calculate_distance(middle_tip, thumb_tip)
-        right_click_distance = self.calculate_distance(little_tip, thumb_tip)
-        scroll_distance = self.calculate_distance(ring_tip, thumb_tip)
-        
-        # Store current distances
-        self.last_distances['cursor'] = cursor_distance
-        self.last_distances['left_click'] = left_click_distance
-        self.last_distances['right_click'] = right_click_distance
-        self.last_distances['scroll'] = scroll_distance
-        
-        # Check finger extension states for better accuracy
-        index_extended = self.is_finger_extended(landmarks, [5, 6, 8])  # Index finger joints
-        middle_extended = self.is_finger_extended(landmarks, [9, 10, 12])  # Middle finger joints
-        ring_extended = self.is_finger_extended(landmarks, [13, 14, 16])  # Ring finger joints
-        little_extended = self.is_finger_extended(landmarks, [17, 18, 20])  # Little finger joints
-        
-        # PRIORITY SYSTEM: Check click gestures FIRST (they have tighter thresholds)
-        
-        # --- LEFT CLICK (Middle finger + Thumb) - HIGHEST PRIORITY ---
-        if (left_click_distance < self.thresholds['left_click'] and 
-            not middle_extended and  # Middle finger should be bent/touching
-            cursor_distance > self.thresholds['cursor_control']):  # Index should NOT be touching
-            
-            self.reset_gesture_counters(exclude='left_click')
-            if self.is_gesture_stable('left_click') and self.perform_gesture('left_click'):
-                self.current_mode = "LEFT_CLICK"
-                pyautogui.click(button='left')
-                print("✓ Left Click Performed")
-                # Reset counters after successful click
-                self.reset_gesture_counters()
-                return  # Exit early to prevent other gestures
-        
-        # --- RIGHT CLICK (Little finger + Thumb) - HIGH PRIORITY ---
-        elif (right_click_distance < self.thresholds['right_click'] and 
-              not little_extended and  # Little finger should be bent/touching
-              cursor_distance > self.thresholds['cursor_control']):  # Index should NOT be touching
-            
-            self.reset_gesture_counters(exclude='right_click')
-            if self.is_gesture_stable('right_click') and self.perform_gesture('right_click'):
-                self.current_mode = "RIGHT_CLICK"
-                pyautogui.click(button='right')
-                print("✓ Right Click Performed")
-                # Reset counters after successful click
-                self.reset_gesture_counters()
-                return  # Exit early to prevent other gestures
-        
-        # --- SCROLL (Ring finger + Thumb) - MEDIUM PRIORITY ---
-        elif (scroll_distance < self.thresholds['scroll'] and 
-              not ring_extended and  # Ring finger should be bent/touching
-              cursor_distance > self.thresholds['cursor_control']):  # Index should NOT be touching
-            
-            self.current_mode = "SCROLL"
-            self.reset_gesture_counters(exclude='scroll')
-            
-            if not self.scroll_active:
-                self.scroll_active = True
-                self.scroll_reference_y = ring_tip.y
-                print("🔄 Scroll Mode Activated")
+        points = landmarks_to_array(landmarks)
+        active, pressed, released = self.gesture_engine.update(points, self.frame_time)
+        
+        # Store current (smoothed) distances
+        engine = self.gesture_engine
+        self.last_distances['cursor'] = engine.feature('index_pinch')
+        self.last_distances['left_click'] = engine.feature('middle_pinch')
+        self.last_distances['right_click'] = engine.feature('little_pinch')
+        self.last_distances['scroll'] = engine.feature('ring_pinch')
+        
+        if released:
+            self.end_gesture(engine.spec(released))
+        
+        if active is None:
+            # No gesture detected
+            self.current_mode = "IDLE"
+            return
+        
+        spec = engine.spec(active)
+        if pressed:
+            self.current_mode = spec.mode
+            self.start_gesture(spec, points)
+        else:
+            self.hold_gesture(spec, points)
+    
+    def start_gesture(self, spec, points):
+        """Run a gesture's press action."""
+        action = spec.action
+        
+        if action in ('left_click', 'right_click'):
+            self.scroll_actuator.reset()  # Don't keep coasting under a click or drag
+        
+        # --- LEFT CLICK / DRAG (Middle finger + Thumb) ---
+        if action == 'left_click':
+            if self.drag_enabled:
+                self.pointer.mouse_down(button='left')
             else:
-                delta_y = ring_tip.y - self.scroll_reference_y
-                
-                if abs(delta_y) > self.scroll_sensitivity:
-                    if delta_y < 0:  # Moving up
-                        pyautogui.scroll(self.scroll_step)
-                        print("⬆️ Scroll Up")
-                    else:  # Moving down
-                        pyautogui.scroll(-self.scroll_step)
-                        print("⬇️ Scroll Down")
-                    
-                    self.scroll_reference_y = ring_tip.y
-            return  # Exit early to prevent cursor control
-        
-        # --- CURSOR CONTROL (Index finger + Thumb) - LOWEST PRIORITY ---
-        elif (cursor_distance < self.thresholds['cursor_control'] and
-              left_click_distance > self.thresholds['left_click'] and  # Other fingers should NOT be touching
-              right_click_distance > self.thresholds['right_click'] and
-              scroll_distance > self.thresholds['scroll']):
-            
-            self.current_mode = "CURSOR"
-            self.reset_gesture_counters(exclude='cursor')
-            
+                self.pointer.click(button='left')
+            print("✓ Left Click Performed")
+        
+        # --- RIGHT CLICK (Little finger + Thumb) ---
+        elif action == 'right_click':
+            self.pointer.click(button='right')
+            print("✓ Right Click Performed")
+        
+        # --- SCROLL (Ring finger + Thumb) ---
+        elif action == 'scroll':
+            self.scroll_active = True
+            self.scroll_actuator.reset()
+            self.feed_scroll(points[16][1])
+            print("🔄 Scroll Mode Activated")
+        
+        # --- CURSOR CONTROL (Index finger + Thumb) ---
+        elif action == 'cursor':
+            # Don't let the filter smooth across a gap in cursor control
+            self.cursor_filter.reset()
+            self.hold_gesture(spec, points)
+        
+        # --- USER GESTURES: "hotkey:ctrl+c" style actions ---
+        elif action.startswith('hotkey:'):
+            keys = action.split(':', 1)[1].split('+')
+            self.pointer.hotkey(*keys)
+            print(f"✓ {spec.name}: {'+'.join(keys)}")
+    
+    def hold_gesture(self, spec, points):
+        """Run a gesture's per-frame action while it is held."""
+        action = spec.action
+        
+        if action == 'left_click':
+            held_for = self.gesture_engine.held_for(self.frame_time)
+            if self.drag_enabled and held_for >= self.drag_hold_time:
+                screen_x, screen_y = self.map_coordinates(points[8][0], points[8][1])
+                if self.current_mode != "DRAG":
+                    # Drag relative to where the cursor is, so the pinch doesn't make it jump
+                    self.cursor_filter.reset()
+                    anchor_x, anchor_y = self.last_cursor_target or (screen_x, screen_y)
+                    self.drag_offset = (anchor_x - screen_x, anchor_y - screen_y)
+                    print("✊ Drag Started")
+                self.current_mode = "DRAG"
+                smooth_x, smooth_y = self.smooth_position(screen_x + self.drag_offset[0],
+                                                          screen_y + self.drag_offset[1])
+                self.move_cursor(smooth_x, smooth_y)
+        
+        elif action == 'scroll':
+            self.feed_scroll(points[16][1])
+        
+        elif action == 'cursor':
             # Map hand position to screen coordinates
-            screen_x, screen_y = self.map_coordinates(index_tip.x, index_tip.y)
+            screen_x, screen_y = self.map_coordinates(points[8][0], points[8][1])
             
             # Apply smoothing
             smooth_x, smooth_y = self.smooth_position(screen_x, screen_y)
             
-            # Apply dead zone to prevent jittery movement
-            current_x, current_y = pyautogui.position()
-            if abs(smooth_x - current_x) > 3 or abs(smooth_y - current_y) > 3:
-                pyautogui.moveTo(smooth_x, smooth_y, duration=0.005)
-        
-        else:
-            # No gesture detected - reset states
-            if self.scroll_active:
-                self.scroll_active = False
-                print("🔄 Scroll Mode Deactivated")
-            
-            self.reset_gesture_counters()
-            self.current_mode = "IDLE"
+            self.move_cursor(smooth_x, smooth_y)
+    
+    def feed_scroll(self, ring_y):
+        """Pass the ring fingertip's y to the scroll actuator."""
+        self.scroll_actuator.update(ring_y, self.frame_time)
+        if not self.scroll_actuator.is_alive():
+            self.scroll_coasting = self.scroll_actuator.tick(self.frame_time)  # Replay: no thread, tick per frame
+    
+    def coast_scroll(self):
+        """Replay: tick the released scroll once per frame until its inertia runs out."""
+        if self.scroll_coasting and not self.scroll_active and not self.scroll_actuator.is_alive():
+            self.scroll_coasting = self.scroll_actuator.tick(self.frame_time)
+    
+    def end_gesture(self, spec):
+        """Run a gesture's release action."""
+        if spec.action == 'left_click':
+            if self.drag_enabled:
+                self.pointer.mouse_up(button='left')
+            if self.current_mode == "DRAG":
+                print("✋ Drag Released")
+        elif spec.action == 'scroll' and self.scroll_active:
+            self.scroll_active = False
+            self.scroll_actuator.release()
+            print("🔄 Scroll Mode Deactivated")
+    
+    def handle_no_hand(self, timestamp=None):
+        """Reset gesture state for a frame without a detected hand."""
+        self.frame_time = timestamp if timestamp is not None else time.time()
+        self.coast_scroll()
+        self.release_gesture()
+        self.current_mode = "NO_HAND_DETECTED"
+    
+    def create_hand_tracker(self):
+        """Create the hand tracker used by run()."""
+        return create_hand_tracker(
+            self.hand_backend,
+            model_complexity=self.model_complexity,
+            model_path=self.hand_model_path,
+            num_threads=self.tracker_threads,
+            max_num_hands=1,
+            min_detection_confidence=0.8,
+            min_tracking_confidence=0.7
+        )
     
     def update_fps(self):
-        """Update FPS counter."""
+        """Update FPS counter and publish the rate once per second."""
         current_time = time.time()
-        if current_time - self.fps_time >= 1.0:
+        self.fps_counter += 1
+        elapsed = current_time - self.fps_time
+        if elapsed >= 1.0:
+            self.fps = self.fps_counter / elapsed
             self.fps_time = current_time
             self.fps_counter = 0
+    
+    def process_frame(self, img, frame_time, timings=None, draw=True, capture_time=None):
+        """Run one BGR camera frame through the pipeline.
+        
+        The camera frame is never flipped: landmarks are mirrored in coordinate
+        space, and the color conversion writes into a reused buffer. With draw=True
+        the mirrored, annotated preview frame is returned (also a reused buffer).
+        
+        capture_time (perf_counter) is when the frame was read; it travels with the
+        frame to the actuator for end-to-end latency. With an async tracker the
+        landmarks may belong to an earlier frame, whose capture time is used instead. When a timings dict is given,
+        per-stage durations (seconds) are added to it under 'color', 'inference',
+        'decision' and 'draw'.
+        """
+        t0 = time.perf_counter()
+        self.capture_time = capture_time if capture_time is not None else t0
+        self.filter_time = 0.0
+        
+        if self.rgb_buffer is None or self.rgb_buffer.shape != img.shape:
+            self.rgb_buffer = np.empty_like(img)
+            self.display_buffer = np.empty_like(img)
+        img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=self.rgb_buffer)
+        t1 = time.perf_counter()
+        results = self.hands.process(img_rgb, self.capture_time)
+        t2 = time.perf_counter()
+        
+        decision_time = 0.0
+        if results is None:
+            pass  # Async tracker: no new landmarks since the last frame
+        elif results.hands:
+            self.last_hand_time = frame_time
+            if results.capture_time is not None:
+                self.capture_time = results.capture_time  # Landmarks may be from an earlier frame
+            for landmarks in results.hands:
+                d0 = time.perf_counter()
+                hand_points = landmarks_to_array(landmarks)
+                hand_points[:, 0] = 1.0 - hand_points[:, 0]  # Mirror, as if the frame were flipped
+                self.process_gestures(hand_points, frame_time)
+                decision_time += time.perf_counter() - d0
+                self.last_hand_points = hand_points
+                if self.recorder:
+                    self.recorder.add(frame_time, hand_points)
         else:
-            self.fps_counter += 1
+            d0 = time.perf_counter()
+            self.handle_no_hand(frame_time)
+            decision_time += time.perf_counter() - d0
+            self.last_hand_points = None
+            if self.recorder:
+                self.recorder.add(frame_time, None)
+        
+        latency = self.latency
+        latency.add('preprocess', t1 - capture_time if capture_time is not None else t1 - t0)
+        latency.add('inference', t2 - t1)
+        latency.add('decision', decision_time - self.filter_time)
+        if self.filter_time:
+            latency.add('filter', self.filter_time)
+        
+        self.update_fps()
+        t3 = time.perf_counter()
+        if draw:
+            # Mirror only the preview, then add text so it reads the right way round
+            img = cv2.flip(img, 1, dst=self.display_buffer)
+            if self.last_hand_points is not None:
+                draw_hand(img, self.last_hand_points)
+                self.draw_debug_info(img, self.last_hand_points)
+            cv2.putText(img, f"FPS: {self.fps:.1f}", (self.frame_width - 120, 30),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2)
+        
+        if timings is not None:
+            draw_time = (time.perf_counter() - t3) + (t3 - t2 - decision_time)
+            for stage, duration in (('color', t1 - t0), ('inference', t2 - t1),
+                                    ('decision', decision_time), ('draw', draw_time)):
+                timings[stage] = timings.get(stage, 0.0) + duration
+        return img
     
-    def run(self, stop_event=None):
-        """Main execution loop with optional stop event for threading."""
-        self.stop_event = stop_event
+    def publish_metrics(self, now):
+        """Send FPS, mode and latency percentiles to metrics_callback and log them periodically."""
+        if now - self.last_metrics_time >= self.metrics_interval:
+            self.last_metrics_time = now
+            if self.metrics_callback:
+                self.metrics_callback({
+                    'fps': self.fps,
+                    'mode': self.current_mode,
+                    'latency': self.latency.summary(),
+                    'governor': dict(self.governor.metrics) if self.governor else None,
+                })
+        if now - self.last_latency_log >= self.latency_log_interval:
+            self.last_latency_log = now
+            print(f"⏱️ Gesture latency ({self.fps:.1f} FPS):")
+            print(self.latency.format_summary())
+    
+    def set_idle(self, idle):
+        """Enter or leave idle mode."""
+        if idle == self.idle:
+            return
+        self.account_cpu()
+        self.idle = idle
+        if idle:
+            self.motion_gate.reset()
+            self.current_mode = "IDLE_SLEEP"
+            print(f"💤 No hand for {self.idle_after:.0f}s - idle mode ({self.idle_fps} FPS, motion wake-up)")
+        else:
+            self.last_hand_time = self.frame_time
+            print("👋 Motion detected - resuming hand tracking")
+    
+    def account_cpu(self):
+        """Charge gesture-thread CPU and wall time since the last call to the current mode."""
+        cpu, wall = time.thread_time(), time.perf_counter()
+        if self.cpu_mark is not None:
+            stats = self.cpu_stats['IDLE' if self.idle else 'ACTIVE']
+            stats[0] += cpu - self.cpu_mark[0]
+            stats[1] += wall - self.cpu_mark[1]
+        self.cpu_mark = (cpu, wall)
+    
+    def cpu_report(self):
+        """CPU use of the gesture thread per mode, as a percentage of one core."""
+        return {mode: (100.0 * cpu / wall if wall > 0 else 0.0)
+                for mode, (cpu, wall) in self.cpu_stats.items()}
+    
+    def open_session(self, source=0):
+        """Open the frame source and start the tracker, recorder and actuators.
         
+        Must run on the thread that will process the frames (it registers that
+        thread with the governor). Returns the frame source, or None if it could
+        not be opened.
+        """
         print("🚀 Starting Enhanced Gesture Control...")
         print("📋 Gestures:")
         print("   👆 Index + Thumb (index extended) = Cursor Control")
-        print("   🖕 Middle + Thumb (middle bent) = Left Click")
+        print("   🖕 Middle + Thumb (middle bent) = Left Click (hold to drag)")
         print("   🤟 Little + Thumb (little bent) = Right Click")
         print("   💍 Ring + Thumb (ring bent) = Scroll")
         print("   ❌ Press 'q' to quit")
@@ -356,14 +552,113 @@ class GestureController:
         print("   - Ensure other fingers are away from thumb")
         print("=" * 60)
         
-        # Initialize camera
-        cap = cv2.VideoCapture(0)
-        cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.frame_width)
-        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.frame_height)
-        cap.set(cv2.CAP_PROP_FPS, 30)
+        # Initialize frame source (camera by default)
+        cap = open_frame_source(source, self.frame_width, self.frame_height, fps=30)
         
         if not cap.isOpened():
-            print("❌ Error: Could not open camera")
+            print(f"❌ Error: Could not open {cap.name}")
+            return None
+        
+        self.owns_tracker = self.hands is None
+        if self.owns_tracker:
+            self.hands = self.create_hand_tracker()
+        
+        if self.record_path:
+            self.recorder = TraceRecorder()
+            print(f"⏺️ Recording landmark trace to {self.record_path}")
+            print("   Press 'l' / 'r' as you start a left / right click to label it")
+        
+        if self.use_governor:
+            self.governor = get_governor()
+            self.governor.register_thread('gesture')
+        
+        self.actuator = CursorActuator(self.pointer, rate_hz=self.actuator_rate_hz, latency=self.latency)
+        self.actuator.start()
+        self.scroll_actuator = ScrollActuator(self.pointer, **self.scroll_params)
+        self.scroll_actuator.start()
+        return cap
+    
+    def step(self, img, frame_time, capture_time, draw=True):
+        """Run one captured frame through the idle gate and the pipeline.
+        
+        Returns the preview frame, or None when the frame was skipped in idle mode.
+        """
+        self.account_cpu()
+        if self.idle:
+            if not self.motion_gate(img):
+                self.publish_metrics(frame_time)
+                return None
+            self.frame_time = frame_time
+            self.set_idle(False)
+        
+        img = self.process_frame(img, frame_time, draw=draw, capture_time=capture_time)
+        if frame_time - self.last_hand_time > self.idle_after:
+            self.set_idle(True)
+        self.publish_metrics(frame_time)
+        return img
+    
+    def pacing_delay(self, capture_time, skipped):
+        """Seconds to wait before reading the next frame from a live source."""
+        if skipped:
+            # Throttle capture while idle; the camera only buffers the newest frame
+            return 1.0 / self.idle_fps
+        fps_limit = self.governor.gesture_fps_limit() if self.governor else None
+        if fps_limit:
+            return max(0.0, 1.0 / fps_limit - (time.perf_counter() - capture_time))
+        return 0.0
+    
+    def show_frame(self, img, frame_time):
+        """Show the preview (img=None only pumps the window); False when 'q' was pressed."""
+        if img is not None:
+            cv2.imshow("Enhanced AI Virtual Mouse", img)
+        key = cv2.waitKey(1) & 0xFF
+        if key == ord('q'):
+            return False
+        if img is not None and self.recorder and chr(key) in self.label_keys:
+            # Mark when the user starts an intended gesture (ground truth for replay)
+            self.recorder.add_label(frame_time, self.label_keys[chr(key)])
+        return True
+    
+    def close_session(self, cap, show=True):
+        """Stop the actuators, release the source and tracker, save the trace and print reports."""
+        self.release_gesture()
+        self.actuator.stop()
+        self.actuator.join(timeout=1.0)
+        self.actuator = None
+        self.scroll_actuator.stop()
+        self.scroll_actuator.join(timeout=1.0)
+        self.scroll_actuator = ScrollActuator(self.pointer, **self.scroll_params)
+        if self.governor:
+            self.governor.unregister_thread('gesture')
+        cap.release()
+        if self.owns_tracker:
+            self.hands.close()  # Stops the Tasks landmarker's worker threads
+            self.hands = None
+        if show:
+            cv2.destroyAllWindows()
+        if self.recorder:
+            self.recorder.save(self.record_path)
+            print(f"💾 Saved {len(self.recorder)} frames to {self.record_path}")
+            self.recorder = None
+        self.account_cpu()
+        cpu = self.cpu_report()
+        print(f"📊 Gesture thread CPU: active {cpu['ACTIVE']:.0f}% "
+              f"({self.cpu_stats['ACTIVE'][1]:.0f}s), idle {cpu['IDLE']:.0f}% ({self.cpu_stats['IDLE'][1]:.0f}s)")
+        print("⏱️ Gesture latency:")
+        print(self.latency.format_summary())
+        print("✅ Gesture control stopped")
+    
+    def run(self, stop_event=None, source=0, show=True):
+        """Main execution loop with optional stop event for threading.
+        
+        source can be a camera index, a video file, an image directory/glob or a
+        frame source object (see frame_sources.open_frame_source). show=False runs
+        without the preview window. runtime.gesture_pipeline drives the same
+        steps from the asyncio runtime instead.
+        """
+        self.stop_event = stop_event
+        cap = self.open_session(source)
+        if cap is None:
             return
         
         try:
@@ -372,35 +667,27 @@ class GestureController:
                     print("🛑 Stop event received")
                     break
                 
-                success, img = cap.read()
+                success, img = cap.read(self.capture_buffer)
                 if not success:
+                    if not cap.is_live:
+                        print(f"🏁 End of {cap.name}")
+                        break
                     print("⚠️ Warning: Failed to read from camera")
                     continue
+                capture_time = time.perf_counter()
+                frame_time = time.time()
+                self.capture_buffer = img
                 
-                img = cv2.flip(img, 1)
-                img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-                results = self.hands.process(img_rgb)
-                
-                if results.multi_hand_landmarks:
-                    for hand_landmarks in results.multi_hand_landmarks:
-                        self.mp_draw.draw_landmarks(
-                            img, hand_landmarks, self.mp_hands.HAND_CONNECTIONS,
-                            self.mp_draw.DrawingSpec(color=(0, 255, 0), thickness=2),
-                            self.mp_draw.DrawingSpec(color=(255, 0, 0), thickness=2)
-                        )
-                        
-                        self.process_gestures(hand_landmarks.landmark)
-                        self.draw_debug_info(img, hand_landmarks.landmark)
-                else:
-                    self.reset_gesture_counters()
-                    self.current_mode = "NO_HAND_DETECTED"
-                    if self.scroll_active:
-                        self.scroll_active = False
-                
-                self.update_fps()
-                cv2.imshow("Enhanced AI Virtual Mouse", img)
+                img = self.step(img, frame_time, capture_time, draw=show)
+                if cap.is_live:
+                    delay = self.pacing_delay(capture_time, skipped=img is None)
+                    if delay > 0:
+                        if self.stop_event:
+                            self.stop_event.wait(delay)
+                        else:
+                            time.sleep(delay)
                 
-                if cv2.waitKey(1) & 0xFF == ord('q'):
+                if show and not self.show_frame(img, frame_time):
                     break
                     
         except KeyboardInterrupt:
@@ -408,15 +695,36 @@ class GestureController:
         except Exception as e:
             print(f"❌ Error: {e}")
         finally:
-            cap.release()
-            cv2.destroyAllWindows()
-            print("✅ Gesture control stopped")
+            self.close_session(cap, show)
 
 if __name__ == "__main__":
-    controller = GestureController()
-    controller.run()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Hand gesture virtual mouse.")
+    parser.add_argument("--record", metavar="TRACE.npz", help="Record per-frame landmarks to a trace file")
+    parser.add_argument("--source", default="0", help="Camera index, video file or image directory/glob")
+    parser.add_argument("--hand-backend", choices=['legacy', 'tasks'], default='legacy',
+                        help="Hand tracker: legacy mp.solutions.hands or Tasks HandLandmarker (async)")
+    parser.add_argument("--model-complexity", type=int, choices=[0, 1], default=1,
+                        help="Legacy hand model: 0 = lite, 1 = full")
+    parser.add_argument("--latency-selftest", type=float, metavar="SECONDS",
+                        help="Measure the whole loop with a synthetic moving target instead of a camera")
+    args = parser.parse_args()
+    
+    if args.latency_selftest:
+        from latency import run_latency_selftest
+        result = run_latency_selftest(duration=args.latency_selftest)
+        print("=" * 60)
+        print("⏱️ Synthetic target self-test")
+        print(result['report'])
+        print(f"   Whole-loop lag (dot motion -> cursor motion): {result['loop_lag_ms']:.0f} ms")
+    else:
+        controller = GestureController(record_path=args.record)
+        controller.hand_backend = args.hand_backend
+        controller.model_complexity = args.model_complexity
+        controller.run(source=args.source)
 
-def run_virtual_mouse(stop_event):
+def run_virtual_mouse(stop_event, metrics_callback=None):
     """Function to run virtual mouse with stop event support."""
-    controller = GestureController()
+    controller = GestureController(metrics_callback=metrics_callback)
     controller.run(stop_event)
\ No newline at end of file
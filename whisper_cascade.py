@@ -0,0 +1,113 @@
+import time
+import numpy as np
+
+from latency import LatencyHistogram
+
+# Approximate fp32 weight sizes, used to plan residency before a model has been loaded
+WHISPER_MODEL_MB = {
+    'tiny': 150, 'tiny.en': 150, 'base': 290, 'base.en': 290, 'small': 930, 'small.en': 930,
+    'medium': 2900, 'medium.en': 2900, 'large': 5900, 'turbo': 3100,
+}
+
+# Decode latency bins: log-spaced from 10 ms to 60 s
+DECODE_BINS_MS = [0.0] + [round(float(edge), 1) for edge in np.logspace(1, np.log10(60000), 41)]
+
+
+class WhisperCascade:
+    """Decode with a small Whisper model first; re-decode with the large one only when unsure.
+
+    The small model's transcript is kept unless one of its segments falls
+    outside the thresholds: average log-probability below `min_avg_logprob`,
+    no-speech probability above `max_no_speech_prob`, or compression ratio
+    above `max_compression_ratio` (a sign of repetition loops). Both models
+    are WhisperModelManagers; if together they don't fit `memory_budget_mb`,
+    the large one is unloaded again right after each escalation.
+    """
+
+    def __init__(self, small, large, memory_budget_mb=4000, min_avg_logprob=-0.6,
+                 max_no_speech_prob=0.5, max_compression_ratio=2.2):
+        self.small = small
+        self.large = large
+        self.memory_budget_mb = memory_budget_mb
+        self.min_avg_logprob = min_avg_logprob
+        self.max_no_speech_prob = max_no_speech_prob
+        self.max_compression_ratio = max_compression_ratio
+        self.decodes = 0
+        self.escalations = 0
+        self.latency = {path: LatencyHistogram(DECODE_BINS_MS) for path in ('small', 'escalated', 'total')}
+
+    @staticmethod
+    def _model_mb(manager):
+        return manager.stats['model_mb'] or WHISPER_MODEL_MB.get(manager.name, float('inf'))
+
+    def both_fit(self):
+        return self._model_mb(self.small) + self._model_mb(self.large) <= self.memory_budget_mb
+
+    @property
+    def ready(self):
+        """True when prefetch() has nothing left to load."""
+        return self.small.ready and (self.large.ready or not self.both_fit())
+
+    def prefetch(self):
+        """Load the small model (and the large one too, if both fit the budget)."""
+        self.small.prefetch()
+        if self.both_fit():
+            self.large.prefetch()
+
+    def escalation_reason(self, result):
+        """Why the small model's result isn't trusted, or None."""
+        segments = result.get('segments') or []
+        if not segments:
+            return None
+        logprob = min(s['avg_logprob'] for s in segments)
+        no_speech = max(s['no_speech_prob'] for s in segments)
+        compression = max(s['compression_ratio'] for s in segments)
+        if logprob < self.min_avg_logprob:
+            return f"avg_logprob {logprob:.2f}"
+        if no_speech > self.max_no_speech_prob:
+            return f"no_speech_prob {no_speech:.2f}"
+        if compression > self.max_compression_ratio:
+            return f"compression_ratio {compression:.2f}"
+        return None
+
+    def transcribe(self, audio, **options):
+        """Transcribe float32 audio; returns (result, info) where info says which path ran."""
+        start = time.perf_counter()
+        with self.small.use() as model:
+            result = model.transcribe(audio, fp16=self.small.fp16, **options)
+        small_s = time.perf_counter() - start
+        self.decodes += 1
+
+        reason = self.escalation_reason(result)
+        if reason:
+            self.escalations += 1
+            with self.large.use() as model:
+                result = model.transcribe(audio, fp16=self.large.fp16, **options)
+            if not self.both_fit():
+                self.large.unload(reason="to stay within the memory budget")
+        total_s = time.perf_counter() - start
+
+        self.latency['total'].add(total_s * 1000)
+        self.latency['escalated' if reason else 'small'].add(total_s * 1000)
+        return result, {'escalated': reason is not None, 'reason': reason,
+                        'small_s': small_s, 'total_s': total_s}
+
+    def escalation_rate(self):
+        return self.escalations / self.decodes if self.decodes else float('nan')
+
+    def format_report(self):
+        lines = [f"   {self.decodes} decodes, {self.escalations} escalated to {self.large.name} "
+                 f"({self.escalation_rate():.0%}), {self.small.name} first"]
+        lines.append(f"   {'path':<12}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+        for path, histogram in self.latency.items():
+            if histogram.count:
+                s = histogram.summary()
+                lines.append(f"   {path:<12}{s['count']:>6}{s['p50_ms']:>10.0f}{s['p95_ms']:>10.0f}{s['max_ms']:>10.0f}")
+        return "\n".join(lines)
+
+
+def segment_scores(result):
+    """Mean segment scores of a transcribe() result (for reports)."""
+    segments = result.get('segments') or [{}]
+    return {key: float(np.mean([s.get(key, np.nan) for s in segments]))
+            for key in ('avg_logprob', 'no_speech_prob', 'compression_ratio')}
@@ -0,0 +1,125 @@
+import contextlib
+import gc
+import threading
+import time
+import psutil
+
+
+class WhisperModelManager:
+    """Keeps the Whisper model resident only while it is being used.
+
+    The model is unloaded after `idle_timeout` seconds without use, and
+    prefetch() starts reloading it in the background, so the speech engine
+    can call it as soon as a wake phrase is heard and the load overlaps with
+    the user speaking. use() waits for a load in progress, which queues
+    dictation until the model is ready.
+    """
+
+    def __init__(self, loader, name="medium", idle_timeout=600.0, check_interval=10.0):
+        self.loader = loader  # name -> (model, device, fp16)
+        self.name = name
+        self.idle_timeout = idle_timeout
+        self.check_interval = check_interval
+        self.lock = threading.Condition()
+        self.model = None
+        self.device = None
+        self.fp16 = False
+        self.state = 'UNLOADED'  # UNLOADED, LOADING, READY
+        self.in_use = 0
+        self.last_used = time.time()
+        self.load_requested = None
+        self.stats = {'loads': 0, 'evictions': 0, 'last_load_s': None, 'rss_mb': self.rss_mb(), 'model_mb': None}
+        self.stop_event = threading.Event()
+        self.watchdog = threading.Thread(target=self._watch_idle, name="WhisperIdle", daemon=True)
+        self.watchdog.start()
+
+    @staticmethod
+    def rss_mb():
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+
+    @staticmethod
+    def model_size_mb(model):
+        """Memory taken by a model's weights."""
+        return sum(p.numel() * p.element_size() for p in model.parameters()) / (1024 * 1024)
+
+    @property
+    def ready(self):
+        return self.state == 'READY'
+
+    def prefetch(self):
+        """Start loading the model in the background unless it is loaded or loading."""
+        with self.lock:
+            self.last_used = time.time()
+            if self.state != 'UNLOADED':
+                return
+            self.state = 'LOADING'
+            self.load_requested = time.perf_counter()
+        threading.Thread(target=self._load, name="WhisperLoad", daemon=True).start()
+
+    def _load(self):
+        print(f"⏳ Loading Whisper {self.name}...")
+        try:
+            model, device, fp16 = self.loader(self.name)
+        except Exception as e:
+            print(f"❌ Could not load Whisper {self.name}: {e}")
+            with self.lock:
+                self.state = 'UNLOADED'
+                self.lock.notify_all()
+            return
+        with self.lock:
+            self.model, self.device, self.fp16 = model, device, fp16
+            self.state = 'READY'
+            self.last_used = time.time()
+            self.stats['loads'] += 1
+            self.stats['last_load_s'] = time.perf_counter() - self.load_requested
+            self.stats['rss_mb'] = self.rss_mb()
+            self.stats['model_mb'] = self.model_size_mb(model)
+            self.lock.notify_all()
+        print(f"💾 Whisper {self.name} ready {self.stats['last_load_s']:.1f}s after the request "
+              f"(RSS {self.stats['rss_mb']:.0f} MB)")
+
+    @contextlib.contextmanager
+    def use(self, timeout=None):
+        """Yield the loaded model, loading it first (and waiting) if necessary."""
+        self.prefetch()
+        with self.lock:
+            if not self.lock.wait_for(lambda: self.state != 'LOADING', timeout):
+                raise TimeoutError(f"Whisper {self.name} still loading after {timeout}s")
+            if self.state != 'READY':
+                raise RuntimeError(f"Whisper {self.name} failed to load")
+            self.in_use += 1
+            model = self.model
+        try:
+            yield model
+        finally:
+            with self.lock:
+                self.in_use -= 1
+                self.last_used = time.time()
+
+    def unload(self, reason=None):
+        """Drop the model now (if nobody is using it) and give the memory back."""
+        with self.lock:
+            if self.state != 'READY' or self.in_use:
+                return False
+            self.model = None
+            self.state = 'UNLOADED'
+        gc.collect()
+        if self.device == "cuda":
+            import torch
+            torch.cuda.empty_cache()
+        self.stats['evictions'] += 1
+        self.stats['rss_mb'] = self.rss_mb()
+        reason = reason or f"after {self.idle_timeout:.0f}s idle"
+        print(f"🧹 Whisper {self.name} unloaded {reason} (RSS {self.stats['rss_mb']:.0f} MB)")
+        return True
+
+    def _watch_idle(self):
+        while not self.stop_event.wait(self.check_interval):
+            with self.lock:
+                idle = self.state == 'READY' and not self.in_use and \
+                    time.time() - self.last_used > self.idle_timeout
+            if idle:
+                self.unload()
+
+    def close(self):
+        self.stop_event.set()